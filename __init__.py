@@ -11,10 +11,36 @@ bl_info = {
 import bpy
 import os
 import json
-from contextlib import contextmanager
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager, nullcontext
+from functools import lru_cache
+from itertools import cycle
+from operator import attrgetter
+import numpy as np
+from bpy.app.handlers import persistent
 from bpy.props import IntProperty, StringProperty, BoolProperty, EnumProperty, FloatProperty
 from bpy.types import Operator, Panel
 
+try:
+    from PIL import Image as PILImage
+except ImportError:
+    # Pillow is not bundled with Blender, fall back to Image.save()
+    PILImage = None
+
+try:
+    import orjson
+except ImportError:
+    # orjson is not bundled with Blender, fall back to the json module
+    orjson = None
+
+try:
+    from numba import njit, prange
+except ImportError:
+    # numba is not bundled with Blender, UDIM detection stays on numpy
+    njit = None
+
 # -----------------------------------------------------------------------------
 # Helper Functions
 # -----------------------------------------------------------------------------
@@ -42,6 +68,12 @@ def safe_encode_text(text, fallback="Unknown"):
         return fallback
 
 
+@lru_cache(maxsize=2048)
+def safe_name_cached(name, fallback="Unknown"):
+    """safe_encode_text for names drawn on every panel redraw"""
+    return safe_encode_text(name, fallback)
+
+
 def safe_path_display(path, max_length=50):
     """Safely display file path, avoiding encoding errors"""
     if not path:
@@ -108,76 +140,133 @@ def get_atlas_uv_bounds(material_index, cols, rows, padding=0.02):
     return (u_min, v_min, u_max, v_max)
 
 
+def get_atlas_tile_rect(material_index, cols, rows, size, padding=0.02):
+    """Get pixel rectangle (x, y, width, height) of material's area in a square atlas"""
+    u_min, v_min, u_max, v_max = get_atlas_uv_bounds(material_index, cols, rows, padding)
+    x = int(round(u_min * size))
+    y = int(round(v_min * size))
+    return (x, y, max(int(round(u_max * size)) - x, 1), max(int(round(v_max * size)) - y, 1))
+
+
 def create_atlas_uv_layer(obj, material_slots, atlas_layout, padding=0.02):
     """Create atlas UV layer for object"""
-    if not obj.data.uv_layers:
+    mesh = obj.data
+    if not mesh.uv_layers:
         # If no UV layer exists, create one first
-        obj.data.uv_layers.new(name="UVMap")
+        mesh.uv_layers.new(name="UVMap")
+    
+    # Replace the layer left by a previous atlas bake instead of adding AtlasUV.001
+    old_layer = mesh.uv_layers.get("AtlasUV")
+    if old_layer is not None and old_layer != mesh.uv_layers.active:
+        mesh.uv_layers.remove(old_layer)
     
-    # Create new atlas UV layer
-    atlas_uv_layer = obj.data.uv_layers.new(name="AtlasUV")
-    obj.data.uv_layers.active = atlas_uv_layer
+    # Create new atlas UV layer, initialized from the active one
+    atlas_uv_layer = mesh.uv_layers.new(name="AtlasUV")
+    mesh.uv_layers.active = atlas_uv_layer
     
     cols, rows = atlas_layout
     
-    import bmesh
+    # Read face materials and loop ranges in bulk, staying in Object mode
+    polygons = mesh.polygons
+    face_count = len(polygons)
+    face_material = np.empty(face_count, dtype=np.int32)
+    polygons.foreach_get("material_index", face_material)
+    loop_starts = np.empty(face_count, dtype=np.int32)
+    polygons.foreach_get("loop_start", loop_starts)
+    loop_totals = np.empty(face_count, dtype=np.int32)
+    polygons.foreach_get("loop_total", loop_totals)
     
-    # Enter edit mode to modify UV
-    bpy.context.view_layer.objects.active = obj
-    bpy.ops.object.mode_set(mode='EDIT')
+    # Spread each face's material index onto its loops
+    loop_count = int(loop_totals.sum())
+    face_offsets = np.repeat(np.cumsum(loop_totals) - loop_totals, loop_totals)
+    loop_indices = np.repeat(loop_starts, loop_totals) + np.arange(loop_count, dtype=np.int32) - face_offsets
+    loop_material = np.full(len(mesh.loops), -1, dtype=np.int32)
+    loop_material[loop_indices] = np.repeat(face_material, loop_totals)
     
-    # Create bmesh instance
-    bm = bmesh.new()
-    bm.from_mesh(obj.data)
+    uvs = np.empty(len(atlas_uv_layer.data) * 2, dtype=np.float32)
+    atlas_uv_layer.data.foreach_get("uv", uvs)
+    uv = uvs.reshape(-1, 2)
     
-    try:
-        # Ensure face indices are valid
-        bm.faces.ensure_lookup_table()
-        
-        # Get UV layer
-        uv_layer = bm.loops.layers.uv.active
-        if not uv_layer:
-            uv_layer = bm.loops.layers.uv.new()
-        
-        # Assign each face to correct material area
-        for face in bm.faces:
-            material_index = face.material_index
-            if material_index < len(material_slots):
-                # Get UV bounds for this material in atlas
-                u_min, v_min, u_max, v_max = get_atlas_uv_bounds(material_index, cols, rows, padding)
-                
-                # Get face's original UV coordinates
-                original_uvs = []
-                for loop in face.loops:
-                    original_uvs.append(loop[uv_layer].uv.copy())
-                
-                # Remap UV coordinates to atlas area
-                for i, loop in enumerate(face.loops):
-                    orig_u, orig_v = original_uvs[i]
-                    # Map 0-1 range UV to material's atlas area
-                    new_u = u_min + orig_u * (u_max - u_min)
-                    new_v = v_min + orig_v * (v_max - v_min)
-                    loop[uv_layer].uv = (new_u, new_v)
-        
-        # Update mesh
-        bmesh.update_edit_mesh(obj.data)
-        
-    except Exception as e:
-        print(f"UV atlas creation error: {e}")
-    finally:
-        bm.free()
-        bpy.ops.object.mode_set(mode='OBJECT')
+    # Map 0-1 range UV of every face to its material's atlas area
+    bounds = np.array([get_atlas_uv_bounds(i, cols, rows, padding) for i in range(len(material_slots))], dtype=np.float32)
+    mapped = (loop_material >= 0) & (loop_material < len(material_slots))
+    loop_bounds = bounds[loop_material[mapped]]
+    uv[mapped, 0] = loop_bounds[:, 0] + uv[mapped, 0] * (loop_bounds[:, 2] - loop_bounds[:, 0])
+    uv[mapped, 1] = loop_bounds[:, 1] + uv[mapped, 1] * (loop_bounds[:, 3] - loop_bounds[:, 1])
+    
+    atlas_uv_layer.data.foreach_set("uv", uvs)
+    mesh.update()
     
     return atlas_uv_layer.name
 
 
-def restore_original_uv_layer(obj, original_uv_name):
-    """Restore original UV layer"""
-    if original_uv_name in obj.data.uv_layers:
-        obj.data.uv_layers.active = obj.data.uv_layers[original_uv_name]
-        # Delete atlas UV layer
-        if "AtlasUV" in obj.data.uv_layers:
-            obj.data.uv_layers.remove(obj.data.uv_layers["AtlasUV"])
+# Scene settings stored in presets, each key is the scene property name without the 'mbnl_' prefix
+PRESET_KEYS = (
+    # 基本设置
+    'resolution',
+    'replace_nodes',
+    'include_lighting',
+    'lighting_shadow_mode',
+    'organize_folders',
+    'use_custom_directory',
+    'custom_directory',
+
+    # 多分辨率设置
+    'enable_multi_resolution',
+    'res_512',
+    'res_1024',
+    'res_2048',
+    'res_4096',
+    'res_8192',
+
+    # 自定义分辨率设置
+    'enable_custom_resolution',
+    'custom_width_1',
+    'custom_height_1',
+    'custom_width_2',
+    'custom_height_2',
+    'custom_width_3',
+    'custom_height_3',
+    'use_custom_1',
+    'use_custom_2',
+    'use_custom_3',
+
+    # 基础PBR通道
+    'include_basecolor',
+    'include_roughness',
+    'include_metallic',
+    'include_normal',
+
+    # 高级PBR通道
+    'include_subsurface',
+    'include_transmission',
+    'include_emission',
+    'include_alpha',
+    'include_specular',
+    'include_clearcoat',
+    'include_clearcoat_roughness',
+    'include_sheen',
+
+    # 特殊通道
+    'include_displacement',
+    'include_ambient_occlusion',
+
+    # 自定义着色器
+    'include_custom_shader',
+    'mixed_shader_strategy',
+
+    # 色彩空间管理
+    'colorspace_mode',
+    'colorspace_basecolor',
+    'colorspace_normal',
+    'colorspace_roughness',
+    'colorspace_emission',
+    'colorspace_manual_override',
+)
+
+
+# Characters not allowed in preset file names (letters and digits of any script, space, '-' and '_' are kept)
+PRESET_NAME_RE = re.compile(r'[^\w \-]')
 
 
 def get_presets_dir():
@@ -192,9 +281,20 @@ def get_preset_filepath(preset_name):
     return os.path.join(get_presets_dir(), f"{preset_name}.json")
 
 
+# Preset enum items for the presets folder at the given modification time, see get_available_presets
+_PRESETS_CACHE = {'mtime': -1, 'list': []}
+
+
 def get_available_presets():
-    """Get all available presets"""
+    """Get all available presets, rescanning the presets folder only when it has changed"""
     presets_dir = get_presets_dir()
+    try:
+        mtime = os.stat(presets_dir).st_mtime_ns
+    except OSError:
+        mtime = -1
+    if mtime != -1 and mtime == _PRESETS_CACHE['mtime']:
+        return _PRESETS_CACHE['list']
+
     presets = []
     try:
         for filename in os.listdir(presets_dir):
@@ -207,6 +307,9 @@ def get_available_presets():
     if not presets:
         presets.append(('NONE', 'No Presets', 'No available presets'))
     
+    # Blender also needs the enum item strings to stay referenced from Python
+    _PRESETS_CACHE['mtime'] = mtime
+    _PRESETS_CACHE['list'] = presets
     return presets
 
 
@@ -219,8 +322,12 @@ def save_preset_to_file(preset_name, settings):
     """Save preset to file"""
     try:
         filepath = get_preset_filepath(preset_name)
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(settings, f, indent=2, ensure_ascii=False)
+        if orjson is not None:
+            data = orjson.dumps(settings, option=orjson.OPT_INDENT_2)
+        else:
+            data = json.dumps(settings, indent=2, ensure_ascii=False).encode('utf-8')
+        with open(filepath, 'wb') as f:
+            f.write(data)
         return True
     except Exception as e:
         print(f"Failed to save preset: {e}")
@@ -232,8 +339,9 @@ def load_preset_from_file(preset_name):
     try:
         filepath = get_preset_filepath(preset_name)
         if os.path.exists(filepath):
-            with open(filepath, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            with open(filepath, 'rb') as f:
+                data = f.read()
+            return orjson.loads(data) if orjson is not None else json.loads(data.decode('utf-8'))
     except Exception as e:
         print(f"Failed to load preset: {e}")
     return None
@@ -255,6 +363,101 @@ def ensure_cycles(scene):
         scene.render.engine = "CYCLES"
 
 
+@contextmanager
+def object_mode(context):
+    """Stay in Object mode for a whole bake, mesh data written with foreach_set is only live there"""
+    active = context.view_layer.objects.active
+    mode = active.mode if active else 'OBJECT'
+    if mode != 'OBJECT':
+        bpy.ops.object.mode_set(mode='OBJECT')
+    try:
+        yield
+    finally:
+        # Return to the user's mode once, with their active object restored by the caller
+        if mode != 'OBJECT' and context.view_layer.objects.active is active:
+            bpy.ops.object.mode_set(mode=mode)
+
+
+# GPU backends tried in order; CUDA comes before OptiX because OptiX baking
+# has historically been less reliable than CUDA.
+CYCLES_GPU_BACKENDS = ('CUDA', 'OPTIX', 'HIP', 'ONEAPI')
+
+
+def ensure_gpu_device(scene):
+    """Switch Cycles to the first available GPU backend, return the previous state"""
+    addon = bpy.context.preferences.addons.get('cycles')
+    if not addon:
+        return None
+
+    prefs = addon.preferences
+    state = {
+        'compute_device_type': prefs.compute_device_type,
+        'device': scene.cycles.device,
+        'devices': {device.id: device.use for device in prefs.devices},
+        'backend': None,
+    }
+
+    for backend in CYCLES_GPU_BACKENDS:
+        try:
+            prefs.compute_device_type = backend
+        except TypeError:
+            # Backend not compiled into this Blender build
+            continue
+        prefs.get_devices_for_type(backend)
+        if not any(device.type == backend for device in prefs.devices):
+            continue
+        # Leave the CPU out, it only drags GPU bakes down
+        for device in prefs.devices:
+            device.use = device.type == backend
+        scene.cycles.device = 'GPU'
+        state['backend'] = backend
+        return state
+
+    prefs.compute_device_type = state['compute_device_type']
+    return state
+
+
+def restore_gpu_device(scene, state):
+    """Restore Cycles device settings saved by ensure_gpu_device"""
+    if not state:
+        return
+
+    prefs = bpy.context.preferences.addons['cycles'].preferences
+    try:
+        prefs.compute_device_type = state['compute_device_type']
+    except TypeError:
+        pass
+    for device in prefs.devices:
+        if device.id in state['devices']:
+            device.use = state['devices'][device.id]
+    scene.cycles.device = state['device']
+
+
+# Bake types that objects sharing mesh and material can reuse, as long as the material
+# reads no per-object input (see material_reads_object). EMIT and COMBINED bakes also
+# pick up lighting or arbitrary shader output and are always baked per object.
+REUSABLE_BAKE_TYPES = ('NORMAL', 'ROUGHNESS')
+
+
+def write_png(filepath, pixels, width, height, alpha=True):
+    """Encode a flat float RGBA buffer (bottom-up rows, as Blender stores them) to PNG, runs off the main thread"""
+    rgba = np.clip(pixels.reshape(height, width, 4), 0.0, 1.0)
+    data = (rgba[::-1] * 255.0 + 0.5).astype(np.uint8)
+    if alpha:
+        PILImage.fromarray(data, 'RGBA').save(filepath, format='PNG', compress_level=1)
+    else:
+        PILImage.fromarray(np.ascontiguousarray(data[..., :3]), 'RGB').save(filepath, format='PNG', compress_level=1)
+
+
+def write_solid_png(filepath, color, width, height, alpha=True):
+    """Write a constant-color PNG straight from Pillow, without a Blender image buffer"""
+    values = tuple(int(min(max(c, 0.0), 1.0) * 255.0 + 0.5) for c in color)
+    if alpha:
+        PILImage.new('RGBA', (width, height), values).save(filepath, format='PNG', compress_level=1)
+    else:
+        PILImage.new('RGB', (width, height), values[:3]).save(filepath, format='PNG', compress_level=1)
+
+
 def smart_uv(obj):
     bpy.ops.object.mode_set(mode="OBJECT")
     bpy.ops.object.mode_set(mode="EDIT")
@@ -262,6 +465,21 @@ def smart_uv(obj):
     bpy.ops.object.mode_set(mode="OBJECT")
 
 
+# Color mix node for this Blender version. ShaderNodeMix repeats the names
+# A/B/Result for its float, vector and color variants, so sockets are
+# addressed by index: Factor, color A/B inputs and color Result output.
+if bpy.app.version >= (3, 4, 0):
+    MIX_NODE_ID = 'ShaderNodeMix'
+    MIX_FAC = 0
+    MIX_IN = (6, 7)
+    MIX_OUT = 2
+else:
+    MIX_NODE_ID = 'ShaderNodeMixRGB'
+    MIX_FAC = 0
+    MIX_IN = (1, 2)
+    MIX_OUT = 0
+
+
 def get_principled_bsdf_inputs():
     """Get actual input names of Principled BSDF in current Blender version"""
     
@@ -287,8 +505,9 @@ def get_principled_bsdf_inputs():
         ]
 
 
+@lru_cache(maxsize=1)
 def create_input_mapping():
-    """Create input name mapping suitable for current Blender version"""
+    """Create input name mapping suitable for current Blender version, built once per session (treat as read-only)"""
     try:
         available_inputs = get_principled_bsdf_inputs()
     except Exception:
@@ -543,6 +762,207 @@ def analyze_material(material):
     return analysis
 
 
+# material name -> (fingerprint, analysis), see analyze_material_cached
+_ANALYSIS_CACHE = {}
+
+
+def fingerprint_material(material):
+    """Cheap signature of a material's node graph: node tree, node count and every link"""
+    nt = material.node_tree
+    if not nt:
+        return None
+    return (
+        nt.as_pointer(),
+        len(nt.nodes),
+        tuple((link.from_node.as_pointer(), link.to_node.as_pointer(), link.from_socket.identifier, link.to_socket.identifier)
+              for link in nt.links),
+    )
+
+
+def analyze_material_cached(material):
+    """analyze_material for UI code, reusing the last result until the material's node graph changes"""
+    signature = fingerprint_material(material)
+    cached = _ANALYSIS_CACHE.get(material.name_full)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    analysis = analyze_material(material)
+    _ANALYSIS_CACHE[material.name_full] = (signature, analysis)
+    return analysis
+
+
+# Nodes whose output differs between objects sharing a mesh (transform, per-object random, surroundings)
+OBJECT_INPUT_NODES = frozenset((
+    'ShaderNodeObjectInfo',
+    'ShaderNodeNewGeometry',
+    'ShaderNodeWireframe',
+    'ShaderNodeAmbientOcclusion',
+))
+
+# material name -> (fingerprint, reads object), see material_reads_object
+_OBJECT_INPUT_CACHE = {}
+
+
+def node_tree_reads_object(nt, visited=None):
+    """Whether a node tree, or any node group inside it, uses an input that depends on the object being baked"""
+    if visited is None:
+        visited = set()
+    if nt.as_pointer() in visited:
+        return False
+    visited.add(nt.as_pointer())
+    for node in nt.nodes:
+        idname = node.bl_idname
+        if idname in OBJECT_INPUT_NODES:
+            return True
+        if idname == 'ShaderNodeTexCoord':
+            # UV (and the mesh-space outputs) are shared, Object/Camera/Window/Reflection are not
+            if any(output.is_linked for output in node.outputs if output.name != 'UV'):
+                return True
+        elif idname == 'ShaderNodeAttribute':
+            if node.attribute_type in ('OBJECT', 'INSTANCER'):
+                return True
+        elif idname == 'ShaderNodeGroup' and node.node_tree:
+            if node_tree_reads_object(node.node_tree, visited):
+                return True
+    return False
+
+
+def material_reads_object(material):
+    """node_tree_reads_object for a material, reusing the last result until the material's node graph changes"""
+    signature = fingerprint_material(material)
+    if signature is None:
+        return False
+    cached = _OBJECT_INPUT_CACHE.get(material.name_full)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    reads_object = node_tree_reads_object(material.node_tree)
+    _OBJECT_INPUT_CACHE[material.name_full] = (signature, reads_object)
+    return reads_object
+
+
+# Panel statistics for the last selection, see get_ui_stats
+_STATS_CACHE = {'key': None, 'value': None}
+
+# The panel analyzes materials on its own only up to this many selected objects
+STATS_AUTO_ANALYZE_LIMIT = 50
+
+# Material types listed in the panel's type distribution, in display order
+# (mixed_shader_network gets its own highlighted line)
+STAT_LABELS = (
+    ('textured', "Textured"),
+    ('procedural', "Solid Color"),
+    ('mixed', "Mixed"),
+    ('default', "Default"),
+    ('custom_shader', "Custom Shader"),
+    ('mixed_shader', "Mixed Shader"),
+    ('principled_with_custom', "PBR+Custom"),
+    ('custom_with_principled', "Custom+PBR"),
+)
+
+# Material types that mix Principled BSDF and custom shaders and need a mixed shader strategy
+MIXED_STAT_KEYS = ('mixed_shader_network', 'principled_with_custom', 'custom_with_principled')
+
+
+def iter_node_materials(objects):
+    """Yield (object, material) for every material slot using a node material"""
+    return ((obj, slot.material) for obj in objects for slot in obj.material_slots
+            if slot.material and slot.material.use_nodes)
+
+
+def get_ui_stats(selection, analyze=True, limit=None):
+    """Return (selected mesh objects, material count per object, material count, material type counts, type distribution rows,
+    mixed shader material count) for the selected objects, recomputed only when the selection changes. Without analyze, or with
+    more than limit objects selected, the type counts, rows and mixed count are None unless this selection was analyzed before"""
+    selected_objects = [obj for obj in selection if obj.type == "MESH"]
+    if limit is not None and len(selected_objects) > limit:
+        analyze = False
+    key = (
+        tuple(obj.as_pointer() for obj in selected_objects),
+        tuple(slot.material.as_pointer() for obj in selected_objects for slot in obj.material_slots if slot.material),
+    )
+    if key == _STATS_CACHE['key'] and (_STATS_CACHE['value'][2] is not None or not analyze):
+        return (selected_objects,) + _STATS_CACHE['value']
+
+    node_materials = list(iter_node_materials(selected_objects))
+    total_materials = len(node_materials)
+    counts = {}
+    for obj, mat in node_materials:
+        counts[obj.as_pointer()] = counts.get(obj.as_pointer(), 0) + 1
+    mat_counts = [counts.get(obj.as_pointer(), 0) for obj in selected_objects]
+
+    material_stats = None
+    stats_rows = None
+    mixed_count = None
+    if analyze:
+        material_stats = {
+            'textured': 0,
+            'procedural': 0,
+            'mixed': 0,
+            'default': 0,
+            'custom_shader': 0,
+            'mixed_shader': 0,
+            'mixed_shader_network': 0,
+            'principled_with_custom': 0,
+            'custom_with_principled': 0
+        }
+        for obj, mat in node_materials:
+            try:
+                analysis = analyze_material_cached(mat)
+                mat_type = analysis.get('material_type', 'unknown')
+                if mat_type in material_stats:
+                    material_stats[mat_type] += 1
+                else:
+                    material_stats['default'] += 1
+            except Exception as e:
+                # 如果材质分析失败，计为默认材质
+                material_stats['default'] += 1
+                print(f"UI material analysis error: {e}")
+        stats_rows = [(label, material_stats[stat]) for stat, label in STAT_LABELS if material_stats[stat] > 0]
+        mixed_count = sum(material_stats[stat] for stat in MIXED_STAT_KEYS)
+
+    _STATS_CACHE['key'] = key
+    _STATS_CACHE['value'] = (tuple(mat_counts), total_materials, material_stats, stats_rows, mixed_count)
+    return (selected_objects,) + _STATS_CACHE['value']
+
+
+@persistent
+def invalidate_analysis_cache(scene, depsgraph):
+    """Drop cached analyses of materials whose shading changed, and the panel's UDIM tiles when a mesh changed"""
+    if _UDIM_CACHE['key'] is not None and depsgraph.id_type_updated('MESH'):
+        _UDIM_CACHE['key'] = None
+    if not _ANALYSIS_CACHE and not _OBJECT_INPUT_CACHE:
+        return
+    for update in depsgraph.updates:
+        if not update.is_updated_shading:
+            continue
+        if isinstance(update.id, bpy.types.Material):
+            _ANALYSIS_CACHE.pop(update.id.name_full, None)
+            _OBJECT_INPUT_CACHE.pop(update.id.name_full, None)
+            _STATS_CACHE['key'] = None
+        elif isinstance(update.id, bpy.types.NodeTree):
+            # A node group may be used by any material
+            _ANALYSIS_CACHE.clear()
+            _OBJECT_INPUT_CACHE.clear()
+            _STATS_CACHE['key'] = None
+            return
+
+
+@persistent
+def clear_analysis_cache(*args):
+    """Undo and file loads replace the nodes cached analyses point to"""
+    _ANALYSIS_CACHE.clear()
+    _OBJECT_INPUT_CACHE.clear()
+    _STATS_CACHE['key'] = None
+    _UDIM_CACHE['key'] = None
+
+
+ANALYSIS_CACHE_HANDLERS = (
+    (bpy.app.handlers.depsgraph_update_post, invalidate_analysis_cache),
+    (bpy.app.handlers.undo_post, clear_analysis_cache),
+    (bpy.app.handlers.redo_post, clear_analysis_cache),
+    (bpy.app.handlers.load_post, clear_analysis_cache),
+)
+
+
 @contextmanager
 def temporary_emission_surface(nt):
     """Temporarily replace shader connected to Material Output Surface with Emission for baking"""
@@ -867,6 +1287,105 @@ def temporary_emission_metallic(nt):
         yield temp_nodes
 
 
+# EnumProperty 选项, 模块级常量供场景属性和操作符共用
+SHADOW_MODE_ITEMS = (
+    ('WITH_SHADOWS', 'With Shadows', 'Include shadows in lighting baking (complete lighting)'),
+    ('NO_SHADOWS', 'No Shadows', 'Exclude shadows, only include direct lighting without shadows'),
+)
+
+MIXED_STRATEGY_ITEMS = (
+    ('SURFACE_OUTPUT', 'Full Surface Output', 'Bake complete Material Output Surface result (recommended)'),
+    ('PRINCIPLED_ONLY', 'Principled BSDF Only', 'Only bake Principled BSDF part, ignore custom shaders'),
+    ('CUSTOM_ONLY', 'Custom Shader Only', 'Try to bake only custom shader part (experimental)'),
+)
+
+ATLAS_LAYOUT_ITEMS = (
+    ('AUTO', 'Auto Layout', 'Automatically calculate the best layout'),
+    ('MANUAL', 'Manual Layout', 'Manually specify the number of columns and rows'),
+)
+
+UDIM_NAMING_ITEMS = (
+    ('STANDARD', 'Standard Mode', 'Material name.1001.Channel name.png'),
+    ('MARI', 'Mari Mode', 'Material name_1001_Channel name.png'),
+    ('MUDBOX', 'Mudbox Mode', 'Material name.Channel name.1001.png'),
+)
+
+COLORSPACE_MODE_ITEMS = (
+    ('AUTO', 'Auto Detection', 'Automatically assign appropriate color spaces based on channel type'),
+    ('CUSTOM', 'Custom Settings', 'Use custom color space settings for each channel type'),
+    ('MANUAL', 'Manual Override', 'Manually override color space for all textures'),
+)
+
+# 色彩空间选项, 相同的条目只定义一次
+CS_SRGB = ('sRGB', 'sRGB', 'sRGB color space')
+CS_NON_COLOR = ('Non-Color', 'Non-Color', 'Non-color data')
+CS_LINEAR_REC709 = ('Linear Rec.709', 'Linear Rec.709', 'Linear Rec.709 color space')
+CS_LINEAR_SRGB = ('Linear sRGB', 'Linear sRGB', 'Linear sRGB color space')
+CS_ACESCG = ('ACEScg', 'ACEScg', 'ACES working color space')
+CS_REC2020 = ('Rec.2020', 'Rec.2020', 'ITU-R BT.2020 color space')
+CS_RAW = ('Raw', 'Raw', 'Raw color data')
+CS_XYZ = ('XYZ', 'XYZ', 'CIE XYZ color space')
+
+CS_BASECOLOR_ITEMS = (
+    ('sRGB', 'sRGB', 'Standard sRGB color space (gamma corrected)'),
+    CS_LINEAR_REC709, CS_LINEAR_SRGB, CS_NON_COLOR, CS_ACESCG, CS_REC2020,
+)
+
+CS_NORMAL_ITEMS = (
+    ('Non-Color', 'Non-Color', 'Non-color data (recommended for normal maps)'),
+    CS_SRGB, CS_LINEAR_REC709, CS_RAW,
+)
+
+CS_ROUGHNESS_ITEMS = (
+    ('Non-Color', 'Non-Color', 'Non-color data (recommended for data maps)'),
+    CS_SRGB, CS_LINEAR_REC709, CS_RAW,
+)
+
+CS_EMISSION_ITEMS = (
+    ('sRGB', 'sRGB', 'sRGB color space (recommended for emission)'),
+    CS_LINEAR_REC709, CS_LINEAR_SRGB, CS_ACESCG, CS_NON_COLOR,
+)
+
+CS_MANUAL_ITEMS = (
+    CS_SRGB, CS_NON_COLOR, CS_LINEAR_REC709, CS_LINEAR_SRGB,
+    CS_ACESCG, CS_REC2020, CS_RAW, CS_XYZ,
+)
+
+# 各通道色彩空间枚举的参数, 场景属性和烘焙操作符共用
+COLORSPACE_ENUM_ARGS = {
+    'colorspace_basecolor': dict(
+        name="Base Color",
+        description="Color space for Base Color/Diffuse textures",
+        items=CS_BASECOLOR_ITEMS,
+        default='sRGB',
+    ),
+    'colorspace_normal': dict(
+        name="Normal Maps",
+        description="Color space for Normal Map textures",
+        items=CS_NORMAL_ITEMS,
+        default='Non-Color',
+    ),
+    'colorspace_roughness': dict(
+        name="Roughness/Metallic",
+        description="Color space for Roughness, Metallic and other data textures",
+        items=CS_ROUGHNESS_ITEMS,
+        default='Non-Color',
+    ),
+    'colorspace_emission': dict(
+        name="Emission",
+        description="Color space for Emission textures",
+        items=CS_EMISSION_ITEMS,
+        default='sRGB',
+    ),
+    'colorspace_manual_override': dict(
+        name="Manual Override",
+        description="Color space to use for all textures when using manual override mode",
+        items=CS_MANUAL_ITEMS,
+        default='sRGB',
+    ),
+}
+
+
 # -----------------------------------------------------------------------------
 # Bake Operator
 # -----------------------------------------------------------------------------
@@ -884,10 +1403,7 @@ class MBNL_OT_bake(Operator):
     lighting_shadow_mode: EnumProperty(
         name="Shadow Mode",
         description="Shadow handling mode for lighting baking",
-        items=[
-            ('WITH_SHADOWS', 'With Shadows', 'Include shadows in lighting baking (complete lighting)'),
-            ('NO_SHADOWS', 'No Shadows', 'Exclude shadows, only include direct lighting without shadows'),
-        ],
+        items=SHADOW_MODE_ITEMS,
         default='WITH_SHADOWS'
     )
     organize_folders: BoolProperty(name="Organize Folders", default=True, description="Create folders for each object/material/resolution")
@@ -939,11 +1455,7 @@ class MBNL_OT_bake(Operator):
     mixed_shader_strategy: EnumProperty(
         name="Mixed Shader Strategy",
         description="Processing strategy when material contains both Principled BSDF and custom shaders",
-        items=[
-            ('SURFACE_OUTPUT', 'Full Surface Output', 'Bake complete Material Output Surface result (recommended)'),
-            ('PRINCIPLED_ONLY', 'Principled BSDF Only', 'Only bake Principled BSDF part, ignore custom shaders'),
-            ('CUSTOM_ONLY', 'Custom Shader Only', 'Try to bake only custom shader part (experimental)'),
-        ],
+        items=MIXED_STRATEGY_ITEMS,
         default='SURFACE_OUTPUT'
     )
     
@@ -956,10 +1468,7 @@ class MBNL_OT_bake(Operator):
     atlas_layout_mode: EnumProperty(
         name="Atlas Layout",
         description="Layout mode for the atlas",
-        items=[
-            ('AUTO', 'Auto Layout', 'Automatically calculate optimal layout'),
-            ('MANUAL', 'Manual Layout', 'Manually specify rows and columns'),
-        ],
+        items=ATLAS_LAYOUT_ITEMS,
         default='AUTO'
     )
     atlas_cols: IntProperty(
@@ -1017,11 +1526,7 @@ class MBNL_OT_bake(Operator):
     udim_naming_mode: EnumProperty(
         name="UDIM Naming Mode",
         description="Naming convention for UDIM files",
-        items=[
-            ('STANDARD', 'Standard Mode', 'material_name.1001.channel_name.png'),
-            ('MARI', 'Mari Mode', 'material_name_1001_channel_name.png'),
-            ('MUDBOX', 'Mudbox Mode', 'material_name.channel_name.1001.png'),
-        ],
+        items=UDIM_NAMING_ITEMS,
         default='STANDARD'
     )
     
@@ -1029,81 +1534,16 @@ class MBNL_OT_bake(Operator):
     colorspace_mode: EnumProperty(
         name="Color Space Mode",
         description="How to handle color space assignments",
-        items=[
-            ('AUTO', 'Auto Detection', 'Automatically assign appropriate color spaces based on channel type'),
-            ('CUSTOM', 'Custom Settings', 'Use custom color space settings for each channel type'),
-            ('MANUAL', 'Manual Override', 'Manually override color space for all textures'),
-        ],
+        items=COLORSPACE_MODE_ITEMS,
         default='AUTO'
     )
     
     # Color space assignments for different channel types
-    colorspace_basecolor: EnumProperty(
-        name="Base Color",
-        description="Color space for Base Color/Diffuse textures",
-        items=[
-            ('sRGB', 'sRGB', 'Standard sRGB color space (gamma corrected)'),
-            ('Linear Rec.709', 'Linear Rec.709', 'Linear Rec.709 color space'),
-            ('Linear sRGB', 'Linear sRGB', 'Linear sRGB color space'),
-            ('Non-Color', 'Non-Color', 'Non-color data'),
-            ('ACEScg', 'ACEScg', 'ACES working color space'),
-            ('Rec.2020', 'Rec.2020', 'ITU-R BT.2020 color space'),
-        ],
-        default='sRGB'
-    )
-    
-    colorspace_normal: EnumProperty(
-        name="Normal Maps",
-        description="Color space for Normal Map textures",
-        items=[
-            ('Non-Color', 'Non-Color', 'Non-color data (recommended for normal maps)'),
-            ('sRGB', 'sRGB', 'sRGB color space'),
-            ('Linear Rec.709', 'Linear Rec.709', 'Linear Rec.709 color space'),
-            ('Raw', 'Raw', 'Raw color data'),
-        ],
-        default='Non-Color'
-    )
-    
-    colorspace_roughness: EnumProperty(
-        name="Roughness/Metallic",
-        description="Color space for Roughness, Metallic and other data textures",
-        items=[
-            ('Non-Color', 'Non-Color', 'Non-color data (recommended for data maps)'),
-            ('sRGB', 'sRGB', 'sRGB color space'),
-            ('Linear Rec.709', 'Linear Rec.709', 'Linear Rec.709 color space'),
-            ('Raw', 'Raw', 'Raw color data'),
-        ],
-        default='Non-Color'
-    )
-    
-    colorspace_emission: EnumProperty(
-        name="Emission",
-        description="Color space for Emission textures",
-        items=[
-            ('sRGB', 'sRGB', 'sRGB color space (recommended for emission)'),
-            ('Linear Rec.709', 'Linear Rec.709', 'Linear Rec.709 color space'),
-            ('Linear sRGB', 'Linear sRGB', 'Linear sRGB color space'),
-            ('ACEScg', 'ACEScg', 'ACES working color space'),
-            ('Non-Color', 'Non-Color', 'Non-color data'),
-        ],
-        default='sRGB'
-    )
-    
-    colorspace_manual_override: EnumProperty(
-        name="Manual Override",
-        description="Color space to use for all textures when using manual override mode",
-        items=[
-            ('sRGB', 'sRGB', 'sRGB color space'),
-            ('Non-Color', 'Non-Color', 'Non-color data'),
-            ('Linear Rec.709', 'Linear Rec.709', 'Linear Rec.709 color space'),
-            ('Linear sRGB', 'Linear sRGB', 'Linear sRGB color space'),
-            ('ACEScg', 'ACEScg', 'ACES working color space'),
-            ('Rec.2020', 'Rec.2020', 'ITU-R BT.2020 color space'),
-            ('Raw', 'Raw', 'Raw color data'),
-            ('XYZ', 'XYZ', 'CIE XYZ color space'),
-        ],
-        default='sRGB'
-    )
+    colorspace_basecolor: EnumProperty(**COLORSPACE_ENUM_ARGS['colorspace_basecolor'])
+    colorspace_normal: EnumProperty(**COLORSPACE_ENUM_ARGS['colorspace_normal'])
+    colorspace_roughness: EnumProperty(**COLORSPACE_ENUM_ARGS['colorspace_roughness'])
+    colorspace_emission: EnumProperty(**COLORSPACE_ENUM_ARGS['colorspace_emission'])
+    colorspace_manual_override: EnumProperty(**COLORSPACE_ENUM_ARGS['colorspace_manual_override'])
 
     def get_colorspace_for_channel(self, channel_suffix):
         """Determine the appropriate color space for a given channel based on user settings"""
@@ -1199,7 +1639,7 @@ class MBNL_OT_bake(Operator):
             # Apply color space if available, with fallbacks
             if target_colorspace in available_colorspaces or not available_colorspaces:
                 img.colorspace_settings.name = target_colorspace
-                self.report({'INFO'}, f"Set {channel_suffix} color space to {target_colorspace}")
+                self.log_info(lambda: f"Set {channel_suffix} color space to {target_colorspace}")
             else:
                 # Fallback logic
                 if channel_suffix in ['BaseColor', 'Emission', 'CustomShader']:
@@ -1264,9 +1704,9 @@ class MBNL_OT_bake(Operator):
                             if hasattr(obj.data, 'use_shadow'):
                                 obj.data.use_shadow = False
                     
-                    self.report({'INFO'}, f"No shadows mode: Disabled shadows for {len(original_light_settings)} light sources")
+                    self.log_info(lambda: f"No shadows mode: Disabled shadows for {len(original_light_settings)} light sources")
                 else:
-                    self.report({'INFO'}, "With shadows mode: Keeping all shadow settings")
+                    self.log_info("With shadows mode: Keeping all shadow settings")
                 
                 # 启用直接光照和间接光照
                 scene.render.bake.use_pass_direct = True
@@ -1277,7 +1717,7 @@ class MBNL_OT_bake(Operator):
                 if scene.cycles.max_bounces < 4:
                     scene.cycles.max_bounces = 4
                 
-                self.report({'INFO'}, f"Lighting baking settings enabled: Direct + Indirect + Color (Shadow mode: {shadow_mode})")
+                self.log_info(lambda: f"Lighting baking settings enabled: Direct + Indirect + Color (Shadow mode: {shadow_mode})")
             
             if pass_filter:
                 # 如果pass_filter是set类型，转换为Blender期望的格式
@@ -1307,107 +1747,724 @@ class MBNL_OT_bake(Operator):
                 if obj and obj.data and hasattr(obj.data, 'use_shadow'):
                     obj.data.use_shadow = light_setting['cast_shadow']
 
-    def execute(self, context):
-        ensure_cycles(context.scene)
+    def rebuild_material_nodes(self, mat, nt, primary_baked_images, input_mapping):
+        """Replace the material node tree with the baked textures wired into a Principled BSDF"""
+        nt.nodes.clear()
+        tex_nodes = {}
+        color_outputs = {}
+        
+        # 定义节点排列顺序和位置
+        node_order = [
+            'BaseColor', 'Roughness', 'Metallic', 'Normal',
+            'Subsurface', 'Transmission', 'Emission', 'Alpha',
+            'Specular', 'Clearcoat', 'ClearcoatRoughness', 'Sheen',
+            'Displacement', 'AO'
+        ]
         
-        # 确定输出目录
-        if context.scene.mbnl_use_custom_directory and context.scene.mbnl_custom_directory:
-            directory = bpy.path.abspath(context.scene.mbnl_custom_directory)
-            if not os.path.exists(directory):
+        # Texture nodes are stacked in one column, 150 units apart
+        baked_keys = [key for key in node_order if key in primary_baked_images]
+        for index, key in enumerate(baked_keys):
+            tex = nt.nodes.new('ShaderNodeTexImage')
+            tex.image = primary_baked_images[key]
+            tex.location = (-800, 400 - 150 * index)
+            tex.label = key
+            
+            # 设置正确的颜色空间
+            if tex.image:
+                self.set_image_colorspace(tex.image, key)
+            
+            tex_nodes[key] = tex
+            color_outputs[key] = tex.outputs['Color']
+
+        # 创建特殊节点
+        normal_map = None
+        if 'Normal' in tex_nodes:
+            normal_map = nt.nodes.new('ShaderNodeNormalMap')
+            normal_map.location = (-500, tex_nodes['Normal'].location.y)
+            normal_map.label = "Normal Map"
+
+        # 创建ColorRamp节点用于AO混合
+        ao_mix = None
+        if 'AO' in tex_nodes:
+            ao_mix = nt.nodes.new(MIX_NODE_ID)
+            if MIX_NODE_ID == 'ShaderNodeMix':
+                ao_mix.data_type = 'RGBA'
+            ao_mix.blend_type = 'MULTIPLY'
+            ao_mix.inputs[MIX_FAC].default_value = 0.5
+            ao_mix.location = (-300, tex_nodes['AO'].location.y)
+            ao_mix.label = "AO Mix"
+
+        # 创建位移节点
+        displacement_node = None
+        if 'Displacement' in tex_nodes:
+            displacement_node = nt.nodes.new('ShaderNodeDisplacement')
+            displacement_node.location = (0, -400)
+            displacement_node.label = "Displacement"
+
+        # 创建Principled BSDF
+        principled = nt.nodes.new('ShaderNodeBsdfPrincipled')
+        principled.location = (-100, 0)
+        principled.label = "Principled BSDF"
+
+        # 创建输出节点
+        output = nt.nodes.new('ShaderNodeOutputMaterial')
+        output.location = (300, 0)
+        output.label = "Material Output"
+
+        # Resolve Principled BSDF sockets once, links below use them directly
+        principled_inputs = {key: principled.inputs[name] for key, name in input_mapping.items() if name in principled.inputs}
+
+        # 安全连接函数
+        def safe_connect(from_node, from_output, to_node, to_input_name):
+            try:
+                nt.links.new(from_node.outputs[from_output], to_node.inputs[to_input_name])
+                return True
+            except KeyError:
+                self.report({'WARNING'}, f"Connection failed: {from_output} -> {to_input_name} (missing slot)")
+            return False
+
+        def connect_input(key, from_socket):
+            to_socket = principled_inputs.get(key)
+            if to_socket is not None:
+                nt.links.new(from_socket, to_socket)
+            else:
+                safe_connect(from_socket.node, from_socket.name, principled, input_mapping.get(key, key))
+
+        # 连接基础通道
+        if 'BaseColor' in tex_nodes:
+            if 'AO' in tex_nodes and ao_mix:
+                # 将BaseColor和AO混合
                 try:
-                    os.makedirs(directory, exist_ok=True)
-                    self.report({'INFO'}, f"Created custom output directory: {directory}")
-                except Exception as e:
-                    self.report({'ERROR'}, f"Cannot create custom directory: {str(e)}, using default directory")
-                    directory = bpy.path.abspath("//")
+                    nt.links.new(color_outputs['BaseColor'], ao_mix.inputs[MIX_IN[0]])
+                    nt.links.new(color_outputs['AO'], ao_mix.inputs[MIX_IN[1]])
+                    
+                    connect_input('BaseColor', ao_mix.outputs[MIX_OUT])
+                except (KeyError, RuntimeError) as e:
+                    self.report({'WARNING'}, f"AO mix failed, connecting directly to base color: {str(e)}")
+                    connect_input('BaseColor', color_outputs['BaseColor'])
             else:
-                self.report({'INFO'}, f"Using custom output directory: {directory}")
-        else:
-            directory = self.directory if self.directory else bpy.path.abspath("//")
-            if not context.scene.mbnl_use_custom_directory:
-                self.report({'INFO'}, f"Using default output directory: {directory}")
+                connect_input('BaseColor', color_outputs['BaseColor'])
         
-        # Check light sources settings (when lighting baking is enabled)
-        if self.include_lighting:
-            lights = [obj for obj in context.scene.objects if obj.type == 'LIGHT']
-            if not lights:
-                # Check world environment lighting
-                world = context.scene.world
-                has_world_light = False
-                if world and world.use_nodes:
-                    for node in world.node_tree.nodes:
-                        if node.type in ['TEX_ENVIRONMENT', 'TEX_SKY'] or node.bl_idname == 'ShaderNodeBackground':
-                            # Check if there's actual light intensity
-                            if node.bl_idname == 'ShaderNodeBackground':
-                                try:
-                                    strength = node.inputs['Strength'].default_value if 'Strength' in node.inputs else 1.0
-                                    if strength > 0.01:
-                                        has_world_light = True
-                                        break
-                                except:
-                                    has_world_light = True
-                                    break
-                            else:
-                                has_world_light = True
-                                break
-                
-                if not has_world_light:
-                    self.report({'WARNING'}, "Lighting baking enabled but no light sources found in scene. Results may be dark. Consider adding lights or world environment lighting.")
-                else:
-                    self.report({'INFO'}, "Using world environment lighting for baking")
-            else:
-                light_types = {}
-                for light in lights:
-                    light_type = light.data.type
-                    light_types[light_type] = light_types.get(light_type, 0) + 1
-                
-                light_info = ", ".join([f"{count} {ltype}" for ltype, count in light_types.items()])
-                self.report({'INFO'}, f"Found light sources: {light_info}, proceeding with lighting baking")
+        if 'Normal' in tex_nodes and normal_map:
+            try:
+                nt.links.new(color_outputs['Normal'], normal_map.inputs['Color'])
+                safe_connect(normal_map, 'Normal', principled, 'Normal')
+            except (KeyError, RuntimeError) as e:
+                self.report({'WARNING'}, f"Normal connection failed: {str(e)}")
+
+        # 连接其余PBR通道
+        direct_channels = [
+            'Roughness', 'Metallic',
+            'Subsurface', 'Transmission', 'Emission', 'Alpha',
+            'Specular', 'Clearcoat', 'ClearcoatRoughness', 'Sheen'
+        ]
         
-        # Check if there are selected objects
-        selected_objects = [obj for obj in context.selected_objects if obj.type == "MESH"]
-        if not selected_objects:
-            self.report({'WARNING'}, "Please select at least one mesh object")
-            return {'CANCELLED'}
-
-        total_materials = 0
-        processed_materials = 0
+        for key in direct_channels:
+            if key in color_outputs:
+                connect_input(key, color_outputs[key])
         
-        # Calculate total material count
-        for obj in selected_objects:
-            total_materials += len([slot for slot in obj.material_slots if slot.material and slot.material.use_nodes])
+        # 连接主要输出
+        try:
+            nt.links.new(principled.outputs['BSDF'], output.inputs['Surface'])
+        except (KeyError, RuntimeError) as e:
+            self.report({'ERROR'}, f"Main output connection failed: {str(e)}")
         
-        if total_materials == 0:
-            self.report({'WARNING'}, "Selected objects have no available materials")
-            return {'CANCELLED'}
+        # 连接位移
+        if 'Displacement' in tex_nodes and displacement_node:
+            try:
+                nt.links.new(color_outputs['Displacement'], displacement_node.inputs['Height'])
+                nt.links.new(displacement_node.outputs['Displacement'], output.inputs['Displacement'])
+            except (KeyError, RuntimeError) as e:
+                self.report({'WARNING'}, f"Displacement connection failed: {str(e)}")
 
-        # Normal baking pre-checks
-        if self.include_normal:
-            # Check UV mapping for normal baking
-            uv_issues = []
-            for obj in selected_objects:
-                if not obj.data.uv_layers:
-                    uv_issues.append(obj.name)
-                else:
-                    # Check if UV layer has valid data
-                    uv_layer = obj.data.uv_layers.active
-                    if not uv_layer:
-                        uv_issues.append(f"{obj.name} (no active UV)")
-            
-            if uv_issues:
-                self.report({'WARNING'}, f"Objects missing proper UV mapping for normal baking: {', '.join(uv_issues)}. Normal baking may fail.")
-            
-            # Check for auto smooth settings
-            auto_smooth_info = []
-            for obj in selected_objects:
-                if hasattr(obj.data, 'use_auto_smooth'):
+        connected_channels = list(primary_baked_images.keys())
+        self.log_info(lambda: f"Successfully rebuilt material '{mat.name}' nodes, connected {len(connected_channels)} channels: {', '.join(connected_channels)}")
+
+    def restore_basic_material(self, mat, nt):
+        """Fall back to a bare Principled BSDF -> Material Output tree after a failed rebuild"""
+        try:
+            nt.nodes.clear()
+            principled = nt.nodes.new('ShaderNodeBsdfPrincipled')
+            principled.location = (0, 0)
+            output = nt.nodes.new('ShaderNodeOutputMaterial')
+            output.location = (300, 0)
+            nt.links.new(principled.outputs['BSDF'], output.inputs['Surface'])
+            self.log_info(lambda: f"Restored basic nodes for material '{mat.name}'")
+        except RuntimeError as restore_error:
+            self.report({'ERROR'}, f"Cannot restore basic nodes for material '{mat.name}': {str(restore_error)}")
+
+    def log_info(self, message):
+        """Report an INFO message only when verbose logging is enabled, message may be a callable building the text"""
+        if self._verbose:
+            self.report({'INFO'}, message() if callable(message) else message)
+
+    def invoke(self, context, event):
+        copy_scene_settings(self, context.scene, BAKE_OP_PROPS)
+        return self.execute(context)
+
+    def execute(self, context):
+        self._verbose = getattr(context.scene, 'mbnl_verbose_logging', False)
+        ensure_cycles(context.scene)
+
+        # Run the whole bake session on the GPU when one is available
+        gpu_state = ensure_gpu_device(context.scene)
+        if gpu_state and gpu_state['backend']:
+            self.report({'INFO'}, f"Baking with Cycles GPU ({gpu_state['backend']})")
+        else:
+            self.report({'INFO'}, "No Cycles GPU device available, baking on CPU")
+
+        # PNG encoding and disk writes overlap with the next bake
+        self._io_pool = ThreadPoolExecutor(max_workers=2)
+        self._io_futures = []
+
+        # (mesh, material, channel, resolution, UDIM tile) -> [baked image, sharers still to bake, kept], see bake_channel
+        self._bake_cache = {}
+        # mesh name -> number of selected objects without modifiers using it, see bake_selected
+        self._mesh_users = {}
+
+        # Baking isolates each object in the selection, put the user's selection back afterwards
+        original_selection = list(context.selected_objects)
+        original_active = context.view_layer.objects.active
+
+        try:
+            with object_mode(context):
+                try:
+                    return self.bake_selected(context)
+                finally:
+                    for obj in context.selected_objects:
+                        obj.select_set(False)
+                    for obj in original_selection:
+                        obj.select_set(True)
+                    context.view_layer.objects.active = original_active
+        finally:
+            # Cached images nobody ended up linking to are only taking memory
+            for cached, _, _ in self._bake_cache.values():
+                try:
+                    if cached.users == 0:
+                        bpy.data.images.remove(cached)
+                except ReferenceError:
+                    pass
+            self._bake_cache.clear()
+            self.finish_image_writes()
+            restore_gpu_device(context.scene, gpu_state)
+
+    def save_baked_image(self, img, filepath, alpha, keep=False):
+        """Point the image at filepath and write it as PNG, in the background when Pillow is available"""
+        img.filepath_raw = filepath
+        img.file_format = 'PNG'
+        if PILImage is None:
+            img.save()
+            return
+
+        width, height = img.size
+        buf = np.empty(width * height * 4, dtype=np.float32)
+        img.pixels.foreach_get(buf)
+        future = self._io_pool.submit(write_png, filepath, buf, width, height, alpha)
+        # Kept images are turned into file images once their PNG exists, see finish_image_writes
+        self._io_futures.append((future, img if keep else None))
+
+    def finish_image_writes(self):
+        """Wait for pending background PNG writes, report failures and point kept images at their files"""
+        self._io_pool.shutdown(wait=True)
+        for future, img in self._io_futures:
+            error = future.exception()
+            if error:
+                self.report({'ERROR'}, f"Failed to write texture: {str(error)}")
+            elif img is not None:
+                # img.save() would have made it a file image, do the same for the Pillow write
+                try:
+                    img.source = 'FILE'
+                    img.reload()
+                except ReferenceError:
+                    pass
+        self._io_futures.clear()
+
+    def build_passes(self, mat, analysis, material_type, input_mapping):
+        """Return {suffix: (bake type, pass filter, alpha, emission input)} for the enabled channels of mat"""
+        passes = {}
+        
+        # Basic PBR channels
+        if self.include_basecolor:
+            if self.include_lighting:
+                # Include lighting: Use COMBINED baking to capture complete scene lighting
+                passes['BaseColor'] = ('COMBINED', None, True, None)
+                self.log_info(lambda: f"Material '{mat.name}' base color will include scene lighting (COMBINED method)")
+            else:
+                # No lighting: Use emission baking to ensure correct base color capture, regardless of metallic value
+                passes['BaseColor'] = ('EMIT', None, True, input_mapping.get('BaseColor'))
+        if self.include_roughness:
+            # For solid color materials, consider using emission baking as alternative
+            if material_type in ['procedural', 'default'] and not analysis.get('has_image_textures', False):
+                passes['Roughness'] = ('EMIT', None, False, input_mapping.get('Roughness'))
+                self.log_info(lambda: f"Material '{mat.name}' roughness will use Emission method baking (solid color material)")
+            else:
+                passes['Roughness'] = ('ROUGHNESS', None, False, None)
+        if self.include_metallic:
+            passes['Metallic'] = ('EMIT', None, False, input_mapping.get('Metallic'))
+        if self.include_normal:
+            passes['Normal'] = ('NORMAL', None, False, None)
+        
+        # Advanced PBR channels
+        if self.include_subsurface:
+            passes['Subsurface'] = ('EMIT', None, False, input_mapping.get('Subsurface'))
+        if self.include_transmission:
+            passes['Transmission'] = ('EMIT', None, False, input_mapping.get('Transmission'))
+        if self.include_emission:
+            passes['Emission'] = ('EMIT', None, False, input_mapping.get('Emission'))
+        if self.include_alpha:
+            passes['Alpha'] = ('EMIT', None, False, input_mapping.get('Alpha'))
+        if self.include_specular:
+            passes['Specular'] = ('EMIT', None, False, input_mapping.get('Specular'))
+        if self.include_clearcoat:
+            passes['Clearcoat'] = ('EMIT', None, False, input_mapping.get('Clearcoat'))
+        if self.include_clearcoat_roughness:
+            passes['ClearcoatRoughness'] = ('EMIT', None, False, input_mapping.get('ClearcoatRoughness'))
+        if self.include_sheen:
+            passes['Sheen'] = ('EMIT', None, False, input_mapping.get('Sheen'))
+        
+        # Special channels (not using emission method)
+        if self.include_displacement:
+            passes['Displacement'] = ('EMIT', None, False, None)  # Not through principled input
+        if self.include_ambient_occlusion:
+            passes['AO'] = ('AO', None, False, None)
+        
+        # Custom shader baking
+        if self.include_custom_shader:
+            # Check if there's a shader connected to Material Output
+            output_node = analysis.get('output_node')
+            if output_node and output_node.inputs['Surface'].is_linked:
+                passes['CustomShader'] = ('EMIT', None, True, None)  # Use special identifier for custom shader
+                self.log_info(lambda: f"Material '{mat.name}' will bake custom shader output")
+            else:
+                self.report({'WARNING'}, f"Material '{mat.name}' Material Output has no connected shader, skipping custom shader baking")
+        return passes
+
+    def output_paths(self, directory, obj, mat, suffix, width, height, udim_tile, multi_res):
+        """Return (file path, Blender image name, display name) for one baked texture"""
+        if self.organize_folders:
+            # Use folder organization: Object/Material/Resolution/Texture
+            res_folder = f"{width}x{height}"
+        
+            # Clean folder names (remove illegal characters)
+            encoded_obj_name = safe_encode_text(obj.name, "Unknown_Object")
+            encoded_mat_name = safe_encode_text(mat.name, "Unknown_Material")
+            safe_obj_name = "".join(c for c in encoded_obj_name if c.isalnum() or c in (' ', '-', '_')).rstrip()
+            safe_mat_name = "".join(c for c in encoded_mat_name if c.isalnum() or c in (' ', '-', '_')).rstrip()
+        
+            # Ensure folder names are not empty
+            if not safe_obj_name:
+                safe_obj_name = "Object"
+            if not safe_mat_name:
+                safe_mat_name = "Material"
+        
+            folder_path = os.path.join(directory, safe_obj_name, safe_mat_name, res_folder)
+            os.makedirs(folder_path, exist_ok=True)
+        
+            # UDIM file naming
+            if self.enable_udim and udim_tile != 1001:
+                if self.udim_naming_mode == 'STANDARD':
+                    img_name = f"{safe_mat_name}.{udim_tile}.{suffix.lower()}"
+                elif self.udim_naming_mode == 'MARI':
+                    img_name = f"{safe_mat_name}_{udim_tile}_{suffix.lower()}"
+                elif self.udim_naming_mode == 'MUDBOX':
+                    img_name = f"{safe_mat_name}.{suffix.lower()}.{udim_tile}"
+            else:
+                img_name = f"{suffix.lower()}"
+        
+            # 使用适当的Blender图像名称
+            image_name = f"{safe_obj_name}_{safe_mat_name}_{suffix.lower()}_{res_folder}"
+            if self.enable_udim and udim_tile != 1001:
+                image_name += f"_{udim_tile}"
+            full_path = os.path.join(folder_path, img_name + ".png")
+            return full_path, image_name, os.path.relpath(full_path, directory)
+
+        # Traditional naming method
+        encoded_obj_name = safe_encode_text(obj.name, "Object")
+        encoded_mat_name = safe_encode_text(mat.name, "Material")
+        safe_obj_name = "".join(c for c in encoded_obj_name if c.isalnum() or c in ('_', '-')).strip()
+        safe_mat_name = "".join(c for c in encoded_mat_name if c.isalnum() or c in ('_', '-')).strip()
+    
+        # Ensure names are not empty
+        if not safe_obj_name:
+            safe_obj_name = "Object"
+        if not safe_mat_name:
+            safe_mat_name = "Material"
+    
+        if multi_res:
+            if width == height:
+                img_name = f"{safe_obj_name}_{safe_mat_name}_{suffix.lower()}_{width}"
+            else:
+                img_name = f"{safe_obj_name}_{safe_mat_name}_{suffix.lower()}_{width}x{height}"
+        else:
+            img_name = f"{safe_obj_name}_{safe_mat_name}_{suffix.lower()}"
+    
+        return os.path.join(directory, img_name + ".png"), img_name, f"{img_name}.png"
+
+    def is_default_channel(self, job, suffix, emission_input):
+        """True when a solid color material leaves this channel at its default value, so it needs no bake"""
+        # For materials with only solid colors, check if certain channels need baking
+        if job['material_type'] not in ['procedural', 'default'] or job['analysis']['has_image_textures']:
+            return False
+        # Check if specific inputs are meaningful to bake
+        principled = job['analysis'].get('principled_node')
+        if not (emission_input and principled and emission_input in principled.inputs):
+            return False
+        input_socket = principled.inputs[emission_input]
+        if input_socket.is_linked:
+            return False
+        # Check if it's a default value
+        try:
+            default_val = input_socket.default_value
+            if suffix == 'Metallic' and abs(default_val) < 0.01:
+                is_default = True
+            elif suffix == 'Roughness' and abs(default_val - 0.5) < 0.01:
+                is_default = True
+            elif suffix in ['Subsurface', 'Transmission', 'Specular', 'Clearcoat', 'Sheen'] and abs(default_val) < 0.01:
+                is_default = True
+            else:
+                is_default = False
+        except (AttributeError, TypeError):
+            return False
+        if is_default:
+            self.log_info(lambda: f"Skipping {suffix} baking - using default value {default_val}")
+        return is_default
+
+    def store_baked_image(self, baked, suffix, img, full_path, alpha, keep, release=True):
+        """Write a baked image and record it for the node rebuild, freeing the buffer when the rebuild does not need it"""
+        self.save_baked_image(img, full_path, alpha, keep)
+        if keep:
+            baked[suffix] = img
+        else:
+            # Already on disk and not used by the node rebuild, free the buffer
+            baked[suffix] = full_path
+            if release:
+                bpy.data.images.remove(img)
+
+    def write_solid_channel(self, job, suffix, emission_input, baked, full_path, image_name, display_name, width, height, alpha, keep):
+        """Write a constant texture from the channel's default value instead of baking it, returns True on success"""
+        # 对于跳过的通道，创建一个纯色图像
+        img = None
+        try:
+            principled = job['analysis'].get('principled_node')
+            input_socket = principled.inputs[emission_input]
+            default_val = input_socket.default_value
+            # 创建纯色图像
+            if hasattr(default_val, '__len__') and len(default_val) >= 3:
+                # 颜色值
+                color = (default_val[0], default_val[1], default_val[2], 1.0)
+            else:
+                # 浮点值
+                color = (default_val, default_val, default_val, 1.0)
+        
+            if PILImage is not None:
+                # A constant color needs no Blender image buffer
+                write_solid_png(full_path, color, width, height, alpha)
+                if keep:
+                    img = bpy.data.images.load(full_path, check_existing=True)
+                    self.set_image_colorspace(img, suffix)
+                baked[suffix] = img if keep else full_path
+            else:
+                img = bpy.data.images.new(image_name, width=width, height=height, alpha=alpha)
+                self.set_image_colorspace(img, suffix)
+                pixels = np.tile(np.array(color, dtype=np.float32), width * height)
+                img.pixels.foreach_set(pixels)
+                self.store_baked_image(baked, suffix, img, full_path, alpha, keep)
+        
+            self.log_info(lambda: f"Created solid {suffix} texture ({width}×{height}): {display_name} (Value: {default_val})")
+            return True
+        except Exception as e:
+            self.report({'ERROR'}, f"Created solid {suffix} texture failed ({width}×{height}): {str(e)}")
+            # 清理失败的图像
+            if img is not None:
+                try:
+                    bpy.data.images.remove(img)
+                except ReferenceError:
+                    pass
+            return False
+
+    def enter_bake_route(self, stack, job, suffix, emission_input):
+        """Route job's material output for this channel, undone when stack closes, returns False when it cannot be baked"""
+        mat = job['mat']
+        nt = job['nt']
+        analysis = job['analysis']
+
+        if suffix == 'CustomShader':  # Custom shader baking
+            self.log_info("Using Emission method to bake custom shader output")
+            temp_emit = None
+        
+            # Check if it's a mixed shader material, if so apply strategy
+            if job['material_type'] in ['mixed_shader_network', 'principled_with_custom', 'custom_with_principled']:
+                self.log_info(lambda: f"Detected mixed shader material, applying strategy: {self.mixed_shader_strategy}")
+            
+                if self.mixed_shader_strategy == 'PRINCIPLED_ONLY':
+                    # Try to bake only Principled BSDF part
+                    principled_node = analysis.get('principled_node')
+                    if principled_node:
+                        self.log_info("According to strategy, baking only Principled BSDF part")
+                        temp_emit = stack.enter_context(temporary_principled_only_surface(nt, principled_node))
+                        if not temp_emit:
+                            self.report({'ERROR'}, "Cannot set Principled BSDF only baking, falling back to full surface output")
+                    else:
+                        self.report({'WARNING'}, "Principled BSDF node not found, using full surface output")
+                elif self.mixed_shader_strategy == 'CUSTOM_ONLY':
+                    # Try to bake only custom shader part
+                    self.log_info("According to strategy, attempting to bake only custom shader part (experimental)")
+                    custom_shaders = analysis.get('custom_shaders', [])
+                    if custom_shaders:
+                        # Select first custom shader
+                        first_custom = custom_shaders[0]['node']
+                        temp_emit = stack.enter_context(temporary_custom_shader_only_surface(nt, first_custom))
+                        if not temp_emit:
+                            self.report({'ERROR'}, "Cannot set custom shader only baking, falling back to full surface output")
+                    else:
+                        self.report({'WARNING'}, "Custom shader node not found, using full surface output")
+                else:  # SURFACE_OUTPUT or default
+                    self.log_info("Using full surface output strategy")
+            else:
+                # Non-mixed shader material, use original logic
+                # Get material output node and connected shader information
+                output_node = analysis.get('output_node')
+                if self._verbose and output_node and output_node.inputs['Surface'].is_linked:
+                    shader_node = output_node.inputs['Surface'].links[0].from_node
+                    shader_type = shader_node.bl_idname
+                    shader_name = shader_node.name
+                    self.log_info(lambda: f"Detected shader type: {shader_type} ('{shader_name}')")
+                
+                    # If it's a node group, show more information
+                    if shader_type == 'ShaderNodeNodeGroup':
+                        if hasattr(shader_node, 'node_tree') and shader_node.node_tree:
+                            group_name = shader_node.node_tree.name
+                            self.log_info(lambda: f"Node group name: {group_name}")
+                            # Show node group outputs
+                            self.log_info(lambda: f"Node group outputs: {list(shader_node.outputs.keys())}")
+
+            if not temp_emit:
+                temp_emit = stack.enter_context(temporary_emission_surface(nt))
+                if not temp_emit:
+                    self.report({'ERROR'}, f"Cannot set custom shader baking for material '{mat.name}', skipping {suffix}")
+                    return False
+        elif suffix == 'BaseColor' and self.include_lighting:  # 光影烘焙的基础色，保持原材质不变
+            self.log_info("使用COMBINED方法烘焙基础色，保持原材质设置以捕获光照")
+        
+            # 确保材质设置适合光影烘焙
+            principled = analysis.get('principled_node')
+            # 如果金属度太高，临时降低以获得更好的漫反射信息
+            if principled and 'Metallic' in principled.inputs and not principled.inputs['Metallic'].is_linked:
+                metallic = principled.inputs['Metallic']
+                original_metallic = metallic.default_value
+                if original_metallic > 0.8:
+                    metallic.default_value = 0.2
+                    # 恢复原始材质设置
+                    stack.callback(setattr, metallic, 'default_value', original_metallic)
+                    self.log_info(lambda: f"光影烘焙：临时降低金属度从 {original_metallic:.2f} 到 0.2 以更好捕获光照")
+        elif emission_input:  # Channels that need emission baking (except lighting base color)
+            if suffix == 'BaseColor':
+                self.log_info("Using Emission method to bake base color to ensure correct solid color capture")
+            stack.enter_context(temporary_emission_input(nt, emission_input))
+        return True
+
+    def bake_channel(self, context, obj, jobs, suffix, width, height, udim_tile, directory, multi_res, primary_resolution, scratch):
+        """Bake one channel for every material of obj, one Cycles bake per bake setup, returns the number of textures written"""
+        resolution_key = (width, height)
+        keep = self.replace_nodes and resolution_key == primary_resolution
+        written = 0
+
+        # Materials needing a real bake, grouped by bake setup: (bake type, pass filter, lighting) -> entries
+        groups = {}
+        for job in jobs:
+            if suffix not in job['passes']:
+                continue
+            btype, pfilter, alpha, emission_input = job['passes'][suffix]
+            mat = job['mat']
+            baked = job['baked_images'].setdefault(resolution_key, {})
+            full_path, image_name, display_name = self.output_paths(directory, obj, mat, suffix, width, height, udim_tile, multi_res)
+
+            # Adjust baking strategy based on material type
+            if self.is_default_channel(job, suffix, emission_input):
+                if self.write_solid_channel(job, suffix, emission_input, baked, full_path, image_name, display_name, width, height, alpha, keep):
+                    written += 1
+                continue
+
+            img = bpy.data.images.new(image_name, width=width, height=height, alpha=alpha)
+            # Set color space using the new system
+            self.set_image_colorspace(img, suffix)
+
+            # Objects sharing mesh data and material bake identical textures, unless
+            # the pass picks up lighting or the material reads per-object inputs
+            cache_key = None
+            if (btype in REUSABLE_BAKE_TYPES and not job['reads_object'] and not obj.modifiers
+                    and self._mesh_users.get(obj.data.name_full, 0) > 1):
+                cache_key = (obj.data.name_full, mat.name_full, suffix, resolution_key, udim_tile)
+            cached = self._bake_cache.get(cache_key)
+
+            if cached is not None:
+                self.log_info(lambda: f"Reusing {suffix} bake from shared mesh '{obj.data.name}'")
+                cached_img = cached[0]
+                try:
+                    buf = np.empty(width * height * 4, dtype=np.float32)
+                    cached_img.pixels.foreach_get(buf)
+                    img.pixels.foreach_set(buf)
+                    self.store_baked_image(baked, suffix, img, full_path, alpha, keep)
+                    written += 1
+                    self.log_info(lambda: f"Baked {suffix} texture ({width}×{height}): {display_name}")
+                except Exception as e:
+                    self.report({'ERROR'}, f"Baked {suffix} texture failed ({width}×{height}): {str(e)}")
+                    bpy.data.images.remove(img)
+                # Free the shared buffer once the last object using the mesh has copied it
+                cached[1] -= 1
+                if cached[1] <= 0:
+                    del self._bake_cache[cache_key]
+                    if not cached[2]:
+                        bpy.data.images.remove(cached_img)
+                continue
+
+            entry = {
+                'job': job, 'img': img, 'alpha': alpha, 'emission_input': emission_input,
+                'path': full_path, 'display': display_name, 'cache_key': cache_key,
+            }
+            groups.setdefault((btype, pfilter, btype == 'COMBINED'), []).append(entry)
+
+        for (btype, pfilter, use_lighting), entries in groups.items():
+            stored = []
+            try:
+                with ExitStack() as stack:
+                    baked_entries = [entry for entry in entries
+                                     if self.enter_bake_route(stack, entry['job'], suffix, entry['emission_input'])]
+                    if baked_entries:
+                        targets = {entry['job']['mat'].name_full: entry['img'] for entry in baked_entries}
+                        for job in jobs:
+                            job['bake_node'].image = targets.get(job['mat'].name_full, scratch)
+                        self.bake_generic(context, btype, baked_entries[0]['img'], self.margin, pfilter,
+                                          use_lighting=use_lighting, shadow_mode=self.lighting_shadow_mode)
+
+                for entry in baked_entries:
+                    img = entry['img']
+                    if entry['cache_key'] is not None:
+                        sharers = self._mesh_users[entry['cache_key'][0]] - 1
+                        self._bake_cache[entry['cache_key']] = [img, sharers, keep]
+                    baked = entry['job']['baked_images'][resolution_key]
+                    self.store_baked_image(baked, suffix, img, entry['path'], entry['alpha'], keep,
+                                           release=entry['cache_key'] is None)
+                    stored.append(entry)
+                    written += 1
+                    self.log_info(lambda: f"Baked {suffix} texture ({width}×{height}): {entry['display']}")
+            except Exception as e:
+                self.report({'ERROR'}, f"Baked {suffix} texture failed ({width}×{height}): {str(e)}")
+
+            # 清理失败的图像
+            for entry in entries:
+                if not any(entry is done for done in stored):
+                    try:
+                        bpy.data.images.remove(entry['img'])
+                    except ReferenceError:
+                        pass
+        return written
+
+    def bake_selected(self, context):
+        # 确定输出目录
+        if context.scene.mbnl_use_custom_directory and context.scene.mbnl_custom_directory:
+            directory = bpy.path.abspath(context.scene.mbnl_custom_directory)
+            if not os.path.exists(directory):
+                try:
+                    os.makedirs(directory, exist_ok=True)
+                    self.report({'INFO'}, f"Created custom output directory: {directory}")
+                except Exception as e:
+                    self.report({'ERROR'}, f"Cannot create custom directory: {str(e)}, using default directory")
+                    directory = bpy.path.abspath("//")
+            else:
+                self.report({'INFO'}, f"Using custom output directory: {directory}")
+        else:
+            directory = self.directory if self.directory else bpy.path.abspath("//")
+            if not context.scene.mbnl_use_custom_directory:
+                self.report({'INFO'}, f"Using default output directory: {directory}")
+        
+        # Check light sources settings (when lighting baking is enabled)
+        if self.include_lighting:
+            lights = [obj for obj in context.scene.objects if obj.type == 'LIGHT']
+            if not lights:
+                # Check world environment lighting
+                world = context.scene.world
+                has_world_light = False
+                if world and world.use_nodes:
+                    for node in world.node_tree.nodes:
+                        if node.type in ['TEX_ENVIRONMENT', 'TEX_SKY'] or node.bl_idname == 'ShaderNodeBackground':
+                            # Check if there's actual light intensity
+                            if node.bl_idname == 'ShaderNodeBackground':
+                                try:
+                                    strength = node.inputs['Strength'].default_value if 'Strength' in node.inputs else 1.0
+                                    if strength > 0.01:
+                                        has_world_light = True
+                                        break
+                                except:
+                                    has_world_light = True
+                                    break
+                            else:
+                                has_world_light = True
+                                break
+                
+                if not has_world_light:
+                    self.report({'WARNING'}, "Lighting baking enabled but no light sources found in scene. Results may be dark. Consider adding lights or world environment lighting.")
+                else:
+                    self.log_info("Using world environment lighting for baking")
+            else:
+                light_types = {}
+                for light in lights:
+                    light_type = light.data.type
+                    light_types[light_type] = light_types.get(light_type, 0) + 1
+                
+                light_info = ", ".join([f"{count} {ltype}" for ltype, count in light_types.items()])
+                self.log_info(lambda: f"Found light sources: {light_info}, proceeding with lighting baking")
+        
+        # Check if there are selected objects
+        selected_objects = [obj for obj in context.selected_objects if obj.type == "MESH"]
+        if not selected_objects:
+            self.report({'WARNING'}, "Please select at least one mesh object")
+            return {'CANCELLED'}
+
+        # Only meshes used by several selected objects are worth caching bakes for, see bake_channel
+        for obj in selected_objects:
+            if not obj.modifiers:
+                self._mesh_users[obj.data.name_full] = self._mesh_users.get(obj.data.name_full, 0) + 1
+
+        total_materials = 0
+        processed_materials = 0
+        total_baked_images = 0
+        
+        # Calculate total material count
+        for obj in selected_objects:
+            total_materials += len({slot.material.name_full for slot in obj.material_slots if slot.material and slot.material.use_nodes})
+        
+        if total_materials == 0:
+            self.report({'WARNING'}, "Selected objects have no available materials")
+            return {'CANCELLED'}
+
+        # Normal baking pre-checks
+        if self.include_normal:
+            # Check UV mapping for normal baking
+            uv_issues = []
+            for obj in selected_objects:
+                if not obj.data.uv_layers:
+                    uv_issues.append(obj.name)
+                else:
+                    # Check if UV layer has valid data
+                    uv_layer = obj.data.uv_layers.active
+                    if not uv_layer:
+                        uv_issues.append(f"{obj.name} (no active UV)")
+            
+            if uv_issues:
+                self.report({'WARNING'}, f"Objects missing proper UV mapping for normal baking: {', '.join(uv_issues)}. Normal baking may fail.")
+            
+            # Check for auto smooth settings
+            auto_smooth_info = []
+            for obj in selected_objects:
+                if hasattr(obj.data, 'use_auto_smooth'):
                     if not obj.data.use_auto_smooth:
                         auto_smooth_info.append(obj.name)
             
             if auto_smooth_info:
-                self.report({'INFO'}, f"Consider enabling Auto Smooth for better normal baking results on: {', '.join(auto_smooth_info)}")
+                self.log_info(lambda: f"Consider enabling Auto Smooth for better normal baking results on: {', '.join(auto_smooth_info)}")
             
-            self.report({'INFO'}, "Normal baking will use Tangent Space (standard for games/realtime rendering)")
+            self.log_info("Normal baking will use Tangent Space (standard for games/realtime rendering)")
 
         # Provide additional information and optimization settings for lighting baking
         if self.include_lighting:
@@ -1415,48 +2472,28 @@ class MBNL_OT_bake(Operator):
             
             # Save original settings
             original_samples = scene.cycles.samples
-            original_device = scene.cycles.device
-            
+
             # Ensure sufficient samples for lighting baking
             min_samples = 128
             if hasattr(scene.cycles, 'samples'):
                 if scene.cycles.samples < min_samples:
                     scene.cycles.samples = min_samples
-                    self.report({'INFO'}, f"Lighting baking: Sample count adjusted to {min_samples} to ensure quality")
+                    self.log_info(lambda: f"Lighting baking: Sample count adjusted to {min_samples} to ensure quality")
                 else:
-                    self.report({'INFO'}, f"Lighting baking: Current sample count {scene.cycles.samples}")
-            
-            # Check GPU acceleration status
-            try:
-                if scene.cycles.device == 'CPU':
-                    # Try to check if GPU devices are available
-                    cycles_prefs = bpy.context.preferences.addons.get('cycles')
-                    if cycles_prefs and hasattr(cycles_prefs.preferences, 'devices'):
-                        gpu_devices = [device for device in cycles_prefs.preferences.devices if device.type in ['CUDA', 'OPENCL', 'OPTIX', 'HIP']]
-                        if gpu_devices:
-                            scene.cycles.device = 'GPU'
-                            self.report({'INFO'}, "Lighting baking: GPU acceleration enabled to improve baking speed")
-                        else:
-                            self.report({'INFO'}, "Lighting baking: Using CPU rendering (no available GPU detected)")
-                    else:
-                        self.report({'INFO'}, "Lighting baking: Using CPU rendering")
-                else:
-                    self.report({'INFO'}, "Lighting baking: GPU acceleration already enabled")
-            except Exception as e:
-                self.report({'INFO'}, f"Lighting baking: GPU detection failed, using current device: {scene.cycles.device}")
+                    self.log_info(lambda: f"Lighting baking: Current sample count {scene.cycles.samples}")
             
             # Set appropriate denoising options
             if hasattr(scene.cycles, 'use_denoising'):
                 scene.cycles.use_denoising = True
-                self.report({'INFO'}, "Lighting baking: Denoising enabled to improve quality")
+                self.log_info("Lighting baking: Denoising enabled to improve quality")
             
-            self.report({'INFO'}, "Note: Lighting baking quality depends on scene lighting setup and render sample count")
+            self.log_info("Note: Lighting baking quality depends on scene lighting setup and render sample count")
         
         # Folder organization information
         if self.organize_folders:
-            self.report({'INFO'}, "Folder organization enabled - Files will be saved in Object/Material/Resolution structure")
+            self.log_info("Folder organization enabled - Files will be saved in Object/Material/Resolution structure")
         else:
-            self.report({'INFO'}, "Using traditional file naming - All files saved in same directory")
+            self.log_info("Using traditional file naming - All files saved in same directory")
         
         # Determine resolutions to bake
         if self.enable_multi_resolution:
@@ -1518,19 +2555,28 @@ class MBNL_OT_bake(Operator):
                             custom_info.append(f'{width}×{height}(custom)')
                 
                 all_info = preset_info + custom_info
-                self.report({'INFO'}, f"Will export the following resolutions: {', '.join(all_info)}")
+                self.log_info(lambda: f"Will export the following resolutions: {', '.join(all_info)}")
         else:
             resolutions = [(self.resolution, self.resolution)]
 
         self.report({'INFO'}, f"Starting to process {len(selected_objects)} objects with {total_materials} materials")
 
+        primary_resolution = max(resolutions, key=lambda x: x[0] * x[1])  # 用于节点重建的主分辨率（最大面积）
+
+        # 创建适合当前Blender版本的输入名称映射
+        input_mapping = create_input_mapping()
+
         for obj in selected_objects:
+            # bpy.ops.object.bake writes every selected object, keep only this one selected
+            for other in context.selected_objects:
+                other.select_set(False)
+            obj.select_set(True)
+            context.view_layer.objects.active = obj
+
             # Ensure object has UV layers
             if not obj.data.uv_layers:
-                self.report({'INFO'}, f"Auto-creating UV mapping for object '{obj.name}'")
+                self.log_info(lambda: f"Auto-creating UV mapping for object '{obj.name}'")
                 smart_uv(obj)
-            
-            context.view_layer.objects.active = obj
 
             # UDIM detection and setup
             udim_tiles = []
@@ -1538,29 +2584,33 @@ class MBNL_OT_bake(Operator):
                 if self.udim_auto_detect:
                     udim_tiles = detect_udim_tiles(obj)
                     if udim_tiles:
-                        self.report({'INFO'}, f"Detected UDIM tiles: {udim_tiles}")
+                        self.log_info(lambda: f"Detected UDIM tiles: {udim_tiles}")
                     else:
                         self.report({'WARNING'}, f"Object '{obj.name}' has no UDIM tiles detected, using regular baking")
                         udim_tiles = [1001]  # Default to use 1001 tile
                 else:
                     # Use specified range
                     udim_tiles = list(range(self.udim_range_start, self.udim_range_end + 1))
-                    self.report({'INFO'}, f"Using specified UDIM range: {udim_tiles}")
+                    self.log_info(lambda: f"Using specified UDIM range: {udim_tiles}")
             else:
                 # Non-UDIM mode, use virtual tile 1001
                 udim_tiles = [1001]
 
-            # Process all material slots of the object
-            material_slots = [slot for slot in obj.material_slots if slot.material and slot.material.use_nodes]
+            # Process all materials of the object, once each even when several slots share one
+            materials = []
+            for slot in obj.material_slots:
+                if slot.material and slot.material.use_nodes and slot.material not in materials:
+                    materials.append(slot.material)
             
-            if not material_slots:
-                self.report({'INFO'}, f"Object '{obj.name}' has no available materials, skipping")
+            if not materials:
+                self.log_info(lambda: f"Object '{obj.name}' has no available materials, skipping")
                 continue
                 
-            self.report({'INFO'}, f"Processing object '{obj.name}' with {len(material_slots)} materials")
+            self.log_info(lambda: f"Processing object '{obj.name}' with {len(materials)} materials")
 
-            for slot in material_slots:
-                mat = slot.material
+            # Set up every material first so each channel is baked for all of them in one go
+            jobs = []
+            for mat in materials:
                 processed_materials += 1
                 
                 # Analyze material type (with error handling)
@@ -1573,632 +2623,133 @@ class MBNL_OT_bake(Operator):
                     analysis = {'material_type': 'unknown', 'has_image_textures': False}
                 
                 safe_mat_name = safe_encode_text(mat.name, "Unnamed Material")
-                self.report({'INFO'}, f"Processing material '{safe_mat_name}' ({processed_materials}/{total_materials}) - Type: {material_type}")
+                self.log_info(lambda: f"Processing material '{safe_mat_name}' ({processed_materials}/{total_materials}) - Type: {material_type}")
                 
                 # Decide processing strategy based on material type
                 if material_type == 'unknown':
-                    self.report({'INFO'}, f"Material '{mat.name}' type unknown, attempting default processing")
+                    self.log_info(lambda: f"Material '{mat.name}' type unknown, attempting default processing")
                 elif material_type == 'default':
-                    self.report({'INFO'}, f"Material '{mat.name}' uses default settings, will bake default values")
+                    self.log_info(lambda: f"Material '{mat.name}' uses default settings, will bake default values")
                 elif material_type == 'textured':
                     texture_count = len(analysis.get('texture_nodes', []))
-                    self.report({'INFO'}, f"Material '{mat.name}' contains {texture_count} image textures")
+                    self.log_info(lambda: f"Material '{mat.name}' contains {texture_count} image textures")
                 elif material_type == 'procedural':
                     pure_colors = analysis.get('pure_color_inputs', [])
                     if pure_colors:
-                        self.report({'INFO'}, f"Material '{mat.name}' uses solid color values: {', '.join(pure_colors)}")
+                        self.log_info(lambda: f"Material '{mat.name}' uses solid color values: {', '.join(pure_colors)}")
                     else:
-                        self.report({'INFO'}, f"Material '{mat.name}' uses procedural nodes")
+                        self.log_info(lambda: f"Material '{mat.name}' uses procedural nodes")
                 elif material_type == 'mixed':
-                    self.report({'INFO'}, f"Material '{mat.name}' mixes textures and solid colors")
+                    self.log_info(lambda: f"Material '{mat.name}' mixes textures and solid colors")
                 elif material_type == 'custom_shader':
                     custom_shaders = analysis.get('custom_shaders', [])
                     shader_names = [shader['label'] for shader in custom_shaders[:3]]  # Show first 3
                     if len(custom_shaders) <= 3:
-                        self.report({'INFO'}, f"Material '{mat.name}' uses custom shaders: {', '.join(shader_names)}")
+                        self.log_info(lambda: f"Material '{mat.name}' uses custom shaders: {', '.join(shader_names)}")
                     else:
-                        self.report({'INFO'}, f"Material '{mat.name}' uses custom shaders: {', '.join(shader_names)} + {len(custom_shaders)} total")
+                        self.log_info(lambda: f"Material '{mat.name}' uses custom shaders: {', '.join(shader_names)} + {len(custom_shaders)} total")
                 elif material_type == 'mixed_shader':
                     custom_count = len(analysis.get('custom_shaders', []))
-                    self.report({'INFO'}, f"Material '{mat.name}' mixes Principled BSDF with {custom_count} custom shaders")
+                    self.log_info(lambda: f"Material '{mat.name}' mixes Principled BSDF with {custom_count} custom shaders")
                 elif material_type == 'mixed_shader_network':
                     mix_info = analysis.get('shader_network', {})
                     mix_node_name = mix_info.get('mix_node', {}).get('name', 'Unknown')
-                    self.report({'INFO'}, f"Material '{mat.name}' uses mixed shader network (Mix node: {mix_node_name})")
-                    self.report({'INFO'}, f"Mixed shader strategy: {self.mixed_shader_strategy}")
+                    self.log_info(lambda: f"Material '{mat.name}' uses mixed shader network (Mix node: {mix_node_name})")
+                    self.log_info(lambda: f"Mixed shader strategy: {self.mixed_shader_strategy}")
                 elif material_type == 'principled_with_custom':
                     custom_count = len(analysis.get('custom_shaders', []))
-                    self.report({'INFO'}, f"Material '{mat.name}' is Principled BSDF-based with {custom_count} custom shaders")
+                    self.log_info(lambda: f"Material '{mat.name}' is Principled BSDF-based with {custom_count} custom shaders")
                 elif material_type == 'custom_with_principled':
-                    self.report({'INFO'}, f"Material '{mat.name}' is custom shader-based with Principled BSDF")
+                    self.log_info(lambda: f"Material '{mat.name}' is custom shader-based with Principled BSDF")
+
+                # Checked before the bake node is added so the fingerprint matches the next object using mat
+                reads_object = material_reads_object(mat)
 
                 nt = mat.node_tree
                 bake_node = nt.nodes.new("ShaderNodeTexImage")
                 bake_node.select = True
                 nt.nodes.active = bake_node
 
-                # 为不同分辨率存储烘焙的图像
-                all_baked_images = {}  # 格式: {(width, height): {suffix: image}}
-                primary_resolution = max(resolutions, key=lambda x: x[0] * x[1])  # 用于节点重建的主分辨率（最大面积）
-
-                # 创建适合当前Blender版本的输入名称映射
-                input_mapping = create_input_mapping()
+                jobs.append({
+                    'mat': mat,
+                    'nt': nt,
+                    'bake_node': bake_node,
+                    'analysis': analysis,
+                    'material_type': material_type,
+                    'reads_object': reads_object,
+                    'passes': self.build_passes(mat, analysis, material_type, input_mapping),
+                    # 为不同分辨率存储烘焙的图像
+                    'baked_images': {},  # 格式: {(width, height): {suffix: image or file path}}
+                })
 
-                # Build pass list based on selections
-                passes = []
-                
-                # Basic PBR channels
-                if self.include_basecolor:
-                    if self.include_lighting:
-                        # Include lighting: Use COMBINED baking to capture complete scene lighting
-                        passes.append(('BaseColor', 'COMBINED', None, True, None))
-                        self.report({'INFO'}, f"Material '{mat.name}' base color will include scene lighting (COMBINED method)")
-                    else:
-                        # No lighting: Use emission baking to ensure correct base color capture, regardless of metallic value
-                        passes.append(('BaseColor', 'EMIT', None, True, input_mapping.get('BaseColor')))
-                if self.include_roughness:
-                    # For solid color materials, consider using emission baking as alternative
-                    if material_type in ['procedural', 'default'] and not analysis.get('has_image_textures', False):
-                        passes.append(('Roughness', 'EMIT', None, False, input_mapping.get('Roughness')))
-                        self.report({'INFO'}, f"Material '{mat.name}' roughness will use Emission method baking (solid color material)")
-                    else:
-                        passes.append(('Roughness', 'ROUGHNESS', None, False, None))
-                if self.include_metallic:
-                    passes.append(('Metallic', 'EMIT', None, False, input_mapping.get('Metallic')))
-                if self.include_normal:
-                    passes.append(('Normal', 'NORMAL', None, False, None))
-                
-                # Advanced PBR channels
-                if self.include_subsurface:
-                    passes.append(('Subsurface', 'EMIT', None, False, input_mapping.get('Subsurface')))
-                if self.include_transmission:
-                    passes.append(('Transmission', 'EMIT', None, False, input_mapping.get('Transmission')))
-                if self.include_emission:
-                    passes.append(('Emission', 'EMIT', None, False, input_mapping.get('Emission')))
-                if self.include_alpha:
-                    passes.append(('Alpha', 'EMIT', None, False, input_mapping.get('Alpha')))
-                if self.include_specular:
-                    passes.append(('Specular', 'EMIT', None, False, input_mapping.get('Specular')))
-                if self.include_clearcoat:
-                    passes.append(('Clearcoat', 'EMIT', None, False, input_mapping.get('Clearcoat')))
-                if self.include_clearcoat_roughness:
-                    passes.append(('ClearcoatRoughness', 'EMIT', None, False, input_mapping.get('ClearcoatRoughness')))
-                if self.include_sheen:
-                    passes.append(('Sheen', 'EMIT', None, False, input_mapping.get('Sheen')))
-                
-                # Special channels (not using emission method)
-                if self.include_displacement:
-                    passes.append(('Displacement', 'EMIT', None, False, None))  # Not through principled input
-                if self.include_ambient_occlusion:
-                    passes.append(('AO', 'AO', None, False, None))
-                
-                # Custom shader baking
-                if self.include_custom_shader:
-                    # Check if there's a shader connected to Material Output
-                    output_node = analysis.get('output_node')
-                    if output_node and output_node.inputs['Surface'].is_linked:
-                        passes.append(('CustomShader', 'EMIT', None, True, None))  # Use special identifier for custom shader
-                        self.report({'INFO'}, f"Material '{mat.name}' will bake custom shader output")
-                    else:
-                        self.report({'WARNING'}, f"Material '{mat.name}' Material Output has no connected shader, skipping custom shader baking")
+            # Channels in bake order, across all materials of the object
+            pass_order = []
+            for job in jobs:
+                for suffix in job['passes']:
+                    if suffix not in pass_order:
+                        pass_order.append(suffix)
 
-                # Bake for each resolution
-                for res_idx, (width, height) in enumerate(resolutions):
-                    self.report({'INFO'}, f"Starting baking at resolution {width}×{height} ({res_idx + 1}/{len(resolutions)})")
-                    
-                    try:
-                        resolution_key = (width, height)
-                        if resolution_key not in all_baked_images:
-                            all_baked_images[resolution_key] = {}
-                        
-                        # UDIM tile loop
-                        for udim_tile in udim_tiles:
-                            if self.enable_udim and len(udim_tiles) > 1:
-                                self.report({'INFO'}, f"Processing UDIM tile {udim_tile}")
-                                
-                                # Set UDIM baking area
-                                if udim_tile != 1001:  # Only non-default tiles need special handling
-                                    original_uvs = normalize_udim_uvs_for_baking(obj, udim_tile)
-                                else:
-                                    original_uvs = {}
-                            else:
-                                original_uvs = {}
-                            
-                            try:
-                                # Bake for each channel
-                                for suffix, btype, pfilter, alpha, emission_input in passes:
-                                    # Generate file names and paths
-                                    if self.organize_folders:
-                                        # Use folder organization: Object/Material/Resolution/Texture
-                                        if width == height:
-                                            res_folder = f"{width}x{height}"
-                                        else:
-                                            res_folder = f"{width}x{height}"
-                                        
-                                        # Clean folder names (remove illegal characters)
-                                        encoded_obj_name = safe_encode_text(obj.name, "Unknown_Object")
-                                        encoded_mat_name = safe_encode_text(mat.name, "Unknown_Material")
-                                        safe_obj_name = "".join(c for c in encoded_obj_name if c.isalnum() or c in (' ', '-', '_')).rstrip()
-                                        safe_mat_name = "".join(c for c in encoded_mat_name if c.isalnum() or c in (' ', '-', '_')).rstrip()
-                                        
-                                        # Ensure folder names are not empty
-                                        if not safe_obj_name:
-                                            safe_obj_name = "Object"
-                                        if not safe_mat_name:
-                                            safe_mat_name = "Material"
-                                        
-                                        folder_path = os.path.join(directory, safe_obj_name, safe_mat_name, res_folder)
-                                        os.makedirs(folder_path, exist_ok=True)
-                                        
-                                        # UDIM file naming
-                                        if self.enable_udim and udim_tile != 1001:
-                                            if self.udim_naming_mode == 'STANDARD':
-                                                img_name = f"{safe_mat_name}.{udim_tile}.{suffix.lower()}"
-                                            elif self.udim_naming_mode == 'MARI':
-                                                img_name = f"{safe_mat_name}_{udim_tile}_{suffix.lower()}"
-                                            elif self.udim_naming_mode == 'MUDBOX':
-                                                img_name = f"{safe_mat_name}.{suffix.lower()}.{udim_tile}"
-                                        else:
-                                            img_name = f"{suffix.lower()}"
-                                        
-                                        blender_img_name = f"{safe_obj_name}_{safe_mat_name}_{suffix.lower()}_{res_folder}"
-                                        if self.enable_udim and udim_tile != 1001:
-                                            blender_img_name += f"_{udim_tile}"
-                                        full_path = os.path.join(folder_path, img_name + ".png")
-                                    else:
-                                        # Traditional naming method
-                                        encoded_obj_name = safe_encode_text(obj.name, "Object")
-                                        encoded_mat_name = safe_encode_text(mat.name, "Material")
-                                        safe_obj_name = "".join(c for c in encoded_obj_name if c.isalnum() or c in ('_', '-')).strip()
-                                        safe_mat_name = "".join(c for c in encoded_mat_name if c.isalnum() or c in ('_', '-')).strip()
-                                        
-                                        # Ensure names are not empty
-                                        if not safe_obj_name:
-                                            safe_obj_name = "Object"
-                                        if not safe_mat_name:
-                                            safe_mat_name = "Material"
-                                        
-                                        if len(resolutions) > 1:
-                                            if width == height:
-                                                img_name = f"{safe_obj_name}_{safe_mat_name}_{suffix.lower()}_{width}"
-                                            else:
-                                                img_name = f"{safe_obj_name}_{safe_mat_name}_{suffix.lower()}_{width}x{height}"
-                                        else:
-                                            img_name = f"{safe_obj_name}_{safe_mat_name}_{suffix.lower()}"
-                                        
-                                        full_path = os.path.join(directory, img_name + ".png")
-                                    
-                                    # 使用适当的Blender图像名称
-                                    if self.organize_folders:
-                                        img = bpy.data.images.new(blender_img_name, width=width, height=height, alpha=alpha)
-                                    else:
-                                        img = bpy.data.images.new(img_name, width=width, height=height, alpha=alpha)
-                                    
-                                    # Set color space using the new system
-                                    self.set_image_colorspace(img, suffix)
-                                    
-                                    bake_node.image = img
-
-                                    # Adjust baking strategy based on material type
-                                    should_bake = True
-                                    
-                                    # For materials with only solid colors, check if certain channels need baking
-                                    if material_type in ['procedural', 'default'] and not analysis['has_image_textures']:
-                                        # Check if specific inputs are meaningful to bake
-                                        if emission_input:
-                                            principled = analysis.get('principled_node')
-                                            if principled and emission_input in principled.inputs:
-                                                input_socket = principled.inputs[emission_input]
-                                                if not input_socket.is_linked:
-                                                    # Check if it's a default value
-                                                    try:
-                                                        default_val = input_socket.default_value
-                                                        if suffix == 'Metallic' and abs(default_val) < 0.01:
-                                                            self.report({'INFO'}, f"Skipping {suffix} baking - using default value {default_val}")
-                                                            should_bake = False
-                                                        elif suffix == 'Roughness' and abs(default_val - 0.5) < 0.01:
-                                                            self.report({'INFO'}, f"Skipping {suffix} baking - using default value {default_val}")
-                                                            should_bake = False
-                                                        elif suffix in ['Subsurface', 'Transmission', 'Specular', 'Clearcoat', 'Sheen'] and abs(default_val) < 0.01:
-                                                            self.report({'INFO'}, f"Skipping {suffix} baking - using default value {default_val}")
-                                                            should_bake = False
-                                                    except (AttributeError, TypeError):
-                                                        pass
-                            
-                                    if should_bake:
-                                        try:
-                                            # Check if it's lighting baking for base color
-                                            is_lighting_basecolor = (suffix == 'BaseColor' and self.include_lighting)
-                                            # Check if it's custom shader
-                                            is_custom_shader = (suffix == 'CustomShader')
-                                            
-                                            if is_custom_shader:  # Custom shader baking
-                                                self.report({'INFO'}, f"Using Emission method to bake custom shader output")
-                                                
-                                                # Check if it's a mixed shader material, if so apply strategy
-                                                if material_type in ['mixed_shader_network', 'principled_with_custom', 'custom_with_principled']:
-                                                    self.report({'INFO'}, f"Detected mixed shader material, applying strategy: {self.mixed_shader_strategy}")
-                                                    
-                                                    if self.mixed_shader_strategy == 'PRINCIPLED_ONLY':
-                                                        # Try to bake only Principled BSDF part
-                                                        principled_node = analysis.get('principled_node')
-                                                        if principled_node:
-                                                            self.report({'INFO'}, f"According to strategy, baking only Principled BSDF part")
-                                                            with temporary_principled_only_surface(nt, principled_node) as temp_emit:
-                                                                if temp_emit:
-                                                                    self.bake_generic(context, btype, img, self.margin)
-                                                                else:
-                                                                    self.report({'ERROR'}, f"Cannot set Principled BSDF only baking, falling back to full surface output")
-                                                                    with temporary_emission_surface(nt) as temp_emit:
-                                                                        if temp_emit:
-                                                                            self.bake_generic(context, btype, img, self.margin)
-                                                        else:
-                                                            self.report({'WARNING'}, f"Principled BSDF node not found, using full surface output")
-                                                            with temporary_emission_surface(nt) as temp_emit:
-                                                                if temp_emit:
-                                                                    self.bake_generic(context, btype, img, self.margin)
-                                                    elif self.mixed_shader_strategy == 'CUSTOM_ONLY':
-                                                        # Try to bake only custom shader part
-                                                        self.report({'INFO'}, f"According to strategy, attempting to bake only custom shader part (experimental)")
-                                                        custom_shaders = analysis.get('custom_shaders', [])
-                                                        if custom_shaders:
-                                                            # Select first custom shader
-                                                            first_custom = custom_shaders[0]['node']
-                                                            with temporary_custom_shader_only_surface(nt, first_custom) as temp_emit:
-                                                                if temp_emit:
-                                                                    self.bake_generic(context, btype, img, self.margin)
-                                                                else:
-                                                                    self.report({'ERROR'}, f"Cannot set custom shader only baking, falling back to full surface output")
-                                                                    with temporary_emission_surface(nt) as temp_emit:
-                                                                        if temp_emit:
-                                                                            self.bake_generic(context, btype, img, self.margin)
-                                                        else:
-                                                            self.report({'WARNING'}, f"Custom shader node not found, using full surface output")
-                                                            with temporary_emission_surface(nt) as temp_emit:
-                                                                if temp_emit:
-                                                                    self.bake_generic(context, btype, img, self.margin)
-                                                    else:  # SURFACE_OUTPUT or default
-                                                        self.report({'INFO'}, f"Using full surface output strategy")
-                                                        with temporary_emission_surface(nt) as temp_emit:
-                                                            if temp_emit:
-                                                                self.bake_generic(context, btype, img, self.margin)
-                                                            else:
-                                                                self.report({'ERROR'}, f"Cannot set custom shader baking, skipping {suffix}")
-                                                else:
-                                                    # Non-mixed shader material, use original logic
-                                                    # Get material output node and connected shader information
-                                                    output_node = analysis.get('output_node')
-                                                    if output_node and output_node.inputs['Surface'].is_linked:
-                                                        shader_node = output_node.inputs['Surface'].links[0].from_node
-                                                        shader_type = shader_node.bl_idname
-                                                        shader_name = shader_node.name
-                                                        self.report({'INFO'}, f"Detected shader type: {shader_type} ('{shader_name}')")
-                                                        
-                                                        # If it's a node group, show more information
-                                                        if shader_type == 'ShaderNodeNodeGroup':
-                                                            if hasattr(shader_node, 'node_tree') and shader_node.node_tree:
-                                                                group_name = shader_node.node_tree.name
-                                                                self.report({'INFO'}, f"Node group name: {group_name}")
-                                                                # Show node group outputs
-                                                                outputs = list(shader_node.outputs.keys())
-                                                                self.report({'INFO'}, f"Node group outputs: {outputs}")
-                                                
-                                                    with temporary_emission_surface(nt) as temp_emit:
-                                                        if temp_emit:
-                                                            self.bake_generic(context, btype, img, self.margin)
-                                                        else:
-                                                            self.report({'ERROR'}, f"Cannot set custom shader baking, skipping {suffix}")
-                                            elif emission_input and not is_lighting_basecolor:  # Channels that need emission baking (except lighting base color)
-                                                if suffix == 'BaseColor' and not self.include_lighting:
-                                                    self.report({'INFO'}, f"Using Emission method to bake base color to ensure correct solid color capture")
-                                                with temporary_emission_input(nt, emission_input):
-                                                    self.bake_generic(context, btype, img, self.margin)
-                                            elif is_lighting_basecolor:  # 光影烘焙的基础色，保持原材质不变
-                                                self.report({'INFO'}, f"使用COMBINED方法烘焙基础色，保持原材质设置以捕获光照")
-                                                
-                                                # 确保材质设置适合光影烘焙
-                                                principled = analysis.get('principled_node')
-                                                if principled:
-                                                    # 临时调整一些设置以确保更好的光影捕获
-                                                    original_metallic = None
-                                                    original_roughness = None
-                                                    
-                                                    try:
-                                                        # 如果金属度太高，临时降低以获得更好的漫反射信息
-                                                        if 'Metallic' in principled.inputs and not principled.inputs['Metallic'].is_linked:
-                                                            original_metallic = principled.inputs['Metallic'].default_value
-                                                            if original_metallic > 0.8:
-                                                                principled.inputs['Metallic'].default_value = 0.2
-                                                                self.report({'INFO'}, f"光影烘焙：临时降低金属度从 {original_metallic:.2f} 到 0.2 以更好捕获光照")
-                                                        
-                                                        # 进行烘焙
-                                                        self.bake_generic(context, btype, img, self.margin, use_lighting=True, shadow_mode=self.lighting_shadow_mode)
-                                                        
-                                                    finally:
-                                                        # 恢复原始材质设置
-                                                        if original_metallic is not None:
-                                                            principled.inputs['Metallic'].default_value = original_metallic
-                                                else:
-                                                    # 如果没有Principled BSDF，直接烘焙
-                                                    self.bake_generic(context, btype, img, self.margin, use_lighting=True, shadow_mode=self.lighting_shadow_mode)
-                                            else:  # 直接烘焙的通道
-                                                if pfilter:
-                                                    # 使用特定的pass filter进行烘焙
-                                                    self.bake_generic(context, btype, img, self.margin, pfilter)
-                                                else:
-                                                    self.bake_generic(context, btype, img, self.margin)
-
-                                            img.filepath_raw = full_path
-                                            img.file_format = 'PNG'
-                                            img.save()
-                                            all_baked_images[resolution_key][suffix] = img
-                                            
-                                            if self.organize_folders:
-                                                relative_path = os.path.relpath(full_path, directory)
-                                                self.report({'INFO'}, f"Baked {suffix} texture ({width}×{height}): {relative_path}")
-                                            else:
-                                                self.report({'INFO'}, f"Baked {suffix} texture ({width}×{height}): {img_name}.png")
-                                                
-                                        except Exception as e:
-                                            self.report({'ERROR'}, f"Baked {suffix} texture failed ({width}×{height}): {str(e)}")
-                                            # 清理失败的图像
-                                            if img.name in bpy.data.images:
-                                                bpy.data.images.remove(img)
-                                    else:
-                                        # 对于跳过的通道，创建一个纯色图像
-                                        try:
-                                            principled = analysis.get('principled_node')
-                                            if principled and emission_input and emission_input in principled.inputs:
-                                                input_socket = principled.inputs[emission_input]
-                                                if not input_socket.is_linked:
-                                                    default_val = input_socket.default_value
-                                                    # 创建纯色图像
-                                                    pixels = []
-                                                    total_pixels = width * height
-                                                    
-                                                    if hasattr(default_val, '__len__') and len(default_val) >= 3:
-                                                        # 颜色值
-                                                        for _ in range(total_pixels):
-                                                            pixels.extend([default_val[0], default_val[1], default_val[2], 1.0])
-                                                    else:
-                                                        # 浮点值
-                                                        for _ in range(total_pixels):
-                                                            pixels.extend([default_val, default_val, default_val, 1.0])
-                                                    
-                                                    img.pixels = pixels
-                                                    img.filepath_raw = full_path
-                                                    img.file_format = 'PNG'
-                                                    img.save()
-                                                    all_baked_images[resolution_key][suffix] = img
-                                                    
-                                                    if self.organize_folders:
-                                                        relative_path = os.path.relpath(full_path, directory)
-                                                        self.report({'INFO'}, f"Created solid {suffix} texture ({width}×{height}): {relative_path} (Value: {default_val})")
-                                                    else:
-                                                        self.report({'INFO'}, f"Created solid {suffix} texture ({width}×{height}): {img_name}.png (Value: {default_val})")
-                                        except Exception as e:
-                                            self.report({'ERROR'}, f"Created solid {suffix} texture failed ({width}×{height}): {str(e)}")
-                                            # 清理失败的图像
-                                            if img.name in bpy.data.images:
-                                                bpy.data.images.remove(img)
-                                            
-                            except Exception as e:
-                                self.report({'ERROR'}, f"UDIM tile {udim_tile} baking failed: {str(e)}")
-                            finally:
-                                # Restore UDIM UV coordinates
-                                if original_uvs:
-                                    restore_udim_uvs(obj, original_uvs)
-                
-                    except Exception as e:
-                        self.report({'ERROR'}, f"Error during baking at resolution {width}×{height}: {str(e)}")
-
-                # Rebuild material if requested (moved outside resolution loop)
-                    primary_baked_images = all_baked_images.get(primary_resolution, {})
-                    total_images_all_res = sum(len(images) for images in all_baked_images.values())
-                    self.report({'INFO'}, f"Replace nodes setting: {self.replace_nodes}, Total baked images: {total_images_all_res}")
+            # Materials sitting out a bake still need an active image node to write into
+            scratch = bpy.data.images.new("EasyBake_Scratch", width=8, height=8, alpha=True)
+            try:
+                # Multi-tile layouts bake each tile moved into 0-1, the snapshot puts the original UVs back even if baking fails
+                normalize_tiles = self.enable_udim and len(udim_tiles) > 1
+                with udim_uvs_snapshot(obj) if normalize_tiles else nullcontext() as original_uvs:
+                    # Tile number of every original UV by face, computed once for all resolutions and tiles
+                    tile_ids = udim_tile_ids(original_uvs, obj.data.polygons) if original_uvs is not None else None
+                    # Bake for each resolution
+                    for res_idx, (width, height) in enumerate(resolutions):
+                        self.log_info(lambda: f"Starting baking at resolution {width}×{height} ({res_idx + 1}/{len(resolutions)})")
                     
-                    if self.replace_nodes and primary_baked_images:
-                        primary_width, primary_height = primary_resolution
-                        self.report({'INFO'}, f"Rebuilding material '{mat.name}' nodes, using primary resolution {primary_width}×{primary_height}, baked {len(primary_baked_images)} channels")
                         try:
-                            nt.nodes.clear()
-                            tex_nodes = {}
-                            
-                            # 定义节点排列顺序和位置
-                            node_order = [
-                                'BaseColor', 'Roughness', 'Metallic', 'Normal',
-                                'Subsurface', 'Transmission', 'Emission', 'Alpha',
-                                'Specular', 'Clearcoat', 'ClearcoatRoughness', 'Sheen',
-                                'Displacement', 'AO'
-                            ]
-                            
-                            y = 400
-                            for key in node_order:
-                                if key in primary_baked_images:
-                                    tex = nt.nodes.new('ShaderNodeTexImage')
-                                    tex.image = primary_baked_images[key]
-                                    tex.location = (-800, y)
-                                    tex.label = key
-                                    
-                                    # 设置正确的颜色空间
-                                    if tex.image:
-                                        self.set_image_colorspace(tex.image, key)
-                                    
-                                    tex_nodes[key] = tex
-                                    y -= 150
-
-                            # 创建特殊节点
-                            normal_map = None
-                            if 'Normal' in tex_nodes:
-                                normal_map = nt.nodes.new('ShaderNodeNormalMap')
-                                normal_map.location = (-500, tex_nodes['Normal'].location.y)
-                                normal_map.label = "Normal Map"
-
-                            # 创建ColorRamp节点用于AO混合
-                            ao_mix = None
-                            if 'AO' in tex_nodes:
+                            # UDIM tile loop
+                            for udim_tile in udim_tiles:
+                                if normalize_tiles:
+                                    self.log_info(lambda: f"Processing UDIM tile {udim_tile}")
+                                    if tile_ids is not None:
+                                        normalize_udim_uvs_for_baking(obj, udim_tile, original_uvs, tile_ids)
                                 try:
-                                    # 尝试新版本的Mix节点
-                                    ao_mix = nt.nodes.new('ShaderNodeMix')
-                                    ao_mix.data_type = 'RGBA'
-                                    ao_mix.blend_type = 'MULTIPLY'
-                                    if 'Fac' in ao_mix.inputs:
-                                        ao_mix.inputs['Fac'].default_value = 0.5
-                                    elif 'Factor' in ao_mix.inputs:
-                                        ao_mix.inputs['Factor'].default_value = 0.5
-                                except:
-                                    try:
-                                        # 回退到旧版本的MixRGB节点
-                                        ao_mix = nt.nodes.new('ShaderNodeMixRGB')
-                                        ao_mix.blend_type = 'MULTIPLY'
-                                        ao_mix.inputs['Fac'].default_value = 0.5
-                                    except:
-                                        # 如果都失败了，不使用AO混合
-                                        ao_mix = None
-                                        self.report({'WARNING'}, "Cannot create AO mix node, skipping AO mix")
-                                
-                                if ao_mix:
-                                    ao_mix.location = (-300, tex_nodes['AO'].location.y)
-                                    ao_mix.label = "AO Mix"
-
-                            # 创建位移节点
-                            displacement_node = None
-                            if 'Displacement' in tex_nodes:
-                                displacement_node = nt.nodes.new('ShaderNodeDisplacement')
-                                displacement_node.location = (0, -400)
-                                displacement_node.label = "Displacement"
-
-                            # 创建Principled BSDF
-                            principled = nt.nodes.new('ShaderNodeBsdfPrincipled')
-                            principled.location = (-100, 0)
-                            principled.label = "Principled BSDF"
-
-                            # 创建输出节点
-                            output = nt.nodes.new('ShaderNodeOutputMaterial')
-                            output.location = (300, 0)
-                            output.label = "Material Output"
-
-                            # 创建适合当前Blender版本的输入名称映射
-                            input_mapping = create_input_mapping()
-
-                            # 安全连接函数
-                            def safe_connect(from_node, from_output, to_node, to_input_name):
-                                try:
-                                    # 检查所有参数都是有效的
-                                    if (from_node and to_node and 
-                                        hasattr(from_node, 'outputs') and hasattr(to_node, 'inputs') and
-                                        isinstance(to_input_name, str) and to_input_name and
-                                        isinstance(from_output, str) and from_output):
-                                        
-                                        # 检查输入是否存在
-                                        if (to_input_name in to_node.inputs and 
-                                            from_output in from_node.outputs):
-                                            nt.links.new(from_node.outputs[from_output], to_node.inputs[to_input_name])
-                                            return True
-                                        else:
-                                            self.report({'WARNING'}, f"Connection failed: {from_output} -> {to_input_name} (missing slot)")
-                                except (KeyError, AttributeError, TypeError, RuntimeError) as e:
-                                    self.report({'WARNING'}, f"Connection error: {str(e)}")
-                                return False
-
-                            # 连接基础通道
-                            if 'BaseColor' in tex_nodes:
-                                if 'AO' in tex_nodes and ao_mix:
-                                    # 将BaseColor和AO混合
-                                    try:
-                                        # 尝试不同的输入名称
-                                        color1_input = 'Color1' if 'Color1' in ao_mix.inputs else 'A'
-                                        color2_input = 'Color2' if 'Color2' in ao_mix.inputs else 'B'
-                                        color_output = 'Color' if 'Color' in ao_mix.outputs else 'Result'
-                                        
-                                        nt.links.new(tex_nodes['BaseColor'].outputs['Color'], ao_mix.inputs[color1_input])
-                                        nt.links.new(tex_nodes['AO'].outputs['Color'], ao_mix.inputs[color2_input])
-                                        
-                                        basecolor_input = input_mapping.get('BaseColor', 'Base Color')
-                                        safe_connect(ao_mix, color_output, principled, basecolor_input)
-                                    except Exception as e:
-                                        self.report({'WARNING'}, f"AO mix failed, connecting directly to base color: {str(e)}")
-                                        basecolor_input = input_mapping.get('BaseColor', 'Base Color')
-                                        safe_connect(tex_nodes['BaseColor'], 'Color', principled, basecolor_input)
-                                else:
-                                    basecolor_input = input_mapping.get('BaseColor', 'Base Color')
-                                    safe_connect(tex_nodes['BaseColor'], 'Color', principled, basecolor_input)
-                            
-                            if 'Roughness' in tex_nodes:
-                                roughness_input = input_mapping.get('Roughness', 'Roughness')
-                                safe_connect(tex_nodes['Roughness'], 'Color', principled, roughness_input)
-                            
-                            if 'Metallic' in tex_nodes:
-                                metallic_input = input_mapping.get('Metallic', 'Metallic')
-                                safe_connect(tex_nodes['Metallic'], 'Color', principled, metallic_input)
-                            
-                            if 'Normal' in tex_nodes and normal_map:
-                                try:
-                                    nt.links.new(tex_nodes['Normal'].outputs['Color'], normal_map.inputs['Color'])
-                                    safe_connect(normal_map, 'Normal', principled, 'Normal')
+                                    # Bake for each channel
+                                    for suffix in pass_order:
+                                        total_baked_images += self.bake_channel(
+                                            context, obj, jobs, suffix, width, height, udim_tile,
+                                            directory, len(resolutions) > 1, primary_resolution, scratch)
                                 except Exception as e:
-                                    self.report({'WARNING'}, f"Normal connection failed: {str(e)}")
-
-                            # 连接高级PBR通道
-                            advanced_channels = [
-                                ('Subsurface', 'Subsurface'),
-                                ('Transmission', 'Transmission'),
-                                ('Emission', 'Emission'),
-                                ('Alpha', 'Alpha'),
-                                ('Specular', 'Specular'),
-                                ('Clearcoat', 'Clearcoat'),
-                                ('ClearcoatRoughness', 'ClearcoatRoughness'),
-                                ('Sheen', 'Sheen')
-                            ]
-                            
-                            for tex_key, mapping_key in advanced_channels:
-                                if tex_key in tex_nodes:
-                                    input_name = input_mapping.get(mapping_key, mapping_key)
-                                    safe_connect(tex_nodes[tex_key], 'Color', principled, input_name)
-                            
-                            # 连接主要输出
-                            try:
-                                nt.links.new(principled.outputs['BSDF'], output.inputs['Surface'])
-                            except Exception as e:
-                                self.report({'ERROR'}, f"Main output connection failed: {str(e)}")
-                            
-                            # 连接位移
-                            if 'Displacement' in tex_nodes and displacement_node:
-                                try:
-                                    nt.links.new(tex_nodes['Displacement'].outputs['Color'], displacement_node.inputs['Height'])
-                                    nt.links.new(displacement_node.outputs['Displacement'], output.inputs['Displacement'])
-                                except Exception as e:
-                                    self.report({'WARNING'}, f"Displacement connection failed: {str(e)}")
-
-                            connected_channels = list(primary_baked_images.keys())
-                            self.report({'INFO'}, f"Successfully rebuilt material '{mat.name}' nodes, connected {len(connected_channels)} channels: {', '.join(connected_channels)}")
-                            
+                                    self.report({'ERROR'}, f"UDIM tile {udim_tile} baking failed: {str(e)}")
+                
                         except Exception as e:
+                            self.report({'ERROR'}, f"Error during baking at resolution {width}×{height}: {str(e)}")
+            finally:
+                bpy.data.images.remove(scratch)
+
+            for job in jobs:
+                mat = job['mat']
+                nt = job['nt']
+
+                # 清理烘焙节点，节点由本次烘焙创建，直接按引用删除（重建会清空节点树，须先删除）
+                try:
+                    nt.nodes.remove(job['bake_node'])
+                except (ReferenceError, RuntimeError):
+                    pass
+
+                # Rebuild material once every resolution has been baked
+                primary_baked_images = job['baked_images'].get(primary_resolution, {})
+                if self.replace_nodes:
+                    if primary_baked_images:
+                        primary_width, primary_height = primary_resolution
+                        self.log_info(lambda: f"Rebuilding material '{mat.name}' nodes, using primary resolution {primary_width}×{primary_height}, baked {len(primary_baked_images)} channels")
+                        try:
+                            self.rebuild_material_nodes(mat, nt, primary_baked_images, input_mapping)
+                        except RuntimeError as e:
                             self.report({'ERROR'}, f"重建材质节点失败: {str(e)}")
-                            # 如果重建失败，尝试恢复基本的Principled BSDF节点
-                            try:
-                                nt.nodes.clear()
-                                principled = nt.nodes.new('ShaderNodeBsdfPrincipled')
-                                principled.location = (0, 0)
-                                output = nt.nodes.new('ShaderNodeOutputMaterial')
-                                output.location = (300, 0)
-                                nt.links.new(principled.outputs['BSDF'], output.inputs['Surface'])
-                                self.report({'INFO'}, f"Restored basic nodes for material '{mat.name}'")
-                            except Exception as restore_error:
-                                self.report({'ERROR'}, f"Cannot restore basic nodes for material '{mat.name}': {str(restore_error)}")
-                    elif not self.replace_nodes:
-                        self.report({'INFO'}, f"Replace nodes feature disabled, keeping original nodes for material '{mat.name}'")
-                    elif not primary_baked_images:
+                            self.restore_basic_material(mat, nt)
+                    else:
                         self.report({'WARNING'}, f"No successfully baked textures, skipping node reconstruction for material '{mat.name}'")
 
-                    # 清理烘焙节点
-                    try:
-                        if bake_node and hasattr(bake_node, 'bl_idname') and bake_node.bl_idname == 'ShaderNodeTexImage':
-                            nt.nodes.remove(bake_node)
-                    except (TypeError, AttributeError, ReferenceError, RuntimeError):
-                        # 如果节点已经被删除、无效或无法移除，忽略错误
-                        pass
 
+        if not self.replace_nodes:
+            self.log_info("Replace nodes feature disabled, original material nodes kept")
+        self.report({'INFO'}, f"Baked {total_baked_images} images in total")
         self.report({'INFO'}, f"烘焙完成！处理了 {len(selected_objects)} 个物体，{processed_materials} 个材质")
         return {'FINISHED'}
 
@@ -2208,32 +2759,100 @@ class MBNL_OT_bake(Operator):
 # 快捷选择操作器
 # -----------------------------------------------------------------------------
 
+# Channel include flags, in the order used by CHANNEL_PRESETS
+CHANNEL_PROPS = (
+    # Basic PBR channels
+    'basecolor', 'roughness', 'metallic', 'normal',
+    # Advanced PBR channels
+    'subsurface', 'transmission', 'emission', 'alpha',
+    'specular', 'clearcoat', 'clearcoat_roughness', 'sheen',
+    # Special channels
+    'displacement', 'ambient_occlusion',
+    # Custom shaders
+    'custom_shader',
+)
+
+CHANNEL_PRESETS = {
+    'BASIC': (True,) * 4 + (False,) * 11,
+    'FULL': (True,) * 15,
+    'NONE': (False,) * 15,
+    'CUSTOM_SHADER': (False,) * 14 + (True,),
+}
+
+# Panel names of the channels, aligned with CHANNEL_PROPS
+CHANNEL_LABELS = (
+    "Base Color", "Roughness", "Metallic", "Normal",
+    "Subsurface", "Transmission", "Emission", "Alpha",
+    "Specular", "Clearcoat", "Clearcoat Roughness", "Sheen",
+    "Displacement", "AO",
+    "Custom Shader",
+)
+
+# Reads the channel flags of a scene as one tuple, aligned with CHANNEL_PROPS
+get_channel_flags = attrgetter(*(f"mbnl_include_{prop}" for prop in CHANNEL_PROPS))
+
+# Square resolutions offered by the mbnl_res_* flags
+PRESET_RESOLUTIONS = (512, 1024, 2048, 4096, 8192)
+
+# Reads the preset resolution flags of a scene as one tuple, aligned with PRESET_RESOLUTIONS
+get_preset_res_flags = attrgetter(*(f"mbnl_res_{res}" for res in PRESET_RESOLUTIONS))
+
+# Scene settings the panel's bake buttons copy onto their operators when invoked: (operator property, scene property)
+BAKE_OP_PROPS = tuple((key, 'mbnl_' + key) for key in (
+    'replace_nodes', 'resolution', 'include_lighting', 'lighting_shadow_mode', 'organize_folders',
+    'enable_multi_resolution', *(f"res_{res}" for res in PRESET_RESOLUTIONS),
+    'enable_custom_resolution',
+    'custom_width_1', 'custom_height_1', 'custom_width_2', 'custom_height_2', 'custom_width_3', 'custom_height_3',
+    'use_custom_1', 'use_custom_2', 'use_custom_3',
+    *(f"include_{prop}" for prop in CHANNEL_PROPS),
+    'mixed_shader_strategy',
+    'colorspace_mode', 'colorspace_basecolor', 'colorspace_normal', 'colorspace_roughness',
+    'colorspace_emission', 'colorspace_manual_override',
+))
+
+ATLAS_OP_PROPS = (
+    ('resolution', 'mbnl_resolution'),
+    ('atlas_layout_mode', 'mbnl_atlas_layout_mode'),
+    ('atlas_cols', 'mbnl_atlas_cols'),
+    ('atlas_rows', 'mbnl_atlas_rows'),
+    ('atlas_padding', 'mbnl_atlas_padding'),
+    ('atlas_update_uv', 'mbnl_atlas_update_uv'),
+    ('include_basecolor', 'mbnl_atlas_include_basecolor'),
+    ('include_roughness', 'mbnl_atlas_include_roughness'),
+    ('include_metallic', 'mbnl_atlas_include_metallic'),
+    ('include_normal', 'mbnl_atlas_include_normal'),
+)
+
+
+def copy_scene_settings(op, scene, props):
+    """Set the operator properties from their scene properties, props as (operator property, scene property) pairs"""
+    for op_prop, scene_prop in props:
+        setattr(op, op_prop, getattr(scene, scene_prop))
+
+
+# Scene properties of the three custom resolution slots: (enabled, width, height)
+CUSTOM_RES_SLOTS = tuple(
+    (f"mbnl_use_custom_{i}", f"mbnl_custom_width_{i}", f"mbnl_custom_height_{i}") for i in (1, 2, 3)
+)
+
+# Read each slot as an (enabled, width, height) tuple, and the enabled flags of all slots as one tuple
+CUSTOM_RES_GETTERS = tuple(attrgetter(*slot) for slot in CUSTOM_RES_SLOTS)
+get_custom_res_flags = attrgetter(*(use_prop for use_prop, _, _ in CUSTOM_RES_SLOTS))
+
+
+def apply_channel_preset(scene, preset):
+    """Set every mbnl_include_* flag from a CHANNEL_PRESETS entry"""
+    for prop, value in zip(CHANNEL_PROPS, CHANNEL_PRESETS[preset]):
+        setattr(scene, f"mbnl_include_{prop}", value)
+
+
 class MBNL_OT_select_basic(Operator):
     bl_idname = "mbnl.select_basic"
     bl_label = "Select Basic PBR Channels"
     bl_options = {"REGISTER", "UNDO"}
 
     def execute(self, context):
-        scene = context.scene
-        # Basic PBR channels
-        scene.mbnl_include_basecolor = True
-        scene.mbnl_include_roughness = True
-        scene.mbnl_include_metallic = True
-        scene.mbnl_include_normal = True
-        # Advanced PBR channels
-        scene.mbnl_include_subsurface = False
-        scene.mbnl_include_transmission = False
-        scene.mbnl_include_emission = False
-        scene.mbnl_include_alpha = False
-        scene.mbnl_include_specular = False
-        scene.mbnl_include_clearcoat = False
-        scene.mbnl_include_clearcoat_roughness = False
-        scene.mbnl_include_sheen = False
-        # Special channels
-        scene.mbnl_include_displacement = False
-        scene.mbnl_include_ambient_occlusion = False
-        # Custom shaders
-        scene.mbnl_include_custom_shader = False
+        apply_channel_preset(context.scene, 'BASIC')
         return {'FINISHED'}
 
 
@@ -2243,26 +2862,7 @@ class MBNL_OT_select_full(Operator):
     bl_options = {"REGISTER", "UNDO"}
 
     def execute(self, context):
-        scene = context.scene
-        # Basic PBR channels
-        scene.mbnl_include_basecolor = True
-        scene.mbnl_include_roughness = True
-        scene.mbnl_include_metallic = True
-        scene.mbnl_include_normal = True
-        # Advanced PBR channels
-        scene.mbnl_include_subsurface = True
-        scene.mbnl_include_transmission = True
-        scene.mbnl_include_emission = True
-        scene.mbnl_include_alpha = True
-        scene.mbnl_include_specular = True
-        scene.mbnl_include_clearcoat = True
-        scene.mbnl_include_clearcoat_roughness = True
-        scene.mbnl_include_sheen = True
-        # Special channels
-        scene.mbnl_include_displacement = True
-        scene.mbnl_include_ambient_occlusion = True
-        # Custom shaders
-        scene.mbnl_include_custom_shader = True
+        apply_channel_preset(context.scene, 'FULL')
         return {'FINISHED'}
 
 
@@ -2272,26 +2872,7 @@ class MBNL_OT_select_none(Operator):
     bl_options = {"REGISTER", "UNDO"}
 
     def execute(self, context):
-        scene = context.scene
-        # Basic PBR channels
-        scene.mbnl_include_basecolor = False
-        scene.mbnl_include_roughness = False
-        scene.mbnl_include_metallic = False
-        scene.mbnl_include_normal = False
-        # Advanced PBR channels
-        scene.mbnl_include_subsurface = False
-        scene.mbnl_include_transmission = False
-        scene.mbnl_include_emission = False
-        scene.mbnl_include_alpha = False
-        scene.mbnl_include_specular = False
-        scene.mbnl_include_clearcoat = False
-        scene.mbnl_include_clearcoat_roughness = False
-        scene.mbnl_include_sheen = False
-        # Special channels
-        scene.mbnl_include_displacement = False
-        scene.mbnl_include_ambient_occlusion = False
-        # Custom shaders
-        scene.mbnl_include_custom_shader = False
+        apply_channel_preset(context.scene, 'NONE')
         return {'FINISHED'}
 
 
@@ -2301,27 +2882,17 @@ class MBNL_OT_select_custom_shader(Operator):
     bl_options = {"REGISTER", "UNDO"}
 
     def execute(self, context):
-        scene = context.scene
-        # Disable all other channels
-        scene.mbnl_include_basecolor = False
-        scene.mbnl_include_roughness = False
-        scene.mbnl_include_metallic = False
-        scene.mbnl_include_normal = False
-        scene.mbnl_include_subsurface = False
-        scene.mbnl_include_transmission = False
-        scene.mbnl_include_emission = False
-        scene.mbnl_include_alpha = False
-        scene.mbnl_include_specular = False
-        scene.mbnl_include_clearcoat = False
-        scene.mbnl_include_clearcoat_roughness = False
-        scene.mbnl_include_sheen = False
-        scene.mbnl_include_displacement = False
-        scene.mbnl_include_ambient_occlusion = False
-        # Only enable custom shader
-        scene.mbnl_include_custom_shader = True
+        apply_channel_preset(context.scene, 'CUSTOM_SHADER')
         return {'FINISHED'}
 
 
+# Diagnosis lines emitted for every object, material and listed node
+DIAG_OBJECT = "Analyzing object: {0}".format
+DIAG_MATERIAL = "  Material: {0}".format
+DIAG_TYPE = "    Type: {0}".format
+DIAG_NODE = "      - {0} ('{1}')".format
+
+
 class MBNL_OT_diagnose_custom_shader(Operator):
     bl_idname = "mbnl.diagnose_custom_shader"
     bl_label = "Diagnose Custom Shader"
@@ -2334,84 +2905,113 @@ class MBNL_OT_diagnose_custom_shader(Operator):
             self.report({'ERROR'}, "Please select at least one mesh object")
             return {'CANCELLED'}
         
-        self.report({'INFO'}, "=== Custom Shader Diagnosis Report ===")
+        # Collect the report and emit it once, one report per line floods the info log
+        lines = ["=== Custom Shader Diagnosis Report ==="]
+        warn_lines = []
+        err_lines = []
         
         for obj in selected_objects:
             obj_name = safe_encode_text(obj.name, "Unnamed Object")
-            self.report({'INFO'}, f"Analyzing object: {obj_name}")
+            lines.append(DIAG_OBJECT(obj_name))
             
             for slot in obj.material_slots:
-                if slot.material and slot.material.use_nodes:
-                    mat = slot.material
-                    mat_name = safe_encode_text(mat.name, "Unnamed Material")
-                    self.report({'INFO'}, f"  Material: {mat_name}")
-                    
-                    # Analyze material
-                    analysis = analyze_material(mat)
-                    material_type = analysis.get('material_type', 'unknown')
-                    self.report({'INFO'}, f"    Type: {material_type}")
+                if not (slot.material and slot.material.use_nodes):
+                    continue
+                mat = slot.material
+                mat_name = safe_encode_text(mat.name, "Unnamed Material")
+                lines.append(DIAG_MATERIAL(mat_name))
+                
+                # Analyze material
+                analysis = analyze_material_cached(mat)
+                material_type = analysis.get('material_type', 'unknown')
+                lines.append(DIAG_TYPE(material_type))
             
-            # 检查Material Output连接
-            output_node = analysis.get('output_node')
-            if output_node:
-                if output_node.inputs['Surface'].is_linked:
-                    shader_link = output_node.inputs['Surface'].links[0]
-                    shader_node = shader_link.from_node
-                    shader_socket = shader_link.from_socket
-                    
-                    self.report({'INFO'}, f"    Shader Node: {shader_node.bl_idname} ('{shader_node.name}')")
-                    self.report({'INFO'}, f"    Output Socket: '{shader_socket.name}'")
-                    
-                    # 如果是节点组，显示更多信息
-                    if shader_node.bl_idname == 'ShaderNodeNodeGroup':
-                        if hasattr(shader_node, 'node_tree') and shader_node.node_tree:
-                            group_name = shader_node.node_tree.name
-                            self.report({'INFO'}, f"    Node Group: {group_name}")
-                            
-                            # 显示所有输出
-                            outputs = list(shader_node.outputs.keys())
-                            self.report({'INFO'}, f"    Available Outputs: {outputs}")
-                            
-                            # 检查哪个输出正在被使用
-                            used_output = shader_socket.name
-                            self.report({'INFO'}, f"    Current Used Output: '{used_output}'")
-                        else:
-                            self.report({'WARNING'}, f"    Node Group lacks node_tree")
+                # 检查Material Output连接
+                output_node = analysis.get('output_node')
+                if output_node:
+                    if output_node.inputs['Surface'].is_linked:
+                        shader_link = output_node.inputs['Surface'].links[0]
+                        shader_node = shader_link.from_node
+                        shader_socket = shader_link.from_socket
+                        
+                        lines.append(f"    Shader Node: {shader_node.bl_idname} ('{shader_node.name}')")
+                        lines.append(f"    Output Socket: '{shader_socket.name}'")
+                        
+                        # 如果是节点组，显示更多信息
+                        if shader_node.bl_idname == 'ShaderNodeNodeGroup':
+                            if hasattr(shader_node, 'node_tree') and shader_node.node_tree:
+                                group_name = shader_node.node_tree.name
+                                lines.append(f"    Node Group: {group_name}")
+                                
+                                # 显示输出（最多8个）
+                                outputs = [socket.name for socket in shader_node.outputs[:8]]
+                                if len(shader_node.outputs) > 8:
+                                    outputs.append("...")
+                                lines.append(f"    Available Outputs: {outputs}")
+                                
+                                # 检查哪个输出正在被使用
+                                used_output = shader_socket.name
+                                lines.append(f"    Current Used Output: '{used_output}'")
+                            else:
+                                warn_lines.append(f"{mat_name}: Node Group lacks node_tree")
+                    else:
+                        warn_lines.append(f"{mat_name}: Surface input of Material Output is not connected")
                 else:
-                    self.report({'WARNING'}, f"    Surface input of Material Output is not connected")
-            else:
-                self.report({'ERROR'}, f"    Material Output node not found")
-            
-            # 检查自定义着色器
-            custom_shaders = analysis.get('custom_shaders', [])
-            if custom_shaders:
-                self.report({'INFO'}, f"    Detected {len(custom_shaders)} custom shaders:")
-                for shader in custom_shaders[:3]:  # 只显示前3个
-                    self.report({'INFO'}, f"      - {shader['type']} ('{shader['name']}')")
-            else:
-                self.report({'INFO'}, f"    No custom shaders detected")
-            
-            # 检查混合着色器网络
-            if material_type in ['mixed_shader_network', 'principled_with_custom', 'custom_with_principled']:
-                self.report({'INFO'}, f"    Mixed Shader Analysis:")
-                self.report({'INFO'}, f"      Principled connected to output: {analysis.get('principled_connected_to_output')}")
-                self.report({'INFO'}, f"      Custom shader connected to output: {analysis.get('custom_connected_to_output')}")
+                    err_lines.append(f"{mat_name}: Material Output node not found")
                 
-                shader_network = analysis.get('shader_network', {})
-                if shader_network:
-                    mix_node = shader_network.get('mix_node')
-                    if mix_node:
-                        self.report({'INFO'}, f"      Mix Node: {mix_node.bl_idname} ('{mix_node.name}')")
-                        self.report({'INFO'}, f"      Contains Principled: {shader_network.get('has_principled')}")
-                        self.report({'INFO'}, f"      Contains Custom: {shader_network.get('has_custom')}")
-            
-                mix_shaders = analysis.get('mix_shaders', [])
-                if mix_shaders:
-                    self.report({'INFO'}, f"    Detected {len(mix_shaders)} Mix/Add Shader nodes:")
-                    for mix_shader in mix_shaders[:2]:  # 只显示前2个
-                        self.report({'INFO'}, f"      - {mix_shader['type']} ('{mix_shader['name']}')")
-        
-        self.report({'INFO'}, "=== 诊断完成 ===")
+                # 检查自定义着色器
+                custom_shaders = analysis.get('custom_shaders', [])
+                if custom_shaders:
+                    lines.append(f"    Detected {len(custom_shaders)} custom shaders:")
+                    for shader in custom_shaders[:3]:  # 只显示前3个
+                        lines.append(DIAG_NODE(shader['type'], shader['name']))
+                else:
+                    lines.append("    No custom shaders detected")
+                
+                # 检查混合着色器网络
+                if material_type in ['mixed_shader_network', 'principled_with_custom', 'custom_with_principled']:
+                    lines.append("    Mixed Shader Analysis:")
+                    lines.append(f"      Principled connected to output: {analysis.get('principled_connected_to_output')}")
+                    lines.append(f"      Custom shader connected to output: {analysis.get('custom_connected_to_output')}")
+                    
+                    shader_network = analysis.get('shader_network', {})
+                    if shader_network:
+                        mix_node = shader_network.get('mix_node')
+                        if mix_node:
+                            lines.append(f"      Mix Node: {mix_node.bl_idname} ('{mix_node.name}')")
+                            lines.append(f"      Contains Principled: {shader_network.get('has_principled')}")
+                            lines.append(f"      Contains Custom: {shader_network.get('has_custom')}")
+                
+                    mix_shaders = analysis.get('mix_shaders', [])
+                    if mix_shaders:
+                        lines.append(f"    Detected {len(mix_shaders)} Mix/Add Shader nodes:")
+                        for mix_shader in mix_shaders[:2]:  # 只显示前2个
+                            lines.append(DIAG_NODE(mix_shader['type'], mix_shader['name']))
+        
+        lines.append("=== 诊断完成 ===")
+        
+        # Keep the full report in a text block and the system console
+        text = bpy.data.texts.get("EasyBake Diagnosis") or bpy.data.texts.new("EasyBake Diagnosis")
+        text.from_string("\n".join(lines + [f"WARNING: {line}" for line in warn_lines] + [f"ERROR: {line}" for line in err_lines]))
+        print("\n".join(lines))
+        
+        self.report({'INFO'}, "\n".join(lines))
+        if warn_lines:
+            self.report({'WARNING'}, "\n".join(warn_lines))
+        if err_lines:
+            self.report({'ERROR'}, "\n".join(err_lines))
+        return {'FINISHED'}
+
+
+class MBNL_OT_analyze_selection(Operator):
+    bl_idname = "mbnl.analyze_selection"
+    bl_label = "Analyze Materials"
+    bl_description = "Analyze the materials of a large selection for the panel's material type distribution"
+    bl_options = {"REGISTER"}
+
+    def execute(self, context):
+        selected_objects, mat_counts, total_materials, material_stats, stats_rows, mixed_count = get_ui_stats(context.selected_objects)
+        self.report({'INFO'}, f"Analyzed {total_materials} materials on {len(selected_objects)} objects")
         return {'FINISHED'}
 
 
@@ -2502,74 +3102,13 @@ class MBNL_OT_save_preset(Operator):
             return {'CANCELLED'}
         
         # 清理预设名称（移除非法字符）
-        safe_name = "".join(c for c in self.preset_name if c.isalnum() or c in (' ', '-', '_')).strip()
+        safe_name = PRESET_NAME_RE.sub('', self.preset_name).strip()
         if not safe_name:
             self.report({'ERROR'}, "Preset name contains illegal characters")
             return {'CANCELLED'}
         
         # 收集所有设置
-        settings = {
-            # 基本设置
-            'resolution': scene.mbnl_resolution,
-            'replace_nodes': scene.mbnl_replace_nodes,
-            'include_lighting': scene.mbnl_include_lighting,
-            'lighting_shadow_mode': scene.mbnl_lighting_shadow_mode,
-            'organize_folders': scene.mbnl_organize_folders,
-            'use_custom_directory': scene.mbnl_use_custom_directory,
-            'custom_directory': scene.mbnl_custom_directory,
-            
-            # 多分辨率设置
-            'enable_multi_resolution': scene.mbnl_enable_multi_resolution,
-            'res_512': scene.mbnl_res_512,
-            'res_1024': scene.mbnl_res_1024,
-            'res_2048': scene.mbnl_res_2048,
-            'res_4096': scene.mbnl_res_4096,
-            'res_8192': scene.mbnl_res_8192,
-            
-            # 自定义分辨率设置
-            'enable_custom_resolution': scene.mbnl_enable_custom_resolution,
-            'custom_width_1': scene.mbnl_custom_width_1,
-            'custom_height_1': scene.mbnl_custom_height_1,
-            'custom_width_2': scene.mbnl_custom_width_2,
-            'custom_height_2': scene.mbnl_custom_height_2,
-            'custom_width_3': scene.mbnl_custom_width_3,
-            'custom_height_3': scene.mbnl_custom_height_3,
-            'use_custom_1': scene.mbnl_use_custom_1,
-            'use_custom_2': scene.mbnl_use_custom_2,
-            'use_custom_3': scene.mbnl_use_custom_3,
-            
-            # 基础PBR通道
-            'include_basecolor': scene.mbnl_include_basecolor,
-            'include_roughness': scene.mbnl_include_roughness,
-            'include_metallic': scene.mbnl_include_metallic,
-            'include_normal': scene.mbnl_include_normal,
-            
-            # 高级PBR通道
-            'include_subsurface': scene.mbnl_include_subsurface,
-            'include_transmission': scene.mbnl_include_transmission,
-            'include_emission': scene.mbnl_include_emission,
-            'include_alpha': scene.mbnl_include_alpha,
-            'include_specular': scene.mbnl_include_specular,
-            'include_clearcoat': scene.mbnl_include_clearcoat,
-            'include_clearcoat_roughness': scene.mbnl_include_clearcoat_roughness,
-            'include_sheen': scene.mbnl_include_sheen,
-            
-            # 特殊通道
-            'include_displacement': scene.mbnl_include_displacement,
-            'include_ambient_occlusion': scene.mbnl_include_ambient_occlusion,
-            
-            # 自定义着色器
-            'include_custom_shader': scene.mbnl_include_custom_shader,
-            'mixed_shader_strategy': scene.mbnl_mixed_shader_strategy,
-            
-            # 色彩空间管理
-            'colorspace_mode': scene.mbnl_colorspace_mode,
-            'colorspace_basecolor': scene.mbnl_colorspace_basecolor,
-            'colorspace_normal': scene.mbnl_colorspace_normal,
-            'colorspace_roughness': scene.mbnl_colorspace_roughness,
-            'colorspace_emission': scene.mbnl_colorspace_emission,
-            'colorspace_manual_override': scene.mbnl_colorspace_manual_override,
-        }
+        settings = {key: getattr(scene, 'mbnl_' + key) for key in PRESET_KEYS}
         
         # 保存预设
         if save_preset_to_file(safe_name, settings):
@@ -2605,111 +3144,18 @@ class MBNL_OT_load_preset(Operator):
         
         # 应用设置
         try:
-            # 基本设置
-            if 'resolution' in settings:
-                scene.mbnl_resolution = settings['resolution']
-            if 'replace_nodes' in settings:
-                scene.mbnl_replace_nodes = settings['replace_nodes']
-            if 'include_lighting' in settings:
-                scene.mbnl_include_lighting = settings['include_lighting']
-            if 'lighting_shadow_mode' in settings:
-                scene.mbnl_lighting_shadow_mode = settings['lighting_shadow_mode']
-            if 'organize_folders' in settings:
-                scene.mbnl_organize_folders = settings['organize_folders']
-            if 'use_custom_directory' in settings:
-                scene.mbnl_use_custom_directory = settings['use_custom_directory']
-            if 'custom_directory' in settings:
-                scene.mbnl_custom_directory = settings['custom_directory']
-            
-            # 多分辨率设置
-            if 'enable_multi_resolution' in settings:
-                scene.mbnl_enable_multi_resolution = settings['enable_multi_resolution']
-            if 'res_512' in settings:
-                scene.mbnl_res_512 = settings['res_512']
-            if 'res_1024' in settings:
-                scene.mbnl_res_1024 = settings['res_1024']
-            if 'res_2048' in settings:
-                scene.mbnl_res_2048 = settings['res_2048']
-            if 'res_4096' in settings:
-                scene.mbnl_res_4096 = settings['res_4096']
-            if 'res_8192' in settings:
-                scene.mbnl_res_8192 = settings['res_8192']
-            
-            # 自定义分辨率设置
-            if 'enable_custom_resolution' in settings:
-                scene.mbnl_enable_custom_resolution = settings['enable_custom_resolution']
-            if 'custom_width_1' in settings:
-                scene.mbnl_custom_width_1 = settings['custom_width_1']
-            if 'custom_height_1' in settings:
-                scene.mbnl_custom_height_1 = settings['custom_height_1']
-            if 'custom_width_2' in settings:
-                scene.mbnl_custom_width_2 = settings['custom_width_2']
-            if 'custom_height_2' in settings:
-                scene.mbnl_custom_height_2 = settings['custom_height_2']
-            if 'custom_width_3' in settings:
-                scene.mbnl_custom_width_3 = settings['custom_width_3']
-            if 'custom_height_3' in settings:
-                scene.mbnl_custom_height_3 = settings['custom_height_3']
-            if 'use_custom_1' in settings:
-                scene.mbnl_use_custom_1 = settings['use_custom_1']
-            if 'use_custom_2' in settings:
-                scene.mbnl_use_custom_2 = settings['use_custom_2']
-            if 'use_custom_3' in settings:
-                scene.mbnl_use_custom_3 = settings['use_custom_3']
-            
-            # 基础PBR通道
-            if 'include_basecolor' in settings:
-                scene.mbnl_include_basecolor = settings['include_basecolor']
-            if 'include_roughness' in settings:
-                scene.mbnl_include_roughness = settings['include_roughness']
-            if 'include_metallic' in settings:
-                scene.mbnl_include_metallic = settings['include_metallic']
-            if 'include_normal' in settings:
-                scene.mbnl_include_normal = settings['include_normal']
-            
-            # 高级PBR通道
-            if 'include_subsurface' in settings:
-                scene.mbnl_include_subsurface = settings['include_subsurface']
-            if 'include_transmission' in settings:
-                scene.mbnl_include_transmission = settings['include_transmission']
-            if 'include_emission' in settings:
-                scene.mbnl_include_emission = settings['include_emission']
-            if 'include_alpha' in settings:
-                scene.mbnl_include_alpha = settings['include_alpha']
-            if 'include_specular' in settings:
-                scene.mbnl_include_specular = settings['include_specular']
-            if 'include_clearcoat' in settings:
-                scene.mbnl_include_clearcoat = settings['include_clearcoat']
-            if 'include_clearcoat_roughness' in settings:
-                scene.mbnl_include_clearcoat_roughness = settings['include_clearcoat_roughness']
-            if 'include_sheen' in settings:
-                scene.mbnl_include_sheen = settings['include_sheen']
-            
-            # 特殊通道
-            if 'include_displacement' in settings:
-                scene.mbnl_include_displacement = settings['include_displacement']
-            if 'include_ambient_occlusion' in settings:
-                scene.mbnl_include_ambient_occlusion = settings['include_ambient_occlusion']
-            
-            # 自定义着色器
-            if 'include_custom_shader' in settings:
-                scene.mbnl_include_custom_shader = settings['include_custom_shader']
-            if 'mixed_shader_strategy' in settings:
-                scene.mbnl_mixed_shader_strategy = settings['mixed_shader_strategy']
+            for key in PRESET_KEYS:
+                if key in settings:
+                    try:
+                        setattr(scene, 'mbnl_' + key, settings[key])
+                    except (TypeError, ValueError) as e:
+                        # 旧预设中的值可能已不再有效，跳过该项
+                        self.report({'WARNING'}, f"Skipped preset setting '{key}': {str(e)}")
             
-            # 色彩空间管理
-            if 'colorspace_mode' in settings:
-                scene.mbnl_colorspace_mode = settings['colorspace_mode']
-            if 'colorspace_basecolor' in settings:
-                scene.mbnl_colorspace_basecolor = settings['colorspace_basecolor']
-            if 'colorspace_normal' in settings:
-                scene.mbnl_colorspace_normal = settings['colorspace_normal']
-            if 'colorspace_roughness' in settings:
-                scene.mbnl_colorspace_roughness = settings['colorspace_roughness']
-            if 'colorspace_emission' in settings:
-                scene.mbnl_colorspace_emission = settings['colorspace_emission']
-            if 'colorspace_manual_override' in settings:
-                scene.mbnl_colorspace_manual_override = settings['colorspace_manual_override']
+            # 所有设置写入后统一刷新一次界面
+            if context.screen:
+                for area in context.screen.areas:
+                    area.tag_redraw()
             
             self.report({'INFO'}, f"Preset '{scene.mbnl_preset_list}' loaded successfully")
             return {'FINISHED'}
@@ -2760,6 +3206,7 @@ class MBNL_OT_refresh_presets(Operator):
         # 强制刷新预设列表
         try:
             # 触发预设枚举的更新
+            _PRESETS_CACHE['mtime'] = -1
             presets = get_available_presets()
             self.report({'INFO'}, f"Preset list refreshed, found {len(presets)} presets")
         except Exception as e:
@@ -2775,151 +3222,36 @@ class MBNL_OT_refresh_presets(Operator):
 # 自定义分辨率快捷设置操作器
 # -----------------------------------------------------------------------------
 
-class MBNL_OT_set_custom_1536(Operator):
-    bl_idname = "mbnl.set_custom_1536"
-    bl_label = "Set 1536"
-    bl_options = {"REGISTER", "UNDO"}
-
-    def execute(self, context):
-        scene = context.scene
-        scene.mbnl_custom_width_1 = 1536
-        scene.mbnl_custom_height_1 = 1536
-        scene.mbnl_use_custom_1 = True
-        return {'FINISHED'}
-
-
-class MBNL_OT_set_custom_3072(Operator):
-    bl_idname = "mbnl.set_custom_3072"
-    bl_label = "Set 3072"
-    bl_options = {"REGISTER", "UNDO"}
-
-    def execute(self, context):
-        scene = context.scene
-        scene.mbnl_custom_width_2 = 3072
-        scene.mbnl_custom_height_2 = 3072
-        scene.mbnl_use_custom_2 = True
-        return {'FINISHED'}
-
-
-class MBNL_OT_set_custom_6144(Operator):
-    bl_idname = "mbnl.set_custom_6144"
-    bl_label = "Set 6144"
-    bl_options = {"REGISTER", "UNDO"}
-
-    def execute(self, context):
-        scene = context.scene
-        scene.mbnl_custom_width_3 = 6144
-        scene.mbnl_custom_height_3 = 6144
-        scene.mbnl_use_custom_3 = True
-        return {'FINISHED'}
-
-
-# 矩形分辨率快捷按钮
-class MBNL_OT_set_custom_1920x1080(Operator):
-    bl_idname = "mbnl.set_custom_1920x1080"
-    bl_label = "Set 1920×1080"
-    bl_options = {"REGISTER", "UNDO"}
-
-    def execute(self, context):
-        scene = context.scene
-        # 找到第一个未使用的自定义分辨率槽
-        if not scene.mbnl_use_custom_1:
-            scene.mbnl_custom_width_1 = 1920
-            scene.mbnl_custom_height_1 = 1080
-            scene.mbnl_use_custom_1 = True
-        elif not scene.mbnl_use_custom_2:
-            scene.mbnl_custom_width_2 = 1920
-            scene.mbnl_custom_height_2 = 1080
-            scene.mbnl_use_custom_2 = True
-        elif not scene.mbnl_use_custom_3:
-            scene.mbnl_custom_width_3 = 1920
-            scene.mbnl_custom_height_3 = 1080
-            scene.mbnl_use_custom_3 = True
-        else:
-            # 如果都被使用了，替换第一个
-            scene.mbnl_custom_width_1 = 1920
-            scene.mbnl_custom_height_1 = 1080
-        return {'FINISHED'}
-
-
-class MBNL_OT_set_custom_1280x720(Operator):
-    bl_idname = "mbnl.set_custom_1280x720"
-    bl_label = "Set 1280×720"
-    bl_options = {"REGISTER", "UNDO"}
-
-    def execute(self, context):
-        scene = context.scene
-        # 找到第一个未使用的自定义分辨率槽
-        if not scene.mbnl_use_custom_1:
-            scene.mbnl_custom_width_1 = 1280
-            scene.mbnl_custom_height_1 = 720
-            scene.mbnl_use_custom_1 = True
-        elif not scene.mbnl_use_custom_2:
-            scene.mbnl_custom_width_2 = 1280
-            scene.mbnl_custom_height_2 = 720
-            scene.mbnl_use_custom_2 = True
-        elif not scene.mbnl_use_custom_3:
-            scene.mbnl_custom_width_3 = 1280
-            scene.mbnl_custom_height_3 = 720
-            scene.mbnl_use_custom_3 = True
-        else:
-            # 如果都被使用了，替换第二个
-            scene.mbnl_custom_width_2 = 1280
-            scene.mbnl_custom_height_2 = 720
-        return {'FINISHED'}
+# Common custom resolution buttons, one tuple per panel row: (width, height, slot, use first free slot)
+# Square presets always write their own slot, rectangular ones take the first unused slot
+# and overwrite their fallback slot when all three are in use
+CUSTOM_RES_PRESETS = (
+    ((1536, 1536, 1, False), (3072, 3072, 2, False), (6144, 6144, 3, False)),
+    ((1920, 1080, 1, True), (1280, 720, 2, True)),
+    ((2560, 1440, 3, True), (3840, 2160, 1, True)),
+)
 
 
-class MBNL_OT_set_custom_2560x1440(Operator):
-    bl_idname = "mbnl.set_custom_2560x1440"
-    bl_label = "Set 2560×1440"
+class MBNL_OT_set_custom_res(Operator):
+    bl_idname = "mbnl.set_custom_res"
+    bl_label = "Set Custom Resolution"
     bl_options = {"REGISTER", "UNDO"}
 
-    def execute(self, context):
-        scene = context.scene
-        # 找到第一个未使用的自定义分辨率槽
-        if not scene.mbnl_use_custom_1:
-            scene.mbnl_custom_width_1 = 2560
-            scene.mbnl_custom_height_1 = 1440
-            scene.mbnl_use_custom_1 = True
-        elif not scene.mbnl_use_custom_2:
-            scene.mbnl_custom_width_2 = 2560
-            scene.mbnl_custom_height_2 = 1440
-            scene.mbnl_use_custom_2 = True
-        elif not scene.mbnl_use_custom_3:
-            scene.mbnl_custom_width_3 = 2560
-            scene.mbnl_custom_height_3 = 1440
-            scene.mbnl_use_custom_3 = True
-        else:
-            # 如果都被使用了，替换第三个
-            scene.mbnl_custom_width_3 = 2560
-            scene.mbnl_custom_height_3 = 1440
-        return {'FINISHED'}
-
-
-class MBNL_OT_set_custom_3840x2160(Operator):
-    bl_idname = "mbnl.set_custom_3840x2160"
-    bl_label = "Set 3840×2160"
-    bl_options = {"REGISTER", "UNDO"}
+    width: IntProperty(name="Width", default=1536, min=16, max=16384)
+    height: IntProperty(name="Height", default=1536, min=16, max=16384)
+    fallback_slot: IntProperty(name="Fallback Slot", default=1, min=1, max=3)
+    use_free_slot: BoolProperty(name="Use Free Slot", default=True)
 
     def execute(self, context):
         scene = context.scene
-        # 找到第一个未使用的自定义分辨率槽
-        if not scene.mbnl_use_custom_1:
-            scene.mbnl_custom_width_1 = 3840
-            scene.mbnl_custom_height_1 = 2160
-            scene.mbnl_use_custom_1 = True
-        elif not scene.mbnl_use_custom_2:
-            scene.mbnl_custom_width_2 = 3840
-            scene.mbnl_custom_height_2 = 2160
-            scene.mbnl_use_custom_2 = True
-        elif not scene.mbnl_use_custom_3:
-            scene.mbnl_custom_width_3 = 3840
-            scene.mbnl_custom_height_3 = 2160
-            scene.mbnl_use_custom_3 = True
-        else:
-            # 如果都被使用了，替换第一个
-            scene.mbnl_custom_width_1 = 3840
-            scene.mbnl_custom_height_1 = 2160
+        slot = self.fallback_slot
+        if self.use_free_slot:
+            # 找到第一个未使用的自定义分辨率槽，都被使用时替换fallback_slot
+            slot = next((i for i, enabled in enumerate(get_custom_res_flags(scene), 1) if not enabled), slot)
+        use_prop, width_prop, height_prop = CUSTOM_RES_SLOTS[slot - 1]
+        setattr(scene, width_prop, self.width)
+        setattr(scene, height_prop, self.height)
+        setattr(scene, use_prop, True)
         return {'FINISHED'}
 
 
@@ -2947,6 +3279,188 @@ class MBNL_OT_clear_custom_res(Operator):
 # UI Panel
 # -----------------------------------------------------------------------------
 
+# Static help rows drawn by the panel: (text, icon)
+SHADOW_INFO_ROWS = {
+    'WITH_SHADOWS': (
+        ("✓ With Shadows: Complete lighting with shadows", 'LIGHT_SUN'),
+        ("• Includes shadows cast by all light sources", 'NONE'),
+        ("• Most realistic lighting reproduction", 'NONE'),
+    ),
+    'NO_SHADOWS': (
+        ("⚡ No Shadows: Direct lighting without shadows", 'LIGHT_SUN'),
+        ("• Temporarily disables shadows from all light sources", 'NONE'),
+        ("• Useful for even lighting without dark areas", 'NONE'),
+    ),
+}
+
+LIGHTING_INFO_ROWS = (
+    ("• Uses COMBINED method to capture complete lighting", 'NONE'),
+    ("• Auto-optimizes sample count and GPU acceleration", 'NONE'),
+    ("• Intelligently adjusts material settings to improve quality", 'NONE'),
+    ("• Includes direct lighting, indirect lighting and reflections", 'NONE'),
+)
+
+CS_AUTO_ROWS = (
+    ("🤖 Automatic Detection:", 'AUTO'),
+    ("• Color textures (Base Color, Emission): sRGB", 'NONE'),
+    ("• Data textures (Normal, Roughness, etc.): Non-Color", 'NONE'),
+    ("• Optimal for most workflows", 'NONE'),
+)
+
+ORG_INFO_ROWS = {
+    True: (
+        ("📁 Folder Structure:", 'FILE_FOLDER'),
+        ("ObjectName/MaterialName/Resolution/texture.png", 'NONE'),
+        ("Example: Cube/Material/2048x2048/basecolor.png", 'NONE'),
+    ),
+    False: (
+        ("📄 Traditional Naming:", 'FILE_BLANK'),
+        ("Object_Material_texture_resolution.png", 'NONE'),
+        ("Example: Cube_Material_basecolor_2048.png", 'NONE'),
+    ),
+}
+
+CUSTOM_SHADER_INFO_ROWS = (
+    ("💡 Custom Shader Baking Info:", 'INFO'),
+    ("• Bakes shader currently connected to Material Output", 'NONE'),
+    ("• Supports all types of shader nodes and node groups", 'NONE'),
+    ("• Includes Diffuse, Glossy, Emission, node groups, etc.", 'NONE'),
+    ("• Baking result is the final color output of the shader", 'NONE'),
+)
+
+MIXED_STRATEGY_INFO = {
+    'SURFACE_OUTPUT': ("✓ Full Surface Output: Bake final mixed result (recommended)", 'CHECKMARK'),
+    'PRINCIPLED_ONLY': ("⚠ Principled BSDF Only: Ignore custom shader parts", 'ERROR'),
+    'CUSTOM_ONLY': ("🧪 Custom Shader Only: Experimental feature, may be unstable", 'EXPERIMENTAL'),
+}
+
+NODE_GROUP_INFO_ROWS = (
+    ("🔧 Node Group Optimization:", 'NODE_MATERIAL'),
+    ("• Intelligently detects node group Shader/BSDF/Color outputs", 'NONE'),
+    ("• Auto-resolves node group output connection issues", 'NONE'),
+    ("• Detailed baking process logs help with debugging", 'NONE'),
+)
+
+# Atlas section hint for 0, 1 (with fewer than 2 materials) and several selected objects
+ATLAS_HINTS = (
+    "Please select an object",
+    "Requires at least 2 material slots",
+    "Atlas baking only supports single object",
+)
+
+ATLAS_INFO_ROWS = (
+    ("💡 Atlas Baking Info:", 'INFO'),
+    ("• Merges multiple material slots into one texture", 'NONE'),
+    ("• Automatically remaps UV coordinates", 'NONE'),
+    ("• Suitable for game optimization and reducing Draw Calls", 'NONE'),
+    ("• Each material occupies one area of the atlas", 'NONE'),
+)
+
+
+# Custom output directory last shown by the panel, see custom_directory_status
+_PATH_CACHE = {'key': None, 'abs': "", 'safe': "", 'exists': False, 'checked': 0.0}
+
+# Seconds before the panel looks at the custom output directory on disk again
+PATH_CHECK_INTERVAL = 0.5
+
+
+def custom_directory_status(raw_path):
+    """Return (display path, exists) for the custom output directory, touching the disk at most every PATH_CHECK_INTERVAL"""
+    now = time.monotonic()
+    # Relative paths resolve against the blend file
+    key = (raw_path, bpy.data.filepath)
+    if key != _PATH_CACHE['key']:
+        abs_path = bpy.path.abspath(raw_path)
+        _PATH_CACHE['abs'] = abs_path
+        _PATH_CACHE['safe'] = safe_path_display(abs_path)
+        _PATH_CACHE['key'] = key
+    # Typing a path changes it on every keystroke, so new paths wait for the interval too
+    if now - _PATH_CACHE['checked'] > PATH_CHECK_INTERVAL:
+        _PATH_CACHE['exists'] = os.path.exists(_PATH_CACHE['abs'])
+        _PATH_CACHE['checked'] = now
+    return _PATH_CACHE['safe'], _PATH_CACHE['exists']
+
+
+# Finished summary labels keyed by the selection they describe, see summary_label
+_SUMMARY_CACHE = {}
+
+# The selections only change with user toggles, so a handful of entries is enough
+SUMMARY_CACHE_SIZE = 8
+
+
+def summary_label(key, build):
+    """Return the cached summary label for key, building it with build(key) on a miss"""
+    text = _SUMMARY_CACHE.get(key)
+    if text is None:
+        if len(_SUMMARY_CACHE) >= SUMMARY_CACHE_SIZE:
+            _SUMMARY_CACHE.clear()
+        text = _SUMMARY_CACHE[key] = build(key)
+    return text
+
+
+def build_resolutions_summary(key):
+    """Format the export resolutions summary for a ('resolutions', presets, customs) key"""
+    _, selected_preset, selected_custom = key
+    preset_info = (f'{r}×{r}' for r in selected_preset)
+    custom_info = (f'{r}×{r}(custom)' if r.isdigit() else f'{r}(custom)' for r in selected_custom)
+    return "✓ Export resolutions: " + ", ".join((*preset_info, *custom_info))
+
+
+def build_channels_summary(key):
+    """Format the channels summary for a ('channels', channel flags) key"""
+    channel_flags = key[1]
+    selected_count = sum(channel_flags)
+    if selected_count <= 6:
+        return "Channels: " + ", ".join(label for label, enabled in zip(CHANNEL_LABELS, channel_flags) if enabled)
+    return f"Channels: {selected_count} selected"
+
+
+def draw_colorspace_auto(layout, scene):
+    """Color space options for the AUTO mode"""
+    draw_label_rows(layout, CS_AUTO_ROWS)
+
+
+def draw_colorspace_custom(layout, scene):
+    """Color space options for the CUSTOM mode"""
+    layout.label(text="⚙️ Custom Settings:", icon='PREFERENCES')
+    
+    # Custom color space settings in columns
+    cs_row1 = layout.row()
+    cs_col1 = cs_row1.column()
+    cs_col2 = cs_row1.column()
+    
+    cs_col1.prop(scene, "mbnl_colorspace_basecolor", text="Base Color")
+    cs_col1.prop(scene, "mbnl_colorspace_emission", text="Emission")
+    
+    cs_col2.prop(scene, "mbnl_colorspace_normal", text="Normal Maps")
+    cs_col2.prop(scene, "mbnl_colorspace_roughness", text="Data Maps")
+
+
+def draw_colorspace_manual(layout, scene):
+    """Color space options for the MANUAL mode"""
+    layout.label(text="🎛️ Manual Override:", icon='PREFERENCES')
+    layout.prop(scene, "mbnl_colorspace_manual_override", text="All Textures")
+    layout.label(text="⚠️ Override applies to ALL baked textures", icon='ERROR')
+
+
+COLORSPACE_MODE_DRAW = {
+    'AUTO': draw_colorspace_auto,
+    'CUSTOM': draw_colorspace_custom,
+    'MANUAL': draw_colorspace_manual,
+}
+
+
+# Below this region width the panel only draws its name
+PANEL_MIN_WIDTH = 120
+
+
+def draw_label_rows(layout, rows):
+    """Draw (text, icon) rows as labels"""
+    label = layout.label
+    for text, icon in rows:
+        label(text=text, icon=icon)
+
+
 class MBNL_PT_panel(Panel):
     bl_label = "EasyBake"
     bl_idname = "MBNL_PT_panel"
@@ -2958,37 +3472,17 @@ class MBNL_PT_panel(Panel):
         layout = self.layout
         scene = context.scene
 
+        # Nothing fits in a region this narrow, skip the material analysis and file checks below
+        if getattr(context.region, 'width', PANEL_MIN_WIDTH) < PANEL_MIN_WIDTH:
+            layout.label(text="Bake")
+            return
+
         # Pre-calculate object and material information for entire UI
-        selected_objects = [obj for obj in context.selected_objects if obj.type == "MESH"]
-        total_materials = 0
-        material_stats = {
-            'textured': 0,
-            'procedural': 0,
-            'mixed': 0,
-            'default': 0,
-            'custom_shader': 0,
-            'mixed_shader': 0,
-            'mixed_shader_network': 0,
-            'principled_with_custom': 0,
-            'custom_with_principled': 0
-        }
-        
-        if selected_objects:
-            for obj in selected_objects:
-                for slot in obj.material_slots:
-                    if slot.material and slot.material.use_nodes:
-                        total_materials += 1
-                        try:
-                            analysis = analyze_material(slot.material)
-                            mat_type = analysis.get('material_type', 'unknown')
-                            if mat_type in material_stats:
-                                material_stats[mat_type] += 1
-                            else:
-                                material_stats['default'] += 1
-                        except Exception as e:
-                            # 如果材质分析失败，计为默认材质
-                            material_stats['default'] += 1
-                            print(f"UI material analysis error: {e}")
+        # (the custom shader section needs the mixed shader count even while the type distribution is hidden)
+        selection = context.selected_objects
+        selected_objects, mat_counts, total_materials, material_stats, stats_rows, mixed_count = get_ui_stats(
+            selection, scene.mbnl_show_stats or scene.mbnl_include_custom_shader, STATS_AUTO_ANALYZE_LIMIT)
+        non_mesh_count = len(selection) - len(selected_objects)
 
         # =============================================================================
         # 1. 顶部：物体状态信息
@@ -3008,46 +3502,37 @@ class MBNL_PT_panel(Panel):
             
             # Material type statistics (only show when multiple types exist)
             if total_materials > 0:
-                type_count = sum(1 for count in material_stats.values() if count > 0)
-                if type_count > 1:
+                status_box.prop(scene, "mbnl_show_stats", icon='TRIA_DOWN' if scene.mbnl_show_stats else 'TRIA_RIGHT', emboss=False)
+            if total_materials > 0 and scene.mbnl_show_stats:
+                if material_stats is None:
+                    # Large selections are only analyzed on request
+                    status_box.operator("mbnl.analyze_selection", text="Too many objects - click to analyze", icon='VIEWZOOM')
+                elif sum(1 for count in material_stats.values() if count > 0) > 1:
                     stats_box = status_box.box()
                     stats_box.label(text="Material Type Distribution:", icon='MATERIAL')
                     stats_row = stats_box.row()
-                    stats_col1 = stats_row.column()
-                    stats_col2 = stats_row.column()
+                    stats_cols = cycle((stats_row.column(), stats_row.column()))
                     
-                    if material_stats['textured'] > 0:
-                        stats_col1.label(text=f"  Textured: {material_stats['textured']}")
-                    if material_stats['procedural'] > 0:
-                        stats_col1.label(text=f"  Solid Color: {material_stats['procedural']}")
-                    if material_stats['mixed'] > 0:
-                        stats_col2.label(text=f"  Mixed: {material_stats['mixed']}")
-                    if material_stats['default'] > 0:
-                        stats_col2.label(text=f"  Default: {material_stats['default']}")
-                    if material_stats['custom_shader'] > 0:
-                        stats_col1.label(text=f"  Custom Shader: {material_stats['custom_shader']}")
-                    if material_stats['mixed_shader'] > 0:
-                        stats_col2.label(text=f"  Mixed Shader: {material_stats['mixed_shader']}")
+                    for label, count in stats_rows:
+                        next(stats_cols).label(text=f"  {label}: {count}")
                     if material_stats['mixed_shader_network'] > 0:
                         stats_box.label(text=f"🔗 Mixed Network: {material_stats['mixed_shader_network']} (strategy needed)", icon='NODE_MATERIAL')
-                    if material_stats['principled_with_custom'] > 0:
-                        stats_col1.label(text=f"  PBR+Custom: {material_stats['principled_with_custom']}")
-                    if material_stats['custom_with_principled'] > 0:
-                        stats_col2.label(text=f"  Custom+PBR: {material_stats['custom_with_principled']}")
             
             # Object details (simplified display)
             if len(selected_objects) <= 2:
-                for obj in selected_objects:
-                    mat_count = len([slot for slot in obj.material_slots if slot.material and slot.material.use_nodes])
-                    safe_obj_name = safe_encode_text(obj.name, "Unnamed Object")
+                for obj, mat_count in zip(selected_objects, mat_counts):
+                    safe_obj_name = safe_name_cached(obj.name, "Unnamed Object")
                     status_box.label(text=f"  • {safe_obj_name} ({mat_count} materials)")
             elif len(selected_objects) <= 5:
                 detail_row = status_box.row()
-                obj_names = [safe_encode_text(obj.name, "Unnamed") for obj in selected_objects[:3]]
-                detail_row.label(text=f"  • {', '.join(obj_names)} + {len(selected_objects) - 3} more objects")
+                obj_names = ", ".join(safe_name_cached(obj.name, "Unnamed") for obj in selected_objects[:3])
+                detail_row.label(text=f"  • {obj_names} + {len(selected_objects) - 3} more objects")
             else:
                 detail_row = status_box.row()
                 detail_row.label(text=f"  • Batch processing: {len(selected_objects)} objects")
+            
+            if non_mesh_count > 0:
+                status_box.label(text=f"  {non_mesh_count} non-mesh objects will be ignored", icon='INFO')
         else:
             status_box.alert = True
             status_box.label(text="⚠ Please select at least one mesh object", icon='ERROR')
@@ -3094,6 +3579,7 @@ class MBNL_PT_panel(Panel):
             basic_box.prop(scene, "mbnl_resolution")
         
         basic_box.prop(scene, "mbnl_replace_nodes")
+        basic_box.prop(scene, "mbnl_verbose_logging")
         basic_box.prop(scene, "mbnl_include_lighting")
         
         # Lighting baking explanation
@@ -3107,23 +3593,12 @@ class MBNL_PT_panel(Panel):
             
             # Shadow mode explanation
             shadow_info_box = light_info_box.box()
-            if scene.mbnl_lighting_shadow_mode == 'WITH_SHADOWS':
-                shadow_info_box.label(text="✓ With Shadows: Complete lighting with shadows", icon='LIGHT_SUN')
-                shadow_info_box.label(text="• Includes shadows cast by all light sources")
-                shadow_info_box.label(text="• Most realistic lighting reproduction")
-            else:  # NO_SHADOWS
-                shadow_info_box.label(text="⚡ No Shadows: Direct lighting without shadows", icon='LIGHT_SUN')
-                shadow_info_box.label(text="• Temporarily disables shadows from all light sources")
-                shadow_info_box.label(text="• Useful for even lighting without dark areas")
+            draw_label_rows(shadow_info_box, SHADOW_INFO_ROWS.get(scene.mbnl_lighting_shadow_mode, SHADOW_INFO_ROWS['NO_SHADOWS']))
             
-            light_info_box.label(text="• Uses COMBINED method to capture complete lighting")
-            light_info_box.label(text="• Auto-optimizes sample count and GPU acceleration")
-            light_info_box.label(text="• Intelligently adjusts material settings to improve quality")
-            light_info_box.label(text="• Includes direct lighting, indirect lighting and reflections")
+            draw_label_rows(light_info_box, LIGHTING_INFO_ROWS)
             
             # Add performance tip
-            perf_row = light_info_box.row()
-            perf_row.label(text="⚡ Tip: Lighting baking takes longer, GPU recommended", icon='INFO')
+            light_info_box.label(text="⚡ Tip: Lighting baking takes longer, GPU recommended", icon='INFO')
 
         layout.separator()
 
@@ -3137,33 +3612,9 @@ class MBNL_PT_panel(Panel):
         colorspace_box.prop(scene, "mbnl_colorspace_mode", text="Mode")
         
         # Show different options based on mode
-        if scene.mbnl_colorspace_mode == 'AUTO':
-            cs_info_box = colorspace_box.box()
-            cs_info_box.label(text="🤖 Automatic Detection:", icon='AUTO')
-            cs_info_box.label(text="• Color textures (Base Color, Emission): sRGB")
-            cs_info_box.label(text="• Data textures (Normal, Roughness, etc.): Non-Color")
-            cs_info_box.label(text="• Optimal for most workflows")
-            
-        elif scene.mbnl_colorspace_mode == 'CUSTOM':
-            cs_custom_box = colorspace_box.box()
-            cs_custom_box.label(text="⚙️ Custom Settings:", icon='PREFERENCES')
-            
-            # Custom color space settings in columns
-            cs_row1 = cs_custom_box.row()
-            cs_col1 = cs_row1.column()
-            cs_col2 = cs_row1.column()
-            
-            cs_col1.prop(scene, "mbnl_colorspace_basecolor", text="Base Color")
-            cs_col1.prop(scene, "mbnl_colorspace_emission", text="Emission")
-            
-            cs_col2.prop(scene, "mbnl_colorspace_normal", text="Normal Maps")  
-            cs_col2.prop(scene, "mbnl_colorspace_roughness", text="Data Maps")
-            
-        elif scene.mbnl_colorspace_mode == 'MANUAL':
-            cs_manual_box = colorspace_box.box()
-            cs_manual_box.label(text="🎛️ Manual Override:", icon='PREFERENCES')
-            cs_manual_box.prop(scene, "mbnl_colorspace_manual_override", text="All Textures")
-            cs_manual_box.label(text="⚠️ Override applies to ALL baked textures", icon='ERROR')
+        draw_colorspace = COLORSPACE_MODE_DRAW.get(scene.mbnl_colorspace_mode)
+        if draw_colorspace is not None:
+            draw_colorspace(colorspace_box.box(), scene)
 
         layout.separator()
 
@@ -3177,16 +3628,8 @@ class MBNL_PT_panel(Panel):
         output_box.prop(scene, "mbnl_organize_folders")
         
         # Folder organization explanation
-        if scene.mbnl_organize_folders:
-            org_info_box = output_box.box()
-            org_info_box.label(text="📁 Folder Structure:", icon='FILE_FOLDER')
-            org_info_box.label(text="ObjectName/MaterialName/Resolution/texture.png")
-            org_info_box.label(text="Example: Cube/Material/2048x2048/basecolor.png")
-        else:
-            org_info_box = output_box.box()
-            org_info_box.label(text="📄 Traditional Naming:", icon='FILE_BLANK')
-            org_info_box.label(text="Object_Material_texture_resolution.png")
-            org_info_box.label(text="Example: Cube_Material_basecolor_2048.png")
+        org_info_box = output_box.box()
+        draw_label_rows(org_info_box, ORG_INFO_ROWS[scene.mbnl_organize_folders])
         
         # Custom output directory
         output_box.prop(scene, "mbnl_use_custom_directory")
@@ -3200,10 +3643,9 @@ class MBNL_PT_panel(Panel):
             # Show current path information
             if scene.mbnl_custom_directory:
                 try:
-                    abs_path = bpy.path.abspath(scene.mbnl_custom_directory)
-                    safe_path = safe_path_display(abs_path)
+                    safe_path, path_exists = custom_directory_status(scene.mbnl_custom_directory)
                     
-                    if os.path.exists(abs_path):
+                    if path_exists:
                         info_row = custom_dir_box.row()
                         info_row.label(text=f"✓ Directory exists: {safe_path}", icon='CHECKMARK')
                     else:
@@ -3255,73 +3697,58 @@ class MBNL_PT_panel(Panel):
                 custom_box.label(text="Custom Resolutions:", icon='SETTINGS')
                 
                 # Custom resolution settings
-                for i in range(1, 4):
+                for use_prop, width_prop, height_prop in CUSTOM_RES_SLOTS:
                     custom_row = custom_box.row(align=True)
-                    custom_row.prop(scene, f"mbnl_use_custom_{i}", text="")
+                    custom_row.prop(scene, use_prop, text="")
                     sub_row = custom_row.row(align=True)
-                    sub_row.enabled = getattr(scene, f"mbnl_use_custom_{i}")
-                    sub_row.prop(scene, f"mbnl_custom_width_{i}", text="Width")
-                    sub_row.prop(scene, f"mbnl_custom_height_{i}", text="Height")
+                    sub_row.enabled = getattr(scene, use_prop)
+                    sub_row.prop(scene, width_prop, text="Width")
+                    sub_row.prop(scene, height_prop, text="Height")
                 
                 # Common resolution quick buttons
                 preset_box = custom_box.box()
                 preset_box.label(text="Common Resolutions:")
                 
-                square_row = preset_box.row(align=True)
-                square_row.operator("mbnl.set_custom_1536", text="1536²")
-                square_row.operator("mbnl.set_custom_3072", text="3072²")
-                square_row.operator("mbnl.set_custom_6144", text="6144²")
-                
-                rect_row1 = preset_box.row(align=True)
-                rect_row1.operator("mbnl.set_custom_1920x1080", text="1920×1080")
-                rect_row1.operator("mbnl.set_custom_1280x720", text="1280×720")
-                
-                rect_row2 = preset_box.row(align=True)
-                rect_row2.operator("mbnl.set_custom_2560x1440", text="2560×1440")
-                rect_row2.operator("mbnl.set_custom_3840x2160", text="3840×2160")
+                for presets in CUSTOM_RES_PRESETS:
+                    preset_row = preset_box.row(align=True)
+                    for width, height, slot, use_free_slot in presets:
+                        op = preset_row.operator("mbnl.set_custom_res", text=f"{width}²" if width == height else f"{width}×{height}")
+                        op.width = width
+                        op.height = height
+                        op.fallback_slot = slot
+                        op.use_free_slot = use_free_slot
                 
                 clear_row = preset_box.row()
                 clear_row.operator("mbnl.clear_custom_res", text="Clear Custom", icon='X')
             
             # Show selected resolutions
-            selected_preset = []
-            selected_custom = []
-            
-            # Preset resolutions
-            if scene.mbnl_res_512: selected_preset.append("512")
-            if scene.mbnl_res_1024: selected_preset.append("1024")
-            if scene.mbnl_res_2048: selected_preset.append("2048")
-            if scene.mbnl_res_4096: selected_preset.append("4096")
-            if scene.mbnl_res_8192: selected_preset.append("8192")
+            preset_values = [res for res, enabled in zip(PRESET_RESOLUTIONS, get_preset_res_flags(scene)) if enabled]
+            selected_preset = [str(res) for res in preset_values]
+            # Largest selected width, for the high resolution tip
+            max_res = preset_values[-1] if preset_values else 0
             
             # Custom resolutions
+            selected_custom = []
             if scene.mbnl_enable_custom_resolution:
-                for i in range(1, 4):
-                    if getattr(scene, f"mbnl_use_custom_{i}"):
-                        w = getattr(scene, f"mbnl_custom_width_{i}")
-                        h = getattr(scene, f"mbnl_custom_height_{i}")
-                        if w == h:
-                            selected_custom.append(f"{w}")
-                        else:
-                            selected_custom.append(f"{w}x{h}")
+                for get_slot in CUSTOM_RES_GETTERS:
+                    enabled, w, h = get_slot(scene)
+                    if enabled:
+                        selected_custom.append(str(w) if w == h else f"{w}x{h}")
+                        max_res = max(max_res, w)
             
             all_selected = selected_preset + selected_custom
             
             if all_selected:
-                summary_box = multi_res_box.box()
-                preset_info = [f'{r}×{r}' for r in selected_preset]
-                custom_info = [f'{r}×{r}(custom)' if r.isdigit() else f'{r}(custom)' for r in selected_custom]
-                display_info = preset_info + custom_info
-                
-                summary_box.label(text=f"✓ Export resolutions: {', '.join(display_info)}", icon='CHECKMARK')
+                summary_key = ('resolutions', tuple(selected_preset), tuple(selected_custom))
+                multi_res_box.label(text=summary_label(summary_key, build_resolutions_summary), icon='CHECKMARK')
                 
                 # Performance tip
-                if len(all_selected) > 2 or any(int(r.split('x')[0]) >= 4096 for r in all_selected):
-                    summary_box.label(text="💡 High resolution/multi-resolution baking takes longer", icon='INFO')
+                if len(all_selected) > 2 or max_res >= 4096:
+                    multi_res_box.label(text="💡 High resolution/multi-resolution baking takes longer", icon='INFO')
             else:
-                warning_box = multi_res_box.box()
-                warning_box.alert = True
-                warning_box.label(text="⚠ Please select at least one resolution", icon='ERROR')
+                warning_row = multi_res_box.row()
+                warning_row.alert = True
+                warning_row.label(text="⚠ Please select at least one resolution", icon='ERROR')
 
         layout.separator()
 
@@ -3384,38 +3811,25 @@ class MBNL_PT_panel(Panel):
         # Custom shader explanation
         if scene.mbnl_include_custom_shader:
             info_box = custom_shader_box.box()
-            info_box.label(text="💡 Custom Shader Baking Info:", icon='INFO')
-            info_box.label(text="• Bakes shader currently connected to Material Output")
-            info_box.label(text="• Supports all types of shader nodes and node groups")
-            info_box.label(text="• Includes Diffuse, Glossy, Emission, node groups, etc.")
-            info_box.label(text="• Baking result is the final color output of the shader")
+            draw_label_rows(info_box, CUSTOM_SHADER_INFO_ROWS)
             
-            # Mixed shader strategy selection
-            mixed_count = (material_stats.get('mixed_shader_network', 0) + 
-                          material_stats.get('principled_with_custom', 0) + 
-                          material_stats.get('custom_with_principled', 0))
-            
-            if mixed_count > 0:
+            # Mixed shader strategy selection, always offered while the selection is too large to analyze
+            if mixed_count is None or mixed_count > 0:
                 strategy_box = custom_shader_box.box()
                 strategy_box.label(text="🔀 Mixed Shader Strategy:", icon='NODE_MATERIAL')
-                strategy_box.label(text=f"Detected {mixed_count} mixed shader materials")
+                if mixed_count:
+                    strategy_box.label(text=f"Detected {mixed_count} mixed shader materials")
                 strategy_box.prop(scene, "mbnl_mixed_shader_strategy", text="Processing Strategy")
                 
                 # Strategy explanation
-                strategy_info = strategy_box.box()
-                if scene.mbnl_mixed_shader_strategy == 'SURFACE_OUTPUT':
-                    strategy_info.label(text="✓ Full Surface Output: Bake final mixed result (recommended)", icon='CHECKMARK')
-                elif scene.mbnl_mixed_shader_strategy == 'PRINCIPLED_ONLY':
-                    strategy_info.label(text="⚠ Principled BSDF Only: Ignore custom shader parts", icon='ERROR')
-                elif scene.mbnl_mixed_shader_strategy == 'CUSTOM_ONLY':
-                    strategy_info.label(text="🧪 Custom Shader Only: Experimental feature, may be unstable", icon='EXPERIMENTAL')
+                strategy_row = MIXED_STRATEGY_INFO.get(scene.mbnl_mixed_shader_strategy)
+                if strategy_row is not None:
+                    text, icon = strategy_row
+                    strategy_box.label(text=text, icon=icon)
             
             # Special notes for node groups
             warning_box = info_box.box()
-            warning_box.label(text="🔧 Node Group Optimization:", icon='NODE_MATERIAL')
-            warning_box.label(text="• Intelligently detects node group Shader/BSDF/Color outputs")
-            warning_box.label(text="• Auto-resolves node group output connection issues")
-            warning_box.label(text="• Detailed baking process logs help with debugging")
+            draw_label_rows(warning_box, NODE_GROUP_INFO_ROWS)
 
         layout.separator()
 
@@ -3426,21 +3840,14 @@ class MBNL_PT_panel(Panel):
         atlas_box.label(text="🎯 Material Atlas Baking", icon='TEXTURE')
         
         # Check if suitable for atlas baking
-        atlas_eligible = False
-        if selected_objects and len(selected_objects) == 1:
-            obj = selected_objects[0]
-            material_count = len([slot for slot in obj.material_slots if slot.material and slot.material.use_nodes])
-            if material_count >= 2:
-                atlas_eligible = True
-                safe_obj_name = safe_encode_text(obj.name, "Unnamed Object")
-                atlas_box.label(text=f"✓ Object: {safe_obj_name} ({material_count} materials)", icon='CHECKMARK')
-            else:
-                atlas_box.label(text="Requires at least 2 material slots", icon='INFO')
+        selected_count = len(selected_objects)
+        material_count = mat_counts[0] if selected_count == 1 else 0
+        atlas_eligible = material_count >= 2
+        if atlas_eligible:
+            safe_obj_name = safe_name_cached(selected_objects[0].name, "Unnamed Object")
+            atlas_box.label(text=f"✓ Object: {safe_obj_name} ({material_count} materials)", icon='CHECKMARK')
         else:
-            if len(selected_objects) > 1:
-                atlas_box.label(text="Atlas baking only supports single object", icon='INFO')
-            else:
-                atlas_box.label(text="Please select an object", icon='INFO')
+            atlas_box.label(text=ATLAS_HINTS[min(selected_count, 2)], icon='INFO')
         
         if atlas_eligible:
             # Atlas settings
@@ -3450,8 +3857,6 @@ class MBNL_PT_panel(Panel):
             atlas_settings_box.prop(scene, "mbnl_atlas_layout_mode")
             
             if scene.mbnl_atlas_layout_mode == 'AUTO':
-                obj = selected_objects[0]
-                material_count = len([slot for slot in obj.material_slots if slot.material and slot.material.use_nodes])
                 auto_cols, auto_rows = calculate_atlas_layout(material_count)
                 atlas_settings_box.label(text=f"Auto Layout: {auto_cols}×{auto_rows}", icon='AUTO')
             else:
@@ -3478,25 +3883,12 @@ class MBNL_PT_panel(Panel):
             atlas_button_row = atlas_box.row()
             atlas_button_row.scale_y = 1.3
             
-            atlas_op = atlas_button_row.operator("mbnl.bake_material_atlas", text="🎯 Bake Material Atlas", icon='TEXTURE')
-            atlas_op.resolution = scene.mbnl_resolution
-            atlas_op.atlas_layout_mode = scene.mbnl_atlas_layout_mode
-            atlas_op.atlas_cols = scene.mbnl_atlas_cols
-            atlas_op.atlas_rows = scene.mbnl_atlas_rows
-            atlas_op.atlas_padding = scene.mbnl_atlas_padding
-            atlas_op.atlas_update_uv = scene.mbnl_atlas_update_uv
-            atlas_op.include_basecolor = scene.mbnl_atlas_include_basecolor
-            atlas_op.include_roughness = scene.mbnl_atlas_include_roughness
-            atlas_op.include_metallic = scene.mbnl_atlas_include_metallic
-            atlas_op.include_normal = scene.mbnl_atlas_include_normal
+            # The operator copies the atlas settings from the scene when invoked
+            atlas_button_row.operator("mbnl.bake_material_atlas", text="🎯 Bake Material Atlas", icon='TEXTURE')
             
             # Atlas explanation
             atlas_info_box = atlas_box.box()
-            atlas_info_box.label(text="💡 Atlas Baking Info:", icon='INFO')
-            atlas_info_box.label(text="• Merges multiple material slots into one texture")
-            atlas_info_box.label(text="• Automatically remaps UV coordinates")
-            atlas_info_box.label(text="• Suitable for game optimization and reducing Draw Calls")
-            atlas_info_box.label(text="• Each material occupies one area of the atlas")
+            draw_label_rows(atlas_info_box, ATLAS_INFO_ROWS)
         else:
             atlas_box.enabled = False
 
@@ -3520,35 +3912,21 @@ class MBNL_PT_panel(Panel):
             bake_issues.append("No available materials")
         
         # Check channel selection
-        selected_channels = []
-        if scene.mbnl_include_basecolor: selected_channels.append("Base Color")
-        if scene.mbnl_include_roughness: selected_channels.append("Roughness")
-        if scene.mbnl_include_metallic: selected_channels.append("Metallic")
-        if scene.mbnl_include_normal: selected_channels.append("Normal")
-        if scene.mbnl_include_subsurface: selected_channels.append("Subsurface")
-        if scene.mbnl_include_transmission: selected_channels.append("Transmission")
-        if scene.mbnl_include_emission: selected_channels.append("Emission")
-        if scene.mbnl_include_alpha: selected_channels.append("Alpha")
-        if scene.mbnl_include_specular: selected_channels.append("Specular")
-        if scene.mbnl_include_clearcoat: selected_channels.append("Clearcoat")
-        if scene.mbnl_include_clearcoat_roughness: selected_channels.append("Clearcoat Roughness")
-        if scene.mbnl_include_sheen: selected_channels.append("Sheen")
-        if scene.mbnl_include_displacement: selected_channels.append("Displacement")
-        if scene.mbnl_include_ambient_occlusion: selected_channels.append("AO")
-        if scene.mbnl_include_custom_shader: selected_channels.append("Custom Shader")
-        
-        if not selected_channels:
+        channel_flags = get_channel_flags(scene)
+        has_channels = any(channel_flags)
+        
+        if not has_channels:
             can_bake = False
             bake_issues.append("No channels selected")
         
         # Check multi-resolution settings
+        res_flags = get_preset_res_flags(scene)
+        res_count = sum(res_flags)
+        if scene.mbnl_enable_custom_resolution:
+            res_count += sum(get_custom_res_flags(scene))
+        
         if scene.mbnl_enable_multi_resolution:
-            has_resolution = (scene.mbnl_res_512 or scene.mbnl_res_1024 or scene.mbnl_res_2048 or 
-                             scene.mbnl_res_4096 or scene.mbnl_res_8192)
-            if scene.mbnl_enable_custom_resolution:
-                has_resolution = has_resolution or scene.mbnl_use_custom_1 or scene.mbnl_use_custom_2 or scene.mbnl_use_custom_3
-            
-            if not has_resolution:
+            if not res_count:
                 can_bake = False
                 bake_issues.append("Multi-resolution enabled but no resolutions selected")
         
@@ -3558,17 +3936,10 @@ class MBNL_PT_panel(Panel):
             status_box.label(text="✓ Ready to Bake", icon='CHECKMARK')
             
             # Show baking summary
-            if selected_channels:
-                if len(selected_channels) <= 6:
-                    status_box.label(text=f"Channels: {', '.join(selected_channels)}")
-                else:
-                    status_box.label(text=f"Channels: {len(selected_channels)} selected")
+            if has_channels:
+                status_box.label(text=summary_label(('channels', channel_flags), build_channels_summary))
             
             if scene.mbnl_enable_multi_resolution:
-                res_count = sum([scene.mbnl_res_512, scene.mbnl_res_1024, scene.mbnl_res_2048, 
-                               scene.mbnl_res_4096, scene.mbnl_res_8192])
-                if scene.mbnl_enable_custom_resolution:
-                    res_count += sum([scene.mbnl_use_custom_1, scene.mbnl_use_custom_2, scene.mbnl_use_custom_3])
                 status_box.label(text=f"Resolutions: {res_count}")
             else:
                 status_box.label(text=f"Resolution: {scene.mbnl_resolution}×{scene.mbnl_resolution}")
@@ -3586,54 +3957,8 @@ class MBNL_PT_panel(Panel):
         button_row = button_layout.row()
         button_row.scale_y = 1.5  # Make button more prominent
         
-        op = button_row.operator(MBNL_OT_bake.bl_idname, text="🎯 Start PBR Texture Baking", icon='RENDER_RESULT')
-        
-        # Set operator parameters
-        op.replace_nodes = scene.mbnl_replace_nodes
-        op.resolution = scene.mbnl_resolution
-        op.include_lighting = scene.mbnl_include_lighting
-        op.lighting_shadow_mode = scene.mbnl_lighting_shadow_mode
-        op.organize_folders = scene.mbnl_organize_folders
-        op.enable_multi_resolution = scene.mbnl_enable_multi_resolution
-        op.res_512 = scene.mbnl_res_512
-        op.res_1024 = scene.mbnl_res_1024
-        op.res_2048 = scene.mbnl_res_2048
-        op.res_4096 = scene.mbnl_res_4096
-        op.res_8192 = scene.mbnl_res_8192
-        op.enable_custom_resolution = scene.mbnl_enable_custom_resolution
-        op.custom_width_1 = scene.mbnl_custom_width_1
-        op.custom_height_1 = scene.mbnl_custom_height_1
-        op.custom_width_2 = scene.mbnl_custom_width_2
-        op.custom_height_2 = scene.mbnl_custom_height_2
-        op.custom_width_3 = scene.mbnl_custom_width_3
-        op.custom_height_3 = scene.mbnl_custom_height_3
-        op.use_custom_1 = scene.mbnl_use_custom_1
-        op.use_custom_2 = scene.mbnl_use_custom_2
-        op.use_custom_3 = scene.mbnl_use_custom_3
-        op.include_basecolor = scene.mbnl_include_basecolor
-        op.include_roughness = scene.mbnl_include_roughness
-        op.include_metallic = scene.mbnl_include_metallic
-        op.include_normal = scene.mbnl_include_normal
-        op.include_subsurface = scene.mbnl_include_subsurface
-        op.include_transmission = scene.mbnl_include_transmission
-        op.include_emission = scene.mbnl_include_emission
-        op.include_alpha = scene.mbnl_include_alpha
-        op.include_specular = scene.mbnl_include_specular
-        op.include_clearcoat = scene.mbnl_include_clearcoat
-        op.include_clearcoat_roughness = scene.mbnl_include_clearcoat_roughness
-        op.include_sheen = scene.mbnl_include_sheen
-        op.include_displacement = scene.mbnl_include_displacement
-        op.include_ambient_occlusion = scene.mbnl_include_ambient_occlusion
-        op.include_custom_shader = scene.mbnl_include_custom_shader
-        op.mixed_shader_strategy = scene.mbnl_mixed_shader_strategy
-        
-        # Color space settings
-        op.colorspace_mode = scene.mbnl_colorspace_mode
-        op.colorspace_basecolor = scene.mbnl_colorspace_basecolor
-        op.colorspace_normal = scene.mbnl_colorspace_normal
-        op.colorspace_roughness = scene.mbnl_colorspace_roughness
-        op.colorspace_emission = scene.mbnl_colorspace_emission
-        op.colorspace_manual_override = scene.mbnl_colorspace_manual_override
+        # The operator copies the bake settings from the scene when invoked
+        button_row.operator(MBNL_OT_bake.bl_idname, text="🎯 Start PBR Texture Baking", icon='RENDER_RESULT')
         
         # Add usage tips
         if can_bake:
@@ -3688,7 +4013,7 @@ class MBNL_PT_panel(Panel):
             if selected_objects and len(selected_objects) == 1:
                 obj = selected_objects[0]
                 if obj.data.uv_layers:
-                    detected_tiles = detect_udim_tiles(obj)
+                    detected_tiles = get_ui_udim_tiles(obj)
                     
                     if detected_tiles:
                         preview_box = udim_box.box()
@@ -3702,20 +4027,18 @@ class MBNL_PT_panel(Panel):
                         preview_box.label(text=tiles_text)
                         
                         # Tip information
-                        info_row = preview_box.row()
-                        info_row.label(text=f"💡 Will generate independent textures for each tile", icon='INFO')
+                        preview_box.label(text="💡 Will generate independent textures for each tile", icon='INFO')
                     else:
-                        warning_box = udim_box.box()
-                        warning_box.alert = True
-                        warning_box.label(text="⚠ No UDIM tiles detected", icon='ERROR')
-                        warning_box.label(text="Model may use standard 0-1 UV layout")
+                        warning_col = udim_box.column()
+                        warning_col.alert = True
+                        warning_col.label(text="⚠ No UDIM tiles detected", icon='ERROR')
+                        warning_col.label(text="Model may use standard 0-1 UV layout")
                 else:
-                    warning_box = udim_box.box()
-                    warning_box.alert = True
-                    warning_box.label(text="⚠ Object has no UV layers", icon='ERROR')
+                    warning_row = udim_box.row()
+                    warning_row.alert = True
+                    warning_row.label(text="⚠ Object has no UV layers", icon='ERROR')
             else:
-                info_box = udim_box.box()
-                info_box.label(text="💡 Please select single object to preview UDIM tiles", icon='INFO')
+                udim_box.label(text="💡 Please select single object to preview UDIM tiles", icon='INFO')
         else:
             udim_box.label(text="UDIM support disabled, will use standard UV baking")
 
@@ -3736,10 +4059,7 @@ class MBNL_OT_bake_material_atlas(Operator):
     resolution: IntProperty(name="Resolution", default=2048, min=16, max=16384)
     atlas_layout_mode: EnumProperty(
         name="Atlas Layout",
-        items=[
-            ('AUTO', 'Auto Layout', 'Automatically calculate optimal layout'),
-            ('MANUAL', 'Manual Layout', 'Manually specify rows and columns'),
-        ],
+        items=ATLAS_LAYOUT_ITEMS,
         default='AUTO'
     )
     atlas_cols: IntProperty(name="Columns", default=2, min=1, max=8)
@@ -3753,9 +4073,27 @@ class MBNL_OT_bake_material_atlas(Operator):
     include_metallic: BoolProperty(name="Metallic", default=True)
     include_normal: BoolProperty(name="Normal", default=True)
 
-    def execute(self, context):
-        ensure_cycles(context.scene)
-        
+    def invoke(self, context, event):
+        copy_scene_settings(self, context.scene, ATLAS_OP_PROPS)
+        return self.execute(context)
+
+    def execute(self, context):
+        ensure_cycles(context.scene)
+
+        # Run the atlas bake on the GPU when one is available
+        gpu_state = ensure_gpu_device(context.scene)
+        if gpu_state and gpu_state['backend']:
+            self.report({'INFO'}, f"Baking with Cycles GPU ({gpu_state['backend']})")
+        else:
+            self.report({'INFO'}, "No Cycles GPU device available, baking on CPU")
+
+        try:
+            with object_mode(context):
+                return self.bake_atlas(context)
+        finally:
+            restore_gpu_device(context.scene, gpu_state)
+
+    def bake_atlas(self, context):
         # 检查选中的物体
         selected_objects = [obj for obj in context.selected_objects if obj.type == "MESH"]
         if not selected_objects:
@@ -3788,15 +4126,13 @@ class MBNL_OT_bake_material_atlas(Operator):
         
         self.report({'INFO'}, f"Using atlas layout: {cols}×{rows}")
         
-        # 保存原始UV层名称
-        original_uv_name = obj.data.uv_layers.active.name if obj.data.uv_layers.active else None
+        # 图块用原始UV烘焙，没有UV时无法烘焙
+        if not obj.data.uv_layers.active:
+            self.report({'WARNING'}, f"Object '{obj.name}' has no UV map, unwrap it before creating an atlas")
+            return {'CANCELLED'}
+        original_uv_name = obj.data.uv_layers.active.name
         
         try:
-            # 创建图集UV映射
-            if self.atlas_update_uv:
-                atlas_uv_name = create_atlas_uv_layer(obj, material_slots, (cols, rows), self.atlas_padding)
-                self.report({'INFO'}, f"Created atlas UV layer: {atlas_uv_name}")
-            
             # 确定输出目录
             directory = self.directory if self.directory else bpy.path.abspath("//")
             
@@ -3813,85 +4149,102 @@ class MBNL_OT_bake_material_atlas(Operator):
             
             # 为每个通道创建图集纹理
             context.view_layer.objects.active = obj
+            size = self.resolution
             
-            for suffix, btype, alpha in passes:
-                # 创建图集图像
-                img_name = f"{obj.name}_Atlas_{suffix}"
-                img = bpy.data.images.new(img_name, width=self.resolution, height=self.resolution, alpha=alpha)
-                
-                # 设置颜色空间 - 使用智能检测
-                try:
-                    if suffix in ['BaseColor', 'Diffuse', 'Albedo', 'Color']:
-                        img.colorspace_settings.name = 'sRGB'
-                    elif suffix in ['Emission', 'EmissionColor']:
-                        img.colorspace_settings.name = 'sRGB'
-                    else:
-                        # Normal, Roughness, Metallic, etc.
-                        img.colorspace_settings.name = 'Non-Color'
-                except Exception as e:
-                    print(f"Warning: Cannot set color space for atlas {suffix}: {e}")
-                
-                # 为每个材质槽烘焙到图集的对应区域
+            # 每个材质用原始UV烘焙到自己的图块，再按图集区域拼合，每个通道只需一次烘焙
+            rects = [get_atlas_tile_rect(mat_idx, cols, rows, size, self.atlas_padding) for mat_idx in range(len(material_slots))]
+            bake_uv = {'uv_layer': original_uv_name}
+            basecolor_input = create_input_mapping().get('BaseColor', 'Base Color')
+            
+            # 拼合用的像素缓冲区在所有通道间复用
+            atlas = np.zeros((size, size, 4), dtype=np.float32)
+            tile_buffers = [np.empty(tile_w * tile_h * 4, dtype=np.float32) for x, y, tile_w, tile_h in rects]
+            
+            # 为每个材质槽创建一次临时材质、烘焙节点和图块，所有通道共用
+            temp_mats = []
+            tiles = []
+            try:
                 for mat_idx, slot in enumerate(material_slots):
                     mat = slot.material
-                    
-                    # 获取材质在图集中的UV边界
-                    u_min, v_min, u_max, v_max = get_atlas_uv_bounds(mat_idx, cols, rows, self.atlas_padding)
-                    
-                    # 创建临时材质用于烘焙
                     temp_mat = mat.copy()
                     temp_mat.name = f"TEMP_{mat.name}"
-                    obj.material_slots[mat_idx].material = temp_mat
+                    slot.material = temp_mat
+                    temp_mats.append((slot, mat, temp_mat))
                     
+                    x, y, tile_w, tile_h = rects[mat_idx]
+                    tile = bpy.data.images.new(f"EasyBake_AtlasTile_{mat_idx}", width=tile_w, height=tile_h, alpha=True)
+                    tiles.append(tile)
+                    
+                    bake_node = temp_mat.node_tree.nodes.new("ShaderNodeTexImage")
+                    bake_node.image = tile
+                    bake_node.select = True
+                    temp_mat.node_tree.nodes.active = bake_node
+                
+                for suffix, btype, alpha in passes:
+                    # 设置颜色空间 - 使用智能检测，图块与图集一致以便直接拷贝像素
+                    if suffix in ['BaseColor', 'Diffuse', 'Albedo', 'Color', 'Emission', 'EmissionColor']:
+                        colorspace = 'sRGB'
+                    else:
+                        # Normal, Roughness, Metallic, etc.
+                        colorspace = 'Non-Color'
                     try:
-                        nt = temp_mat.node_tree
-                        
-                        # 创建烘焙节点
-                        bake_node = nt.nodes.new("ShaderNodeTexImage")
-                        bake_node.image = img
-                        bake_node.select = True
-                        nt.nodes.active = bake_node
-                        
-                        # 选择当前材质的面
-                        bpy.ops.object.mode_set(mode='EDIT')
-                        bpy.ops.mesh.select_all(action='DESELECT')
-                        bpy.ops.object.material_slot_select()
-                        bpy.ops.object.mode_set(mode='OBJECT')
-                        
-                        # 执行烘焙
-                        if btype == 'EMIT':
-                            # 使用emission烘焙
-                            if suffix == 'BaseColor':
-                                input_mapping = create_input_mapping()
-                                basecolor_input = input_mapping.get('BaseColor', 'Base Color')
-                                with temporary_emission_input(nt, basecolor_input):
-                                    bpy.ops.object.bake(type=btype, margin=4, use_clear=False)
-                            elif suffix == 'Metallic':
-                                with temporary_emission_metallic(nt):
-                                    bpy.ops.object.bake(type=btype, margin=4, use_clear=False)
-                        else:
-                            # 直接烘焙
-                            bpy.ops.object.bake(type=btype, margin=4, use_clear=False)
-                        
-                        # 清理烘焙节点
-                        nt.nodes.remove(bake_node)
-                        
+                        for tile in tiles:
+                            tile.colorspace_settings.name = colorspace
                     except Exception as e:
-                        self.report({'ERROR'}, f"Baking material {mat.name} failed: {str(e)}")
+                        print(f"Warning: Cannot set color space for atlas {suffix}: {e}")
                     
-                    finally:
-                        # 恢复原始材质
-                        obj.material_slots[mat_idx].material = mat
-                        # 删除临时材质
-                        bpy.data.materials.remove(temp_mat)
-                
-                # 保存图集图像
-                img_path = os.path.join(directory, f"{img_name}.png")
-                img.filepath_raw = img_path
-                img.file_format = 'PNG'
-                img.save()
-                
-                self.report({'INFO'}, f"Saved atlas {suffix}: {img_path}")
+                    # 所有材质一次烘焙，各自写入自己的图块
+                    try:
+                        with ExitStack() as stack:
+                            if btype == 'EMIT':
+                                # 使用emission烘焙
+                                for slot, mat, temp_mat in temp_mats:
+                                    if suffix == 'BaseColor':
+                                        stack.enter_context(temporary_emission_input(temp_mat.node_tree, basecolor_input))
+                                    elif suffix == 'Metallic':
+                                        stack.enter_context(temporary_emission_metallic(temp_mat.node_tree))
+                            bpy.ops.object.bake(type=btype, margin=4, use_clear=True, **bake_uv)
+                    except Exception as e:
+                        self.report({'ERROR'}, f"Baking atlas {suffix} failed: {str(e)}")
+                        continue
+                    
+                    # 按图集区域拼合图块
+                    atlas.fill(0.0)
+                    for (x, y, tile_w, tile_h), tile, tile_pixels in zip(rects, tiles, tile_buffers):
+                        tile.pixels.foreach_get(tile_pixels)
+                        atlas[y:y + tile_h, x:x + tile_w] = tile_pixels.reshape(tile_h, tile_w, 4)
+                    
+                    # 保存图集图像，有Pillow时直接编码拼合好的像素，不创建Blender图像
+                    img_name = f"{obj.name}_Atlas_{suffix}"
+                    img_path = os.path.join(directory, f"{img_name}.png")
+                    if PILImage is not None:
+                        write_png(img_path, atlas.ravel(), size, size, alpha)
+                    else:
+                        img = bpy.data.images.new(img_name, width=size, height=size, alpha=alpha)
+                        try:
+                            img.colorspace_settings.name = colorspace
+                        except Exception as e:
+                            print(f"Warning: Cannot set color space for atlas {suffix}: {e}")
+                        img.pixels.foreach_set(atlas.ravel())
+                        img.filepath_raw = img_path
+                        img.file_format = 'PNG'
+                        img.save()
+                    
+                    self.report({'INFO'}, f"Saved atlas {suffix}: {img_path}")
+            
+            finally:
+                # 恢复原始材质并删除临时材质（烘焙节点随之删除）和图块
+                for slot, mat, temp_mat in temp_mats:
+                    slot.material = mat
+                    bpy.data.materials.remove(temp_mat)
+                for tile in tiles:
+                    bpy.data.images.remove(tile)
+            
+            # 创建与图集纹理对应的UV层并保留，原UV层仍为活动层，现有材质不受影响
+            if self.atlas_update_uv:
+                atlas_uv_name = create_atlas_uv_layer(obj, material_slots, (cols, rows), self.atlas_padding)
+                obj.data.uv_layers.active = obj.data.uv_layers[original_uv_name]
+                self.report({'INFO'}, f"Created atlas UV layer: {atlas_uv_name}")
             
             self.report({'INFO'}, f"Material atlas baking completed!")
             return {'FINISHED'}
@@ -3899,44 +4252,89 @@ class MBNL_OT_bake_material_atlas(Operator):
         except Exception as e:
             self.report({'ERROR'}, f"Material atlas baking failed: {str(e)}")
             return {'CANCELLED'}
-        
-        finally:
-            # 恢复原始UV层
-            if self.atlas_update_uv and original_uv_name:
-                restore_original_uv_layer(obj, original_uv_name)
 
 
 # -----------------------------------------------------------------------------
 # UDIM Helper Functions
 # -----------------------------------------------------------------------------
 
+def read_active_uvs(obj):
+    """Copy the active UV layer into a flat float32 numpy buffer, None without a UV layer"""
+    uv_layer = obj.data.uv_layers.active
+    if not uv_layer:
+        return None
+    uvs = np.empty(len(uv_layer.data) * 2, dtype=np.float32)
+    uv_layer.data.foreach_get("uv", uvs)
+    return uvs
+
+
+def udim_tile_ids(uvs, polygons=None):
+    """计算每个UV循环所在的UDIM瓦片编号，超出1001-1100范围（每行10个瓦片）的为0，
+    给出 polygons 时按面的UV中心取瓦片，同一个面的循环不会被分到不同瓦片"""
+    uv = uvs.reshape(-1, 2)
+    if polygons is not None and len(polygons):
+        loop_starts = np.empty(len(polygons), dtype=np.int32)
+        polygons.foreach_get("loop_start", loop_starts)
+        loop_totals = np.empty(len(polygons), dtype=np.int32)
+        polygons.foreach_get("loop_total", loop_totals)
+        # 顶点正好落在瓦片边界（如1.0）时，面中心仍在面所在的瓦片内
+        centres = np.add.reduceat(uv, loop_starts, axis=0) / np.maximum(loop_totals, 1)[:, None]
+        uv = np.repeat(centres, loop_totals, axis=0)
+    tile_uv = np.floor(uv).astype(np.int32)
+    tile_u = tile_uv[:, 0]
+    tile_v = tile_uv[:, 1]
+    valid = (tile_u >= 0) & (tile_u < 10) & (tile_v >= 0) & (tile_v < 10)
+    
+    # UDIM编号计算：1001 + tile_u + (tile_v * 10)
+    return np.where(valid, 1001 + tile_u + tile_v * 10, 0)
+
+
+if njit is not None:
+    @njit(cache=True, parallel=True)
+    def udim_tile_flags(uvs):
+        """Flag the UDIM tiles 1001-1100 used by a flat (u, v) buffer, index 0 is tile 1001"""
+        seen = np.zeros(100, dtype=np.uint8)
+        for i in prange(uvs.shape[0] // 2):
+            tile_u = int(np.floor(uvs[2 * i]))
+            tile_v = int(np.floor(uvs[2 * i + 1]))
+            if 0 <= tile_u < 10 and 0 <= tile_v < 10:
+                seen[tile_u + tile_v * 10] = 1
+        return seen
+else:
+    udim_tile_flags = None
+
+
 def detect_udim_tiles(obj):
     """检测物体使用的UDIM瓦片"""
-    if not obj.data.uv_layers:
+    uvs = read_active_uvs(obj)
+    if uvs is None or not len(uvs):
         return []
     
-    tiles = set()
-    uv_layer = obj.data.uv_layers.active
-    
-    if not uv_layer:
-        return []
+    # 常见的非UDIM布局：所有UV都在0-1内（含正好落在1.0的边），只用到1001，无需逐个计算瓦片编号
+    if uvs.min() >= 0.0 and uvs.max() <= 1.0:
+        return [1001]
     
-    # 遍历所有UV坐标，确定使用的瓦片
-    for polygon in obj.data.polygons:
-        for loop_index in polygon.loop_indices:
-            uv = uv_layer.data[loop_index].uv
-            # 计算UDIM瓦片编号
-            tile_u = int(uv.x)
-            tile_v = int(uv.y) 
-            
-            # UDIM编号计算：1001 + tile_u + (tile_v * 10)
-            udim_number = 1001 + tile_u + (tile_v * 10)
-            
-            # 只添加有效的UDIM瓦片（通常在1001-1100范围内）
-            if 1001 <= udim_number <= 1100:
-                tiles.add(udim_number)
+    # 可选的numba内核一次遍历完成，无需中间数组和排序
+    if udim_tile_flags is not None:
+        return (np.flatnonzero(udim_tile_flags(uvs)) + 1001).tolist()
     
-    return sorted(list(tiles))
+    tile_ids = udim_tile_ids(uvs)
+    return np.unique(tile_ids[tile_ids > 0]).tolist()
+
+
+# UDIM tiles last shown by the panel's preview, see get_ui_udim_tiles
+_UDIM_CACHE = {'key': None, 'value': None}
+
+
+def get_ui_udim_tiles(obj):
+    """detect_udim_tiles for the panel preview, recomputed only when the object, its mesh or active UV layer changes"""
+    mesh = obj.data
+    uv_layer = mesh.uv_layers.active
+    key = (obj.as_pointer(), mesh.as_pointer(), len(mesh.loops), uv_layer.name if uv_layer else None)
+    if key != _UDIM_CACHE['key']:
+        _UDIM_CACHE['value'] = detect_udim_tiles(obj)
+        _UDIM_CACHE['key'] = key
+    return _UDIM_CACHE['value']
 
 
 def get_udim_tile_bounds(udim_number):
@@ -3962,147 +4360,71 @@ def create_udim_filename(base_name, udim_number, suffix, extension="png"):
     return f"{base_name}.{udim_number}.{suffix}.{extension}"
 
 
-def setup_udim_baking_area(obj, udim_number):
-    """设置指定UDIM瓦片的烘焙区域"""
-    import bmesh
+def setup_udim_baking_area(obj, udim_number, tile_ids=None):
+    """设置指定UDIM瓦片的烘焙区域，tile_ids 为 udim_tile_ids 的缓存结果"""
+    mesh = obj.data
+    polygons = mesh.polygons
+    if not mesh.uv_layers.active or not len(polygons):
+        return False
     
-    # 获取瓦片边界
-    bounds = get_udim_tile_bounds(udim_number)
+    # 一次性读取UV坐标与多边形的循环范围，保持在物体模式
+    if tile_ids is None:
+        tile_ids = udim_tile_ids(read_active_uvs(obj), polygons)
+    loop_in_tile = tile_ids == udim_number
     
-    # 进入编辑模式
-    bpy.context.view_layer.objects.active = obj
-    bpy.ops.object.mode_set(mode='EDIT')
+    loop_starts = np.empty(len(polygons), dtype=np.int32)
+    polygons.foreach_get("loop_start", loop_starts)
+    loop_totals = np.empty(len(polygons), dtype=np.int32)
+    polygons.foreach_get("loop_total", loop_totals)
     
-    # 创建bmesh实例
-    bm = bmesh.new()
-    bm.from_mesh(obj.data)
+    # 任意一个循环落在瓦片内的面被选中
+    face_in_tile = np.add.reduceat(loop_in_tile.astype(np.int32), loop_starts) > 0
+    face_in_tile &= loop_totals > 0
     
-    try:
-        # 确保面索引有效
-        bm.faces.ensure_lookup_table()
-        
-        # 获取UV层
-        uv_layer = bm.loops.layers.uv.active
-        if not uv_layer:
-            return False
-        
-        # 取消选择所有面
-        for face in bm.faces:
-            face.select = False
-        
-        # 选择属于当前UDIM瓦片的面
-        selected_faces = 0
-        for face in bm.faces:
-            face_in_tile = False
-            for loop in face.loops:
-                uv = loop[uv_layer].uv
-                if (bounds['u_min'] <= uv.x < bounds['u_max'] and 
-                    bounds['v_min'] <= uv.y < bounds['v_max']):
-                    face_in_tile = True
-                    break
-            
-            if face_in_tile:
-                face.select = True
-                selected_faces += 1
-        
-        # 更新网格
-        bmesh.update_edit_mesh(obj.data)
-        
-        return selected_faces > 0
-        
-    except Exception as e:
-        print(f"UDIM area setting error: {e}")
-        return False
-    finally:
-        bm.free()
-        bpy.ops.object.mode_set(mode='OBJECT')
+    polygons.foreach_set("select", face_in_tile)
+    mesh.update()
+    
+    return bool(face_in_tile.any())
 
 
-def normalize_udim_uvs_for_baking(obj, udim_number):
-    """将UDIM瓦片的UV坐标临时归一化到0-1范围进行烘焙"""
-    import bmesh
-    
-    bounds = get_udim_tile_bounds(udim_number)
+def normalize_udim_uvs_for_baking(obj, udim_number, uvs=None, tile_ids=None):
+    """将UDIM瓦片的UV坐标临时归一化到0-1范围进行烘焙，uvs 与 tile_ids 为原始UV及其瓦片编号的缓存"""
+    uv_layer = obj.data.uv_layers.active
+    if not uv_layer:
+        return
     
-    # 进入编辑模式
-    bpy.context.view_layer.objects.active = obj
-    bpy.ops.object.mode_set(mode='EDIT')
+    # 原始坐标由 udim_uvs_snapshot 保存，这里直接在物体模式下批量改写
+    if uvs is None:
+        uvs = read_active_uvs(obj)
+    if tile_ids is None:
+        tile_ids = udim_tile_ids(uvs, obj.data.polygons)
     
-    # 创建bmesh实例
-    bm = bmesh.new()
-    bm.from_mesh(obj.data)
-    original_uvs = {}
+    # 当前UDIM瓦片内的UV移到0-1，其余瓦片（包括1001）整体右移10个单位离开0-1，不参与本次烘焙
+    tile_index = udim_number - 1001
+    uv = uvs.reshape(-1, 2).copy()
+    in_tile = tile_ids == udim_number
+    uv[in_tile] -= (tile_index % 10, tile_index // 10)
+    uv[~in_tile, 0] += 10.0
     
-    try:
-        # 获取UV层
-        uv_layer = bm.loops.layers.uv.active
-        if not uv_layer:
-            return original_uvs
-        
-        # 保存原始UV坐标并归一化
-        for face in bm.faces:
-            for loop in face.loops:
-                loop_index = loop.index
-                uv = loop[uv_layer].uv.copy()
-                original_uvs[loop_index] = uv
-                
-                # 检查是否在当前UDIM瓦片内
-                if (bounds['u_min'] <= uv.x < bounds['u_max'] and 
-                    bounds['v_min'] <= uv.y < bounds['v_max']):
-                    # 归一化到0-1范围
-                    normalized_u = uv.x - bounds['tile_u']
-                    normalized_v = uv.y - bounds['tile_v']
-                    loop[uv_layer].uv = (normalized_u, normalized_v)
-        
-        # 更新网格
-        bmesh.update_edit_mesh(obj.data)
-        
-        return original_uvs
-        
-    except Exception as e:
-        print(f"UDIM UV normalization error: {e}")
-        return original_uvs
-    finally:
-        bm.free()
-        bpy.ops.object.mode_set(mode='OBJECT')
+    uv_layer.data.foreach_set("uv", uv.ravel())
+    obj.data.update()
 
 
-def restore_udim_uvs(obj, original_uvs):
-    """恢复原始UDIM UV坐标"""
-    import bmesh
-    
-    if not original_uvs:
+@contextmanager
+def udim_uvs_snapshot(obj):
+    """Copy the active UV layer into a numpy buffer and write it back on exit"""
+    uv_layer = obj.data.uv_layers.active
+    if not uv_layer:
+        yield None
         return
     
-    # 进入编辑模式
-    bpy.context.view_layer.objects.active = obj
-    bpy.ops.object.mode_set(mode='EDIT')
-    
-    # 创建bmesh实例
-    bm = bmesh.new()
-    bm.from_mesh(obj.data)
-    
+    snapshot = np.empty(len(uv_layer.data) * 2, dtype=np.float32)
+    uv_layer.data.foreach_get("uv", snapshot)
     try:
-        # 获取UV层
-        uv_layer = bm.loops.layers.uv.active
-        if not uv_layer:
-            return
-        
-        # 恢复原始UV坐标
-        for face in bm.faces:
-            for loop in face.loops:
-                loop_index = loop.index
-                if loop_index in original_uvs:
-                    loop[uv_layer].uv = original_uvs[loop_index]
-        
-        # 更新网格
-        bmesh.update_edit_mesh(obj.data)
-        
-    except Exception as e:
-        print(f"UDIM UV restoration error: {e}")
+        yield snapshot
     finally:
-        bm.free()
-        bpy.ops.object.mode_set(mode='OBJECT')
+        uv_layer.data.foreach_set("uv", snapshot)
+        obj.data.update()
 
 
 # -----------------------------------------------------------------------------
@@ -4114,428 +4436,303 @@ def restore_udim_uvs(obj, original_uvs):
 # Registration
 # -----------------------------------------------------------------------------
 
-classes = (
-    MBNL_OT_bake, 
-    MBNL_OT_select_basic, 
-    MBNL_OT_select_full, 
-    MBNL_OT_select_none,
-    MBNL_OT_select_custom_shader,
-    MBNL_OT_diagnose_custom_shader,
-    MBNL_OT_select_res_game,
-    MBNL_OT_select_res_film,
-    MBNL_OT_select_res_all,
-    MBNL_OT_select_res_none,
-    MBNL_OT_save_preset,
-    MBNL_OT_load_preset,
-    MBNL_OT_delete_preset,
-    MBNL_OT_refresh_presets,
-    MBNL_OT_set_custom_1536,
-    MBNL_OT_set_custom_3072,
-    MBNL_OT_set_custom_6144,
-    MBNL_OT_set_custom_1920x1080,
-    MBNL_OT_set_custom_1280x720,
-    MBNL_OT_set_custom_2560x1440,
-    MBNL_OT_set_custom_3840x2160,
-    MBNL_OT_clear_custom_res,
-    MBNL_PT_panel,
-    MBNL_OT_bake_material_atlas
-)
-
-
-def register():
-    for cls in classes:
-        bpy.utils.register_class(cls)
-
-    # Scene properties
-    bpy.types.Scene.mbnl_replace_nodes = BoolProperty(
+# 场景属性: (名称, 属性类型, 参数), register() 和 unregister() 共用
+SCENE_PROP_SPECS = (
+    ("mbnl_replace_nodes", BoolProperty, dict(
         name="Replace Material Nodes",
         description="After baking, rebuild material using baked textures.",
         default=False,
-    )
-    bpy.types.Scene.mbnl_resolution = IntProperty(
+    )),
+    ("mbnl_resolution", IntProperty, dict(
         name="Resolution",
         description="Baking texture resolution (pixels)",
         default=2048,
         min=16,
         max=16384,
-    )
-    bpy.types.Scene.mbnl_include_lighting = BoolProperty(
+    )),
+    ("mbnl_include_lighting", BoolProperty, dict(
         name="Include Lighting",
         description="Include scene lighting information when baking, affects base color and other channels",
         default=False,
-    )
-    bpy.types.Scene.mbnl_lighting_shadow_mode = EnumProperty(
+    )),
+    ("mbnl_lighting_shadow_mode", EnumProperty, dict(
         name="Shadow Mode",
         description="Shadow handling mode for lighting baking",
-        items=[
-            ('WITH_SHADOWS', 'With Shadows', 'Include shadows in lighting baking (complete lighting)'),
-            ('NO_SHADOWS', 'No Shadows', 'Exclude shadows, only include direct lighting without shadows'),
-        ],
-        default='WITH_SHADOWS'
-    )
-    bpy.types.Scene.mbnl_organize_folders = BoolProperty(
+        items=SHADOW_MODE_ITEMS,
+        default='WITH_SHADOWS',
+    )),
+    ("mbnl_organize_folders", BoolProperty, dict(
         name="Organize Folders",
         description="Create folders for each object/material/resolution, better organize output files",
         default=True,
-    )
-    bpy.types.Scene.mbnl_use_custom_directory = BoolProperty(
+    )),
+    ("mbnl_verbose_logging", BoolProperty, dict(
+        name="Verbose Logging",
+        description="Report per-material and per-texture details while baking",
+        default=False,
+    )),
+    ("mbnl_show_stats", BoolProperty, dict(
+        name="Material Type Distribution",
+        description="Analyze the selected materials and show their types in the status box",
+        default=True,
+    )),
+    ("mbnl_use_custom_directory", BoolProperty, dict(
         name="Custom Output Directory",
         description="Use custom directory to save baked images",
         default=False,
-    )
-    bpy.types.Scene.mbnl_custom_directory = StringProperty(
+    )),
+    ("mbnl_custom_directory", StringProperty, dict(
         name="Custom Directory Path",
         description="Select custom output directory path",
         default="",
         subtype="DIR_PATH",
-    )
-    
+    )),
+
     # Preset management
-    bpy.types.Scene.mbnl_preset_list = EnumProperty(
+    ("mbnl_preset_list", EnumProperty, dict(
         name="Preset List",
         description="Available baking presets",
         items=update_presets_enum,
-        default=0
-    )
-    
+        default=0,
+    )),
+
     # Multi-resolution support
-    bpy.types.Scene.mbnl_enable_multi_resolution = BoolProperty(
+    ("mbnl_enable_multi_resolution", BoolProperty, dict(
         name="Multi-Resolution Export",
         description="Export textures at multiple resolutions simultaneously",
         default=False,
-    )
-    bpy.types.Scene.mbnl_res_512 = BoolProperty(name="512×512", default=False)
-    bpy.types.Scene.mbnl_res_1024 = BoolProperty(name="1024×1024", default=True)
-    bpy.types.Scene.mbnl_res_2048 = BoolProperty(name="2048×2048", default=True)
-    bpy.types.Scene.mbnl_res_4096 = BoolProperty(name="4096×4096", default=False)
-    bpy.types.Scene.mbnl_res_8192 = BoolProperty(name="8192×8192", default=False)
-    
+    )),
+    ("mbnl_res_512", BoolProperty, dict(name="512×512", default=False)),
+    ("mbnl_res_1024", BoolProperty, dict(name="1024×1024", default=True)),
+    ("mbnl_res_2048", BoolProperty, dict(name="2048×2048", default=True)),
+    ("mbnl_res_4096", BoolProperty, dict(name="4096×4096", default=False)),
+    ("mbnl_res_8192", BoolProperty, dict(name="8192×8192", default=False)),
+
     # Custom resolution support (supports rectangular)
-    bpy.types.Scene.mbnl_enable_custom_resolution = BoolProperty(
+    ("mbnl_enable_custom_resolution", BoolProperty, dict(
         name="Custom Resolution",
         description="Enable custom resolution input",
         default=False,
-    )
-    bpy.types.Scene.mbnl_custom_width_1 = IntProperty(
+    )),
+    ("mbnl_custom_width_1", IntProperty, dict(
         name="Width 1",
         description="First custom resolution width",
         default=1536,
         min=16,
         max=16384,
-    )
-    bpy.types.Scene.mbnl_custom_height_1 = IntProperty(
+    )),
+    ("mbnl_custom_height_1", IntProperty, dict(
         name="Height 1",
         description="First custom resolution height",
         default=1536,
         min=16,
         max=16384,
-    )
-    bpy.types.Scene.mbnl_custom_width_2 = IntProperty(
+    )),
+    ("mbnl_custom_width_2", IntProperty, dict(
         name="Width 2",
         description="Second custom resolution width",
         default=1920,
         min=16,
         max=16384,
-    )
-    bpy.types.Scene.mbnl_custom_height_2 = IntProperty(
+    )),
+    ("mbnl_custom_height_2", IntProperty, dict(
         name="Height 2",
         description="Second custom resolution height",
         default=1080,
         min=16,
         max=16384,
-    )
-    bpy.types.Scene.mbnl_custom_width_3 = IntProperty(
+    )),
+    ("mbnl_custom_width_3", IntProperty, dict(
         name="Width 3",
         description="Third custom resolution width",
         default=1280,
         min=16,
         max=16384,
-    )
-    bpy.types.Scene.mbnl_custom_height_3 = IntProperty(
+    )),
+    ("mbnl_custom_height_3", IntProperty, dict(
         name="Height 3",
         description="Third custom resolution height",
         default=720,
         min=16,
         max=16384,
-    )
-    bpy.types.Scene.mbnl_use_custom_1 = BoolProperty(name="Enable Custom 1", default=False)
-    bpy.types.Scene.mbnl_use_custom_2 = BoolProperty(name="Enable Custom 2", default=False)
-    bpy.types.Scene.mbnl_use_custom_3 = BoolProperty(name="Enable Custom 3", default=False)
-    
+    )),
+    ("mbnl_use_custom_1", BoolProperty, dict(name="Enable Custom 1", default=False)),
+    ("mbnl_use_custom_2", BoolProperty, dict(name="Enable Custom 2", default=False)),
+    ("mbnl_use_custom_3", BoolProperty, dict(name="Enable Custom 3", default=False)),
+
     # Basic PBR channels
-    bpy.types.Scene.mbnl_include_basecolor = BoolProperty(name="Base Color", default=True)
-    bpy.types.Scene.mbnl_include_roughness = BoolProperty(name="Roughness", default=True)
-    bpy.types.Scene.mbnl_include_metallic = BoolProperty(name="Metallic", default=True)
-    bpy.types.Scene.mbnl_include_normal = BoolProperty(name="Normal", default=True)
-    
+    ("mbnl_include_basecolor", BoolProperty, dict(name="Base Color", default=True)),
+    ("mbnl_include_roughness", BoolProperty, dict(name="Roughness", default=True)),
+    ("mbnl_include_metallic", BoolProperty, dict(name="Metallic", default=True)),
+    ("mbnl_include_normal", BoolProperty, dict(name="Normal", default=True)),
+
     # Advanced PBR channels
-    bpy.types.Scene.mbnl_include_subsurface = BoolProperty(name="Subsurface", default=False)
-    bpy.types.Scene.mbnl_include_transmission = BoolProperty(name="Transmission", default=False)
-    bpy.types.Scene.mbnl_include_emission = BoolProperty(name="Emission", default=False)
-    bpy.types.Scene.mbnl_include_alpha = BoolProperty(name="Alpha", default=False)
-    bpy.types.Scene.mbnl_include_specular = BoolProperty(name="Specular", default=False)
-    bpy.types.Scene.mbnl_include_clearcoat = BoolProperty(name="Clearcoat", default=False)
-    bpy.types.Scene.mbnl_include_clearcoat_roughness = BoolProperty(name="Clearcoat Roughness", default=False)
-    bpy.types.Scene.mbnl_include_sheen = BoolProperty(name="Sheen", default=False)
-    
+    ("mbnl_include_subsurface", BoolProperty, dict(name="Subsurface", default=False)),
+    ("mbnl_include_transmission", BoolProperty, dict(name="Transmission", default=False)),
+    ("mbnl_include_emission", BoolProperty, dict(name="Emission", default=False)),
+    ("mbnl_include_alpha", BoolProperty, dict(name="Alpha", default=False)),
+    ("mbnl_include_specular", BoolProperty, dict(name="Specular", default=False)),
+    ("mbnl_include_clearcoat", BoolProperty, dict(name="Clearcoat", default=False)),
+    ("mbnl_include_clearcoat_roughness", BoolProperty, dict(name="Clearcoat Roughness", default=False)),
+    ("mbnl_include_sheen", BoolProperty, dict(name="Sheen", default=False)),
+
     # Special channels
-    bpy.types.Scene.mbnl_include_displacement = BoolProperty(name="Displacement", default=False)
-    bpy.types.Scene.mbnl_include_ambient_occlusion = BoolProperty(name="Ambient Occlusion", default=False)
-    
+    ("mbnl_include_displacement", BoolProperty, dict(name="Displacement", default=False)),
+    ("mbnl_include_ambient_occlusion", BoolProperty, dict(name="Ambient Occlusion", default=False)),
+
     # Custom shaders
-    bpy.types.Scene.mbnl_include_custom_shader = BoolProperty(name="Custom Shader", default=False, description="Bake custom shader currently connected to Material Output")
-    
+    ("mbnl_include_custom_shader", BoolProperty, dict(name="Custom Shader", default=False, description="Bake custom shader currently connected to Material Output")),
+
     # Mixed shader strategy
-    bpy.types.Scene.mbnl_mixed_shader_strategy = EnumProperty(
+    ("mbnl_mixed_shader_strategy", EnumProperty, dict(
         name="Mixed Shader Strategy",
         description="Processing strategy when material contains both Principled BSDF and custom shaders",
-        items=[
-            ('SURFACE_OUTPUT', 'Full Surface Output', 'Bake complete Material Output Surface result (recommended)'),
-            ('PRINCIPLED_ONLY', 'Principled BSDF Only', 'Only bake Principled BSDF part, ignore custom shaders'),
-            ('CUSTOM_ONLY', 'Custom Shader Only', 'Try to bake only custom shader part (experimental)'),
-        ],
-        default='SURFACE_OUTPUT'
-    )
-    
+        items=MIXED_STRATEGY_ITEMS,
+        default='SURFACE_OUTPUT',
+    )),
+
     # 多材质槽合并功能
-    bpy.types.Scene.mbnl_enable_material_atlas = BoolProperty(
+    ("mbnl_enable_material_atlas", BoolProperty, dict(
         name="Material Atlas Merge",
         description="Merge multiple material slots into a single texture",
-        default=False
-    )
-    bpy.types.Scene.mbnl_atlas_layout_mode = EnumProperty(
+        default=False,
+    )),
+    ("mbnl_atlas_layout_mode", EnumProperty, dict(
         name="Atlas Layout",
         description="Atlas layout mode",
-        items=[
-            ('AUTO', 'Auto Layout', 'Automatically calculate the best layout'),
-            ('MANUAL', 'Manual Layout', 'Manually specify the number of columns and rows'),
-        ],
-        default='AUTO'
-    )
-    bpy.types.Scene.mbnl_atlas_cols = IntProperty(
+        items=ATLAS_LAYOUT_ITEMS,
+        default='AUTO',
+    )),
+    ("mbnl_atlas_cols", IntProperty, dict(
         name="Columns",
         description="Number of columns in the atlas",
         default=2,
         min=1,
-        max=8
-    )
-    bpy.types.Scene.mbnl_atlas_rows = IntProperty(
-        name="Rows", 
+        max=8,
+    )),
+    ("mbnl_atlas_rows", IntProperty, dict(
+        name="Rows",
         description="Number of rows in the atlas",
         default=2,
         min=1,
-        max=8
-    )
-    bpy.types.Scene.mbnl_atlas_padding = FloatProperty(
+        max=8,
+    )),
+    ("mbnl_atlas_padding", FloatProperty, dict(
         name="Padding",
         description="Padding between materials (UV space)",
         default=0.02,
         min=0.0,
-        max=0.1
-    )
-    bpy.types.Scene.mbnl_atlas_update_uv = BoolProperty(
+        max=0.1,
+    )),
+    ("mbnl_atlas_update_uv", BoolProperty, dict(
         name="Update UV Mapping",
         description="Create a new UV mapping for the atlas",
-        default=True
-    )
-    bpy.types.Scene.mbnl_atlas_include_basecolor = BoolProperty(name="基础色", default=True)
-    bpy.types.Scene.mbnl_atlas_include_roughness = BoolProperty(name="粗糙度", default=True)
-    bpy.types.Scene.mbnl_atlas_include_metallic = BoolProperty(name="金属度", default=True)
-    bpy.types.Scene.mbnl_atlas_include_normal = BoolProperty(name="法线", default=True)
-    
+        default=True,
+    )),
+    ("mbnl_atlas_include_basecolor", BoolProperty, dict(name="基础色", default=True)),
+    ("mbnl_atlas_include_roughness", BoolProperty, dict(name="粗糙度", default=True)),
+    ("mbnl_atlas_include_metallic", BoolProperty, dict(name="金属度", default=True)),
+    ("mbnl_atlas_include_normal", BoolProperty, dict(name="法线", default=True)),
+
     # UDIM支持属性
-    bpy.types.Scene.mbnl_enable_udim = BoolProperty(
+    ("mbnl_enable_udim", BoolProperty, dict(
         name="UDIM Support",
         description="Enable UDIM tile baking, generate independent textures for each UDIM tile",
-        default=False
-    )
-    bpy.types.Scene.mbnl_udim_auto_detect = BoolProperty(
+        default=False,
+    )),
+    ("mbnl_udim_auto_detect", BoolProperty, dict(
         name="Auto Detect UDIM",
         description="Automatically detect UDIM tiles used by the model",
-        default=True
-    )
-    bpy.types.Scene.mbnl_udim_range_start = IntProperty(
+        default=True,
+    )),
+    ("mbnl_udim_range_start", IntProperty, dict(
         name="UDIM Start",
         description="UDIM tile range start number",
         default=1001,
         min=1001,
-        max=1100
-    )
-    bpy.types.Scene.mbnl_udim_range_end = IntProperty(
+        max=1100,
+    )),
+    ("mbnl_udim_range_end", IntProperty, dict(
         name="UDIM End",
         description="UDIM tile range end number",
         default=1010,
         min=1001,
-        max=1100
-    )
-    bpy.types.Scene.mbnl_udim_naming_mode = EnumProperty(
+        max=1100,
+    )),
+    ("mbnl_udim_naming_mode", EnumProperty, dict(
         name="UDIM Naming Mode",
         description="Naming mode for UDIM files",
-        items=[
-            ('STANDARD', 'Standard Mode', 'Material name.1001.Channel name.png'),
-            ('MARI', 'Mari Mode', 'Material name_1001_Channel name.png'),
-            ('MUDBOX', 'Mudbox Mode', 'Material name.Channel name.1001.png'),
-        ],
-        default='STANDARD'
-    )
-    
+        items=UDIM_NAMING_ITEMS,
+        default='STANDARD',
+    )),
+
     # Color Space Management Properties
-    bpy.types.Scene.mbnl_colorspace_mode = EnumProperty(
+    ("mbnl_colorspace_mode", EnumProperty, dict(
         name="Color Space Mode",
         description="How to handle color space assignments",
-        items=[
-            ('AUTO', 'Auto Detection', 'Automatically assign appropriate color spaces based on channel type'),
-            ('CUSTOM', 'Custom Settings', 'Use custom color space settings for each channel type'),
-            ('MANUAL', 'Manual Override', 'Manually override color space for all textures'),
-        ],
-        default='AUTO'
-    )
-    
-    bpy.types.Scene.mbnl_colorspace_basecolor = EnumProperty(
-        name="Base Color",
-        description="Color space for Base Color/Diffuse textures",
-        items=[
-            ('sRGB', 'sRGB', 'Standard sRGB color space (gamma corrected)'),
-            ('Linear Rec.709', 'Linear Rec.709', 'Linear Rec.709 color space'),
-            ('Linear sRGB', 'Linear sRGB', 'Linear sRGB color space'),
-            ('Non-Color', 'Non-Color', 'Non-color data'),
-            ('ACEScg', 'ACEScg', 'ACES working color space'),
-            ('Rec.2020', 'Rec.2020', 'ITU-R BT.2020 color space'),
-        ],
-        default='sRGB'
-    )
-    
-    bpy.types.Scene.mbnl_colorspace_normal = EnumProperty(
-        name="Normal Maps",
-        description="Color space for Normal Map textures",
-        items=[
-            ('Non-Color', 'Non-Color', 'Non-color data (recommended for normal maps)'),
-            ('sRGB', 'sRGB', 'sRGB color space'),
-            ('Linear Rec.709', 'Linear Rec.709', 'Linear Rec.709 color space'),
-            ('Raw', 'Raw', 'Raw color data'),
-        ],
-        default='Non-Color'
-    )
-    
-    bpy.types.Scene.mbnl_colorspace_roughness = EnumProperty(
-        name="Roughness/Metallic",
-        description="Color space for Roughness, Metallic and other data textures",
-        items=[
-            ('Non-Color', 'Non-Color', 'Non-color data (recommended for data maps)'),
-            ('sRGB', 'sRGB', 'sRGB color space'),
-            ('Linear Rec.709', 'Linear Rec.709', 'Linear Rec.709 color space'),
-            ('Raw', 'Raw', 'Raw color data'),
-        ],
-        default='Non-Color'
-    )
-    
-    bpy.types.Scene.mbnl_colorspace_emission = EnumProperty(
-        name="Emission",
-        description="Color space for Emission textures",
-        items=[
-            ('sRGB', 'sRGB', 'sRGB color space (recommended for emission)'),
-            ('Linear Rec.709', 'Linear Rec.709', 'Linear Rec.709 color space'),
-            ('Linear sRGB', 'Linear sRGB', 'Linear sRGB color space'),
-            ('ACEScg', 'ACEScg', 'ACES working color space'),
-            ('Non-Color', 'Non-Color', 'Non-color data'),
-        ],
-        default='sRGB'
-    )
-    
-    bpy.types.Scene.mbnl_colorspace_manual_override = EnumProperty(
-        name="Manual Override",
-        description="Color space to use for all textures when using manual override mode",
-        items=[
-            ('sRGB', 'sRGB', 'sRGB color space'),
-            ('Non-Color', 'Non-Color', 'Non-color data'),
-            ('Linear Rec.709', 'Linear Rec.709', 'Linear Rec.709 color space'),
-            ('Linear sRGB', 'Linear sRGB', 'Linear sRGB color space'),
-            ('ACEScg', 'ACEScg', 'ACES working color space'),
-            ('Rec.2020', 'Rec.2020', 'ITU-R BT.2020 color space'),
-            ('Raw', 'Raw', 'Raw color data'),
-            ('XYZ', 'XYZ', 'CIE XYZ color space'),
-        ],
-        default='sRGB'
-    )
+        items=COLORSPACE_MODE_ITEMS,
+        default='AUTO',
+    )),
+    *(('mbnl_' + key, EnumProperty, kwargs) for key, kwargs in COLORSPACE_ENUM_ARGS.items()),
+)
+
+SCENE_PROP_NAMES = tuple(name for name, _, _ in SCENE_PROP_SPECS)
+
+classes = (
+    MBNL_OT_bake, 
+    MBNL_OT_select_basic, 
+    MBNL_OT_select_full, 
+    MBNL_OT_select_none,
+    MBNL_OT_select_custom_shader,
+    MBNL_OT_diagnose_custom_shader,
+    MBNL_OT_analyze_selection,
+    MBNL_OT_select_res_game,
+    MBNL_OT_select_res_film,
+    MBNL_OT_select_res_all,
+    MBNL_OT_select_res_none,
+    MBNL_OT_save_preset,
+    MBNL_OT_load_preset,
+    MBNL_OT_delete_preset,
+    MBNL_OT_refresh_presets,
+    MBNL_OT_set_custom_res,
+    MBNL_OT_clear_custom_res,
+    MBNL_PT_panel,
+    MBNL_OT_bake_material_atlas
+)
+
+register_classes, unregister_classes = bpy.utils.register_classes_factory(classes)
+
+
+def register():
+    register_classes()
+
+    for handlers, handler in ANALYSIS_CACHE_HANDLERS:
+        if handler not in handlers:
+            handlers.append(handler)
+
+    # Scene properties
+    Scene = bpy.types.Scene
+    for name, prop_type, kwargs in SCENE_PROP_SPECS:
+        setattr(Scene, name, prop_type(**kwargs))
 
 
 def unregister():
-    props = [
-        "mbnl_replace_nodes",
-        "mbnl_resolution",
-        "mbnl_include_lighting",
-        "mbnl_lighting_shadow_mode",
-        "mbnl_organize_folders",
-        "mbnl_use_custom_directory",
-        "mbnl_custom_directory",
-        "mbnl_preset_list",
-        # 多分辨率支持
-        "mbnl_enable_multi_resolution",
-        "mbnl_res_512",
-        "mbnl_res_1024",
-        "mbnl_res_2048",
-        "mbnl_res_4096",
-        "mbnl_res_8192",
-        # 自定义分辨率支持
-        "mbnl_enable_custom_resolution",
-        "mbnl_custom_width_1",
-        "mbnl_custom_height_1",
-        "mbnl_custom_width_2",
-        "mbnl_custom_height_2",
-        "mbnl_custom_width_3",
-        "mbnl_custom_height_3",
-        "mbnl_use_custom_1",
-        "mbnl_use_custom_2",
-        "mbnl_use_custom_3",
-        # 基础PBR通道
-        "mbnl_include_basecolor",
-        "mbnl_include_roughness",
-        "mbnl_include_metallic",
-        "mbnl_include_normal",
-        # 高级PBR通道
-        "mbnl_include_subsurface",
-        "mbnl_include_transmission",
-        "mbnl_include_emission",
-        "mbnl_include_alpha",
-        "mbnl_include_specular",
-        "mbnl_include_clearcoat",
-        "mbnl_include_clearcoat_roughness",
-        "mbnl_include_sheen",
-        # 特殊通道
-        "mbnl_include_displacement",
-        "mbnl_include_ambient_occlusion",
-        # 自定义着色器
-        "mbnl_include_custom_shader",
-        "mbnl_mixed_shader_strategy",
-        "mbnl_enable_material_atlas",
-        "mbnl_atlas_layout_mode",
-        "mbnl_atlas_cols",
-        "mbnl_atlas_rows",
-        "mbnl_atlas_padding",
-        "mbnl_atlas_update_uv",
-        "mbnl_atlas_include_basecolor",
-        "mbnl_atlas_include_roughness", 
-        "mbnl_atlas_include_metallic",
-        "mbnl_atlas_include_normal",
-        "mbnl_enable_udim",
-        "mbnl_udim_auto_detect",
-        "mbnl_udim_range_start",
-        "mbnl_udim_range_end",
-        "mbnl_udim_naming_mode",
-        # 色彩空间管理
-        "mbnl_colorspace_mode",
-        "mbnl_colorspace_basecolor",
-        "mbnl_colorspace_normal",
-        "mbnl_colorspace_roughness",
-        "mbnl_colorspace_emission",
-        "mbnl_colorspace_manual_override",
-    ]
-    for p in props:
-        if hasattr(bpy.types.Scene, p):
-            delattr(bpy.types.Scene, p)
-
-    for cls in reversed(classes):
-        bpy.utils.unregister_class(cls)
+    Scene = bpy.types.Scene
+    for name in SCENE_PROP_NAMES:
+        try:
+            delattr(Scene, name)
+        except AttributeError:
+            pass
+
+    for handlers, handler in ANALYSIS_CACHE_HANDLERS:
+        if handler in handlers:
+            handlers.remove(handler)
+    _ANALYSIS_CACHE.clear()
+    _OBJECT_INPUT_CACHE.clear()
+    _STATS_CACHE['key'] = None
+    _UDIM_CACHE['key'] = None
+
+    unregister_classes()
 
 
 if __name__ == "__main__":